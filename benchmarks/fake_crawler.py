@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import html
+import os
+import random
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+import httpx
+
+counters = Counter()
+
+WORDS = (
+    "market revenue growth platform customer government contract software analytics data "
+    "operating margin segment forecast deployment pipeline adoption pricing strategy risk "
+    "competition partner enterprise defense commercial quarter annual guidance demand"
+).split()
+
+
+class FakeCrawlResult:
+    def __init__(self, url: str, html: str, markdown: str):
+        self.url = url
+        self.html = html
+        self.markdown = markdown
+        self.success = True
+        self.status_code = 200
+        self.error_message = None
+
+
+def boilerplate_lines(host: str) -> list:
+    """Navigation, cookie and footer lines that every page on a host repeats."""
+    return [
+        f"[Home](https://{host}/) [News](https://{host}/news) [Markets](https://{host}/markets) [Subscribe](https://{host}/subscribe)",
+        "We use cookies to improve your experience on our site and to show you relevant advertising.",
+        f"Sign up for the {host} newsletter to get the latest analysis delivered to your inbox.",
+        f"Copyright 2025 {host}. All rights reserved. Terms of use and privacy policy apply.",
+    ]
+
+
+def synthetic_page(url: str, size_kb: float) -> str:
+    """Deterministic markdown page of roughly `size_kb` kilobytes for a URL."""
+    host = urlparse(url).netloc
+    rng = random.Random(hashlib.md5(url.encode()).hexdigest())
+    lines = boilerplate_lines(host)[:2]
+    target = int(size_kb * 1024)
+    length = 0
+    while length < target:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+        sentence = " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?"])
+        if rng.random() < 0.1:
+            sentence += f" See [the filing](https://{host}/filings/{rng.randint(1, 999)}) for detail."
+        lines.append(sentence)
+        length += len(sentence) + 1
+    lines.extend(boilerplate_lines(host)[2:])
+    return "\n\n".join(lines)
+
+
+class FakeAsyncWebCrawler:
+    """Drop-in for crawl4ai's AsyncWebCrawler serving synthetic pages of tunable size and latency."""
+
+    def __init__(self, *args, **kwargs):
+        self.page_kb = float(os.getenv("BENCH_PAGE_KB", "20"))
+        self.latency = float(os.getenv("BENCH_FETCH_LATENCY", "0.05"))
+
+    async def __aenter__(self):
+        counters["crawler_starts"] += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def start(self):
+        return await self.__aenter__()
+
+    async def close(self):
+        pass
+
+    async def arun(self, url: str, config=None, **kwargs) -> FakeCrawlResult:
+        counters["fetches"] += 1
+        await asyncio.sleep(self.latency)
+        markdown = synthetic_page(url, self.page_kb)
+        counters["fetched_bytes"] += len(markdown)
+        return FakeCrawlResult(url, f"<html><body>{markdown}</body></html>", markdown)
+
+
+def needs_script(url: str) -> bool:
+    """Whether a host builds its pages with scripts, so only the browser sees their text."""
+    share = float(os.getenv("BENCH_SCRIPT_SHARE", "0.25"))
+    host = urlparse(url).netloc
+    return int(hashlib.md5(host.encode()).hexdigest(), 16) % 1000 < share * 1000
+
+
+def synthetic_html(url: str, size_kb: float) -> str:
+    """The synthetic page as served over plain HTTP: an HTML article, or an empty script shell."""
+    if needs_script(url):
+        return '<html><head><title>App</title></head><body><div id="root"></div><script src="/app.js"></script></body></html>'
+    paragraphs = []
+    for line in synthetic_page(url, size_kb).split("\n\n"):
+        line = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', lambda m: f'<a href="{m.group(2)}">{html.escape(m.group(1))}</a>', line)
+        paragraphs.append(f"<p>{line}</p>")
+    return f"<html><head><title>{urlparse(url).netloc}</title></head><body><article>{''.join(paragraphs)}</article></body></html>"
+
+
+class FakeHTTPTransport(httpx.AsyncBaseTransport):
+    """httpx transport serving synthetic_html with the crawler's latency."""
+
+    def __init__(self):
+        self.page_kb = float(os.getenv("BENCH_PAGE_KB", "20"))
+        self.latency = float(os.getenv("BENCH_FETCH_LATENCY", "0.05"))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        counters["http_fetches"] += 1
+        await asyncio.sleep(self.latency)
+        body = synthetic_html(str(request.url), self.page_kb).encode()
+        counters["http_bytes"] += len(body)
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, content=body, request=request)
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Simulated hardware: one GPU that holds a single model and serves `parallel` requests at once
+default_settings = {
+    "latency": 0.05,             # seconds before the first token
+    "tokens_per_second": 400.0,  # generation speed
+    "prompt_tokens_per_second": 4000.0,
+    "load_seconds": 2.0,         # cost of swapping the loaded model
+    "think_tokens": 120,         # length of the <think> block
+    "trailing_tokens": 40,       # chatter R1 tends to add after the JSON
+    "text_tokens": 250,          # length of free-text answers (insights, drafts)
+    "parallel": 1,
+    "relevant_ratio": 0.8,
+    "fail_every": 0,             # every Nth structured request (the ones clients retry) answers 503
+}
+
+FILLER = (
+    "Okay so I need to look at the section and the goal and work out what matters here "
+    "before committing to an answer and checking the content again carefully"
+).split()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for prompt accounting (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Length of the shared prefix of two strings."""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def infer_fields(prompt: str, schema) -> dict:
+    """Work out which JSON fields the caller expects, from the `format` schema or the prompt wording."""
+    if isinstance(schema, dict) and schema.get("properties"):
+        return {name: spec.get("type", "string") for name, spec in schema["properties"].items()}
+
+    fields = {}
+    for name, kind in [
+        ("queries", "array"), ("is_relevant", "boolean"), ("confidence", "number"),
+        ("reason", "string"), ("quotes", "array"), ("insight", "string"),
+        ("next_question", "string"), ("is_complete", "boolean"), ("research_goal", "string"),
+    ]:
+        if f"`{name}`" in prompt:
+            fields[name] = kind
+    return fields
+
+
+def content_sentences(prompt: str) -> list:
+    """Pick sentences out of the content section of a prompt so quotes validate against the source."""
+    marker = prompt.rfind("CONTENT:")
+    body = prompt[marker + len("CONTENT:"):] if marker != -1 else prompt
+    return [s.strip() for s in re.findall(r'[A-Z][^.!?\n]{20,200}[.!?]', body)]
+
+
+def build_answer(prompt: str, schema, settings: dict) -> str:
+    """Build a plausible final answer (after the think block) for a request."""
+    fields = infer_fields(prompt, schema)
+    digest = int(hashlib.md5(prompt.encode()).hexdigest(), 16)
+    sentences = content_sentences(prompt)
+
+    if not fields and "numbered" in prompt.lower():
+        # Report structure requests want a numbered list in a code block
+        return "```\n1. Introduction\n2. Market Position\n3. Financial Outlook\n```"
+    if not fields:
+        # Free-text answers: drafts cite whatever source ids the prompt offers
+        source_ids = re.findall(r'Source: ([a-f0-9]{15})', prompt)
+        words = [FILLER[(digest + i) % len(FILLER)] for i in range(settings["text_tokens"])]
+        text = " ".join(words).capitalize() + "."
+        for source_id in source_ids[:3]:
+            text += f' As noted, "{sentences[0] if sentences else "the data agrees"}" [src: {source_id}].'
+        return text
+
+    data = {}
+    for name, kind in fields.items():
+        if name == "queries":
+            topic = " ".join(re.findall(r'Section: (.*)', prompt)[:1]) or "research topic"
+            # Follow-up rounds must not repeat the queries they list as already searched
+            label = f"follow-up {digest % 1000}" if "already searched" in prompt else "analysis"
+            data[name] = [f"{topic} {label} {n}" for n in range(3)]
+        elif name == "quotes":
+            data[name] = sentences[:2]
+        elif name == "is_relevant":
+            data[name] = (digest % 1000) / 1000 < settings["relevant_ratio"]
+        elif name == "is_complete":
+            data[name] = True
+        elif kind == "boolean":
+            data[name] = True
+        elif kind in ("number", "integer"):
+            data[name] = 0.9
+        elif kind == "array":
+            data[name] = sentences[:1]
+        else:
+            data[name] = sentences[0] if sentences else "Relevant background for the section."
+    return "```json\n" + json.dumps(data, indent=2) + "\n```"
+
+
+class FakeOllama:
+    """State shared by request handlers: loaded model, prompt cache and call counters."""
+
+    def __init__(self, **settings):
+        self.settings = {**default_settings, **settings}
+        self.gpu = threading.BoundedSemaphore(int(self.settings["parallel"]))
+        self.lock = threading.Lock()
+        self.loaded_model = None
+        self.last_prompt = {}
+        self.counters = Counter()
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def tokens(self, prompt: str, schema, think: bool = True) -> list:
+        """Full token stream for a response: reasoning, answer, trailing chatter."""
+        settings = self.settings
+        reasoning = " ".join(FILLER[i % len(FILLER)] for i in range(settings["think_tokens"]))
+        trailing = " ".join(FILLER[i % len(FILLER)] for i in range(settings["trailing_tokens"]))
+        answer = build_answer(prompt, schema, settings)
+        text = f"<think>\n{reasoning}\n</think>\n\n{answer}" if think else answer
+        if infer_fields(prompt, schema):
+            text += f"\n\n{trailing}"
+        return re.findall(r'\S+\s*|\s+', text)
+
+    def run(self, model: str, prompt: str, body: dict, emit) -> None:
+        """Simulate one generation, calling `emit(fragment, final_stats)` for each piece of output."""
+        settings = self.settings
+        options = body.get("options") or {}
+        keep_alive = body.get("keep_alive")
+        with self.gpu:
+            started = time.perf_counter()
+            load_seconds = 0.0
+            with self.lock:
+                if self.loaded_model != model:
+                    load_seconds = settings["load_seconds"] if model else 0.0
+                    self.counters["model_loads"] += 1
+                    self.loaded_model = model
+                cached = common_prefix_length(self.last_prompt.get(model, ""), prompt)
+                self.last_prompt[model] = prompt
+            prompt_tokens = estimate_tokens(prompt)
+            prompt_eval_count = max(1, prompt_tokens - cached // 4)
+            prompt_seconds = prompt_eval_count / settings["prompt_tokens_per_second"]
+            time.sleep(load_seconds + settings["latency"] + prompt_seconds)
+
+            if not prompt:
+                # Empty prompt: Ollama just loads the model
+                tokens = []
+            else:
+                tokens = self.tokens(prompt, body.get("format"), body.get("think") is not False)
+            limit = options.get("num_predict")
+            if limit is not None and limit >= 0:
+                tokens = tokens[:limit]
+
+            eval_started = time.perf_counter()
+            sent = 0
+            try:
+                for token in tokens:
+                    target = eval_started + (sent + 1) / settings["tokens_per_second"]
+                    delay = target - time.perf_counter()
+                    if delay > 0.002:
+                        time.sleep(delay)
+                    emit(token, None)
+                    sent += 1
+                    with self.lock:
+                        self.counters[f"tokens:{model}"] += 1
+                        self.counters["tokens_generated"] += 1
+                done_reason = "length" if limit is not None and sent == limit else "stop"
+                now = time.perf_counter()
+                emit("", {
+                    "done": True,
+                    "done_reason": done_reason,
+                    "total_duration": int((now - started) * 1e9),
+                    "load_duration": int(load_seconds * 1e9),
+                    "prompt_eval_count": prompt_eval_count,
+                    "prompt_eval_duration": int(prompt_seconds * 1e9),
+                    "eval_count": sent,
+                    "eval_duration": int((now - eval_started) * 1e9),
+                })
+            finally:
+                with self.lock:
+                    self.counters["tokens_planned"] += len(tokens)
+                    self.counters["prompt_tokens"] += prompt_tokens
+                    self.counters["prompt_eval_tokens"] += prompt_eval_count
+                    if keep_alive in (0, "0", "0s") and self.loaded_model == model:
+                        self.loaded_model = None
+
+
+def make_handler(state: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def send_json(self, payload: dict, status: int = 200):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/api/version":
+                self.send_json({"version": "0.0.0-bench"})
+            elif self.path == "/api/ps":
+                loaded = state.loaded_model
+                self.send_json({"models": [{"model": loaded, "name": loaded}] if loaded else []})
+            elif self.path == "/bench/stats":
+                self.send_json(state.stats())
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/bench/reset":
+                state.reset()
+                self.send_json({})
+                return
+            if self.path not in ("/api/generate", "/api/chat"):
+                self.send_json({"error": "not found"}, 404)
+                return
+
+            is_chat = self.path == "/api/chat"
+            model = body.get("model", "")
+            if is_chat:
+                prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+            else:
+                prompt = (body.get("system") or "") + (body.get("prompt") or "")
+            stream = body.get("stream", True)
+            fail_every = int(state.settings["fail_every"])
+            with state.lock:
+                if body.get("format") and fail_every:
+                    state.counters["structured_requests"] += 1
+                    failing = state.counters["structured_requests"] % fail_every == 0
+                else:
+                    failing = False
+                if failing:
+                    state.counters["failed"] += 1
+                else:
+                    state.counters[f"calls:{model}"] += 1
+                    state.counters["calls"] += 1
+            if failing:
+                self.send_json({"error": "server overloaded"}, 503)
+                return
+
+            def frame(fragment: str, final) -> dict:
+                part = {"model": model, "created_at": "2025-01-01T00:00:00Z", "done": False}
+                if is_chat:
+                    part["message"] = {"role": "assistant", "content": fragment}
+                else:
+                    part["response"] = fragment
+                if final:
+                    part.update(final)
+                return part
+
+            if not stream:
+                pieces = []
+                final_stats = {}
+
+                def collect(fragment, final):
+                    pieces.append(fragment)
+                    if final:
+                        final_stats.update(final)
+
+                state.run(model, prompt, body, collect)
+                self.send_json(frame("".join(pieces), final_stats))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def write(fragment, final):
+                line = (json.dumps(frame(fragment, final)) + "\n").encode()
+                self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            try:
+                state.run(model, prompt, body, write)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client stopped reading: generation is cancelled, as in Ollama
+                with state.lock:
+                    state.counters["cancelled"] += 1
+                self.close_connection = True
+
+    return Handler
+
+
+def start_fake_ollama(host: str = "127.0.0.1", port: int = 0, **settings):
+    """Start the fake server in a daemon thread. Returns (server, state)."""
+    state = FakeOllama(**settings)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    server, _ = start_fake_ollama(port=11434)
+    print(f"Fake Ollama listening on http://127.0.0.1:{server.server_address[1]}")
+    threading.Event().wait()
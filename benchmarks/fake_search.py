@@ -0,0 +1,108 @@
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Synthetic results are spread over this many hosts so per-domain logic has something to chew on
+domain_count = 20
+
+
+class FakeSearch:
+    """Custom Search stand-in that hands out a fixed total number of unique result links.
+
+    With `fail_every`, every Nth request is answered with a 429 so clients have to retry.
+    """
+
+    def __init__(self, total_sources: int = 50, fail_every: int = 0):
+        self.total_sources = total_sources
+        self.fail_every = fail_every
+        self.served = 0
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    def reset(self, total_sources: int = None, fail_every: int = None):
+        with self.lock:
+            if total_sources is not None:
+                self.total_sources = total_sources
+            if fail_every is not None:
+                self.fail_every = fail_every
+            self.served = 0
+            self.counters.clear()
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.fail_every and self.counters["requests"] % self.fail_every == 0:
+                self.counters["rate_limited"] += 1
+                return True
+            return False
+
+    def search(self, query: str, num: int) -> list:
+        with self.lock:
+            self.counters["queries"] += 1
+            count = max(0, min(num, self.total_sources - self.served))
+            first = self.served
+            self.served += count
+            self.counters["results"] += count
+        items = []
+        for n in range(first, first + count):
+            host = f"site{n % domain_count}.bench.test"
+            items.append({
+                "title": f"{query.title()} Report {n}",
+                "link": f"https://{host}/articles/{n}",
+                "displayLink": host,
+            })
+        return items
+
+
+def make_handler(state: FakeSearch):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, payload: dict, status: int = 200):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/bench/stats":
+                with state.lock:
+                    self.send_json(dict(state.counters))
+                return
+            if not url.path.endswith("/customsearch/v1"):
+                self.send_json({"error": {"code": 404, "message": "not found"}}, 404)
+                return
+            if state.should_fail():
+                self.send_json({"error": {"code": 429, "message": "rate limit exceeded"}}, 429)
+                return
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0]
+            num = int(params.get("num", ["10"])[0])
+            items = state.search(query, num)
+            self.send_json({"kind": "customsearch#search", "items": items} if items else {"kind": "customsearch#search"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if urlparse(self.path).path == "/bench/reset":
+                state.reset(body.get("total_sources"), body.get("fail_every"))
+                self.send_json({})
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+    return Handler
+
+
+def start_fake_search(host: str = "127.0.0.1", port: int = 0, total_sources: int = 50, fail_every: int = 0):
+    """Start the fake Custom Search endpoint in a daemon thread. Returns (server, state)."""
+    state = FakeSearch(total_sources, fail_every)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
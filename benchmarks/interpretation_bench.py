@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Compares the three-pass interpretation (relevance, quotes per chunk, insights) with
+# the combined single-pass mode on the same evidence files: prompt tokens sent, calls
+# and time per mode, and how far the combined output agrees with the three-pass one.
+
+goal = (
+    "Assess the commercial and government growth prospects of a data analytics software company "
+    "over the next three years, focusing on revenue drivers, margins and competitive risks."
+)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+async def three_pass(content: str, section: str, goal: str):
+    from researcher.site_contents import check_relevance, extract_document, is_relevant
+
+    relevance = await check_relevance(content, section, goal)
+    if relevance is None or not is_relevant(relevance):
+        return relevance, [], ""
+    return (relevance, *await extract_document(content, section, goal))
+
+
+async def run_mode(name: str, documents: list, goal: str) -> dict:
+    """Interpret every (path, section, content) document in one mode. Returns outputs and costs."""
+    from llm.telemetry import calls, chars_per_token
+    from researcher.site_contents import interpret_combined, is_relevant
+
+    interpret = interpret_combined if name == "combined" else three_pass
+    calls_before = len(calls())
+    started = time.perf_counter()
+    outputs = {}
+    for path, section, content in documents:
+        relevance, chunk_quotes, insights = await interpret(content, section, goal)
+        quotes = [quote for chunk in chunk_quotes for quote in chunk]
+        outputs[path] = {
+            "relevant": relevance is not None and is_relevant(relevance),
+            "quotes": [quote.text for quote in quotes],
+            "validated": sum(quote.validated for quote in quotes),
+            "insights": insights,
+        }
+    made = [call for call in calls()[calls_before:] if call["call_type"] != "preload"]
+    return {
+        "mode": name,
+        "seconds": round(time.perf_counter() - started, 2),
+        "calls": len(made),
+        "prompt_tokens_sent": round(sum(call["prompt_chars"] for call in made) / chars_per_token),
+        "outputs": outputs,
+    }
+
+
+def compare(baseline: dict, combined: dict) -> dict:
+    """Agreement of the combined outputs with the three-pass ones."""
+    from researcher.saturation import concepts
+
+    paths = list(baseline["outputs"])
+    agree = sum(baseline["outputs"][p]["relevant"] == combined["outputs"][p]["relevant"] for p in paths)
+    both = [p for p in paths if baseline["outputs"][p]["relevant"] and combined["outputs"][p]["relevant"]]
+    base_quotes = {normalize(q) for p in both for q in baseline["outputs"][p]["quotes"]}
+    new_quotes = {normalize(q) for p in both for q in combined["outputs"][p]["quotes"]}
+    base_concepts = set().union(*(concepts(baseline["outputs"][p]["insights"]) for p in both)) if both else set()
+    new_concepts = set().union(*(concepts(combined["outputs"][p]["insights"]) for p in both)) if both else set()
+
+    def validated_share(run):
+        quotes = sum(len(output["quotes"]) for output in run["outputs"].values())
+        return sum(output["validated"] for output in run["outputs"].values()) / quotes if quotes else 0.0
+
+    return {
+        "documents": len(paths),
+        "relevance_agreement": agree / len(paths) if paths else 0.0,
+        "quote_recall": len(base_quotes & new_quotes) / len(base_quotes) if base_quotes else 1.0,
+        "quote_precision": len(base_quotes & new_quotes) / len(new_quotes) if new_quotes else 1.0,
+        "insight_concept_recall": len(base_concepts & new_concepts) / len(base_concepts) if base_concepts else 1.0,
+        "validated_share": {run["mode"]: round(validated_share(run), 3) for run in (baseline, combined)},
+        "prompt_token_ratio": baseline["prompt_tokens_sent"] / combined["prompt_tokens_sent"] if combined["prompt_tokens_sent"] else 0.0,
+    }
+
+
+def load_documents(report_id: str, limit: int) -> list:
+    """(path, section, content) of a saved report's evidence files, up to `limit`."""
+    from researcher import base_path
+    from researcher.site_contents import read_evidence_file
+
+    documents = []
+    pattern = os.path.join(base_path, report_id, "structured_research", "*", "evidence", "*.md")
+    for path in sorted(glob.glob(pattern))[:limit]:
+        section = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        documents.append((path, section, read_evidence_file(path)[1]))
+    return documents
+
+
+def synthetic_documents(count: int, page_kb: float) -> list:
+    from benchmarks.fake_crawler import synthetic_page
+
+    return [
+        (f"synthetic-{n}", "1. Revenue drivers", synthetic_page(f"https://site{n % 7}.example.com/page/{n}", page_kb))
+        for n in range(count)
+    ]
+
+
+def print_result(baseline: dict, combined: dict, comparison: dict) -> None:
+    print(f"\n=== Interpretation: {comparison['documents']} documents ===")
+    print(f"{'mode':<10} {'seconds':>9} {'llm calls':>10} {'prompt tok':>11}")
+    for run in (baseline, combined):
+        print(f"{run['mode']:<10} {run['seconds']:>9.2f} {run['calls']:>10} {run['prompt_tokens_sent']:>11}")
+    print(f"Prompt tokens, three-pass / combined: {comparison['prompt_token_ratio']:.2f}x")
+    print(f"Relevance agreement: {comparison['relevance_agreement']:.0%}")
+    print(f"Quotes (vs three-pass): recall {comparison['quote_recall']:.0%}, precision {comparison['quote_precision']:.0%}")
+    print(f"Insight concept recall: {comparison['insight_concept_recall']:.0%}")
+    print("Quotes found verbatim in source: " + ", ".join(
+        f"{mode} {share:.0%}" for mode, share in comparison["validated_share"].items()
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare three-pass and combined single-pass interpretation on the same sources.")
+    parser.add_argument("--report", help="Use the evidence of this saved report (run from the repo root)")
+    parser.add_argument("--goal", help="Research goal (default: the report's goal.txt)")
+    parser.add_argument("--limit", type=int, default=20, help="Number of evidence files")
+    parser.add_argument("--fake", action="store_true", help="Use the fake Ollama server and synthetic pages")
+    parser.add_argument("--page-kb", type=float, default=8.0, help="size of synthetic pages")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    if args.fake:
+        from benchmarks.fake_ollama import start_fake_ollama
+        server, _ = start_fake_ollama()
+        # The Ollama client reads its host when first imported
+        os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{server.server_address[1]}"
+    sys.path.insert(0, repo_root)
+
+    import events
+    events.configure("silent")
+    if args.report:
+        from pipeline import load_report
+        documents = load_documents(args.report, args.limit)
+        report_goal = args.goal or load_report(args.report)[0]
+    else:
+        documents = synthetic_documents(args.limit, args.page_kb)
+        report_goal = args.goal or goal
+    if not documents:
+        parser.error("no evidence files to interpret")
+
+    baseline = asyncio.run(run_mode("three-pass", documents, report_goal))
+    combined = asyncio.run(run_mode("combined", documents, report_goal))
+    comparison = compare(baseline, combined)
+    print_result(baseline, combined, comparison)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"three_pass": baseline, "combined": combined, "comparison": comparison}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.fake_ollama import start_fake_ollama
+from benchmarks.fake_search import start_fake_search
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each section searches three queries of five results
+sources_per_section = 15
+
+goal = (
+    "Assess the commercial and government growth prospects of a data analytics software company "
+    "over the next three years, focusing on revenue drivers, margins and competitive risks."
+)
+
+
+def fetch_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/bench/stats") as response:
+        return json.loads(response.read())
+
+
+def post(base_url: str, path: str, payload: dict) -> None:
+    request = urllib.request.Request(
+        f"{base_url}{path}", data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"}, method="POST"
+    )
+    urllib.request.urlopen(request).read()
+
+
+def counter_delta(after: dict, before: dict) -> dict:
+    return {k: v - before.get(k, 0) for k, v in after.items() if v - before.get(k, 0)}
+
+
+def run_child(sources: int, result_path: str) -> None:
+    """Run one full report inside this process against the fake backends and dump timings."""
+    import researcher.content_scraper
+    from researcher import http_fetch
+    from benchmarks import fake_crawler
+
+    researcher.content_scraper.AsyncWebCrawler = fake_crawler.FakeAsyncWebCrawler
+    # Injected failures still go through the retry paths, with backoffs scaled down to the fake latencies
+    import ratelimit
+    ratelimit.backoff_base_seconds = 0.05
+    new_client = http_fetch.new_client
+    http_fetch.new_client = lambda: new_client(transport=fake_crawler.FakeHTTPTransport())
+    import pipeline
+    from researcher import save_text_file
+
+    ollama_url = os.environ["OLLAMA_HOST"]
+    search_url = os.environ["SEARCH_API_ENDPOINT"].rstrip("/")
+    stages = []
+
+    def timed(label, fn):
+        def wrapper(*args, **kwargs):
+            before = (fetch_stats(ollama_url), fetch_stats(search_url), dict(fake_crawler.counters))
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                after = (fetch_stats(ollama_url), fetch_stats(search_url), dict(fake_crawler.counters))
+                stages.append({
+                    "stage": label,
+                    "seconds": round(elapsed, 3),
+                    "llm": counter_delta(after[0], before[0]),
+                    "search": counter_delta(after[1], before[1]),
+                    "crawler": counter_delta(after[2], before[2]),
+                })
+        return wrapper
+
+    pipeline.STAGES[:] = [(label, timed(label, fn)) for label, fn in pipeline.STAGES]
+
+    section_count = max(1, math.ceil(sources / sources_per_section))
+    section_structure = [f"{n + 1}. Section {n + 1}" for n in range(section_count)]
+    report_id = f"bench-{sources}"
+    save_text_file(report_id, "goal.txt", goal)
+    save_text_file(report_id, "structure.txt", "\n".join(section_structure))
+
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        pipeline.research_report(report_id, goal, section_structure)
+    wall = time.perf_counter() - started
+
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "sources": sources,
+            "sections": section_count,
+            "wall_seconds": round(wall, 3),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "stages": stages,
+            "rate_limits": ratelimit.stats(),
+        }, f, indent=2)
+
+
+def run_scale(sources: int, args, ollama_url: str, search_url: str) -> dict:
+    """Run one report size in a fresh interpreter so peak RSS is per run."""
+    post(ollama_url, "/bench/reset", {})
+    post(search_url, "/bench/reset", {"total_sources": sources, "fail_every": args.fail_every})
+    workdir = tempfile.mkdtemp(prefix=f"bench-{sources}-")
+    result_path = os.path.join(workdir, "result.json")
+    env = {
+        **os.environ,
+        "PYTHONPATH": repo_root + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "OLLAMA_HOST": ollama_url,
+        "SEARCH_API_ENDPOINT": search_url + "/",
+        "GOOGLE_API_KEY": "bench",
+        "SEARCH_ENGINE_ID": "bench",
+        "BENCH_PAGE_KB": str(args.page_kb),
+        "BENCH_FETCH_LATENCY": str(args.fetch_latency),
+        "BENCH_SCRIPT_SHARE": str(args.script_share),
+    }
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.pipeline_bench", "--child", str(sources), "--result", result_path],
+        cwd=workdir, env=env, check=True
+    )
+    with open(result_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_result(result: dict) -> None:
+    print(f"\n=== {result['sources']} sources / {result['sections']} sections ===")
+    print(f"Wall time: {result['wall_seconds']:.2f}s   Peak RSS: {result['peak_rss_mb']:.1f} MB")
+    print(f"{'stage':<10} {'seconds':>9} {'llm calls':>10} {'tokens':>9} {'loads':>6} {'searches':>9} {'fetches':>8} {'browser':>8}")
+    for stage in result["stages"]:
+        llm = stage["llm"]
+        print(
+            f"{stage['stage']:<10} {stage['seconds']:>9.2f} {llm.get('calls', 0):>10} "
+            f"{llm.get('tokens_generated', 0):>9} {llm.get('model_loads', 0):>6} "
+            f"{stage['search'].get('queries', 0):>9} "
+            f"{stage['crawler'].get('http_fetches', 0) + stage['crawler'].get('fetches', 0):>8} {stage['crawler'].get('fetches', 0):>8}"
+        )
+    retried = {kind: entry for kind, entry in result.get("rate_limits", {}).items() if entry["backoffs"]}
+    if retried:
+        print("Retries: " + ", ".join(
+            f"{kind} {entry['backoffs']} ({entry['backoff_seconds']:.1f}s backing off)" for kind, entry in sorted(retried.items())
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against fake Ollama, search and crawler backends.")
+    parser.add_argument("--sources", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=5000.0)
+    parser.add_argument("--load-seconds", type=float, default=0.25, help="cost of swapping the loaded model")
+    parser.add_argument("--page-kb", type=float, default=8.0, help="size of synthetic pages")
+    parser.add_argument("--fetch-latency", type=float, default=0.02, help="seconds per page fetch")
+    parser.add_argument("--script-share", type=float, default=0.25, help="share of sites that need the browser")
+    parser.add_argument("--fail-every", type=int, default=5, help="fail every Nth search and structured LLM request (0: never)")
+    parser.add_argument("--json", help="write all results to this file")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.child, args.result)
+        return
+
+    ollama_server, _ = start_fake_ollama(
+        latency=args.latency, tokens_per_second=args.tokens_per_second, load_seconds=args.load_seconds,
+        fail_every=args.fail_every
+    )
+    search_server, _ = start_fake_search()
+    ollama_url = f"http://127.0.0.1:{ollama_server.server_address[1]}"
+    search_url = f"http://127.0.0.1:{search_server.server_address[1]}"
+
+    results = []
+    for sources in args.sources:
+        result = run_scale(sources, args, ollama_url, search_url)
+        print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import time
+from typing import Optional
+
+import events
+from researcher.saturation import concepts
+
+# Deadline- and token-budgeted runs. Each phase may only start new work until its
+# share of the deadline (and of the token budget) has been used, so fetching and
+# interpretation stop early enough for the writer passes to finish in time. Within a
+# phase, pending work is taken in order of expected value.
+
+# Share of the deadline and of the token budget spent by the time a phase stops
+# taking new work. Synthesis and final assembly always run.
+phase_shares = {"content": 0.35, "interpret": 0.7, "insights": 0.85, "quotes": 0.95}
+
+# Weights of the expected value of fetching or interpreting a source
+value_weights = {"rank": 0.35, "lexical": 0.3, "domain": 0.15, "coverage": 0.2}
+
+def tokens_used() -> int:
+    from llm.telemetry import calls
+    return sum(call["prompt_eval_count"] + call["eval_count"] for call in calls())
+
+class RunBudget:
+    """A wall-clock deadline and/or token budget for one run of the pipeline."""
+
+    def __init__(self, deadline_seconds: Optional[float] = None, token_budget: Optional[int] = None):
+        self.deadline_seconds = deadline_seconds
+        self.token_budget = token_budget
+        self.started = time.monotonic()
+        self.tokens_at_start = tokens_used()
+        self.skipped = {}
+        # Phase -> [items, seconds, tokens] of the work it finished so far
+        self.costs = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def tokens(self) -> int:
+        return tokens_used() - self.tokens_at_start
+
+    def allows(self, phase: str) -> bool:
+        """Whether `phase` may still start new work."""
+        share = phase_shares.get(phase, 1.0)
+        if self.deadline_seconds is not None and self.elapsed() >= share * self.deadline_seconds:
+            return False
+        if self.token_budget is not None and self.tokens() >= share * self.token_budget:
+            return False
+        return True
+
+    def record(self, phase: str, items: int, seconds: float, tokens: int):
+        """Record the cost of `items` finished units of work in `phase`."""
+        cost = self.costs.setdefault(phase, [0, 0.0, 0])
+        cost[0] += items
+        cost[1] += seconds
+        cost[2] += tokens
+
+    def affordable(self, phase: str, wanted: int) -> int:
+        """How many of `wanted` units `phase` can still start and finish within its share.
+
+        Until the phase has finished some work its cost is unknown, so it gets one unit
+        to measure.
+        """
+        if wanted <= 0 or not self.allows(phase):
+            return 0
+        items, seconds, tokens = self.costs.get(phase, [0, 0.0, 0])
+        if not items:
+            return 1
+        share = phase_shares.get(phase, 1.0)
+        fits = wanted
+        if self.deadline_seconds is not None and seconds:
+            fits = min(fits, int((share * self.deadline_seconds - self.elapsed()) / (seconds / items)))
+        if self.token_budget is not None and tokens:
+            fits = min(fits, int((share * self.token_budget - self.tokens()) / (tokens / items)))
+        return max(fits, 0)
+
+    def skip(self, phase: str, count: int = 1):
+        """Record work a phase dropped for lack of time or tokens."""
+        if count:
+            self.skipped[phase] = self.skipped.get(phase, 0) + count
+
+    def print_report(self):
+        deadline = f" of {self.deadline_seconds:.0f}s" if self.deadline_seconds is not None else ""
+        tokens = f" of {self.token_budget}" if self.token_budget is not None else ""
+        lines = [f"Budget: time {self.elapsed():.1f}s{deadline}, tokens {self.tokens()}{tokens}"]
+        lines += [f"  Skipped for budget in {phase}: {count}" for phase, count in self.skipped.items()]
+        events.log("\n".join(lines))
+
+def serp_rank(idx: int) -> int:
+    """0-based search rank of the `idx`-th link of a links file.
+
+    Links files hold each query's results in rank order, one query after another.
+    """
+    from researcher.search_api_get_links import number_results
+    return (idx - 1) % number_results
+
+def target_terms(section: str, goal: str) -> set:
+    return concepts(f"{section} {goal}")
+
+def expected_value(rank: int, text: str, targets: set, domain_rate: float, covered: int) -> float:
+    """Expected value of a pending source, between 0 and 1.
+
+    `rank` is its 0-based position in its search results, `text` whatever is known of
+    it (title before fetching, content after), `domain_rate` its domain's track
+    record (see DomainHistory.value) and `covered` how many sources its section already has.
+    """
+    lexical = len(concepts(text) & targets) / len(targets) if targets else 0.0
+    return (
+        value_weights["rank"] / (1 + rank)
+        + value_weights["lexical"] * lexical
+        + value_weights["domain"] * domain_rate
+        + value_weights["coverage"] / (1 + covered)
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from ollama import chat  # Add this import
+from llm import structured_call
 import re
 import os
 from datetime import datetime
@@ -11,16 +11,8 @@ class Question(BaseModel):
     is_complete: bool
     research_goal: str
 
-def clean_response(response_str: str) -> str:
-    """Extract only the JSON content between ```json and ``` markers."""
-    pattern = r'```json\s*(.*?)\s*```'
-    match = re.search(pattern, response_str, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    return response_str.strip()
-
-def get_next_question(context: str, model: str = local_model) -> Question:
-    """Get the next question based on current context."""
+def get_next_question(context: str, model: str = local_model, quiet: bool = False) -> Question:
+    """Get the next question based on current context. `quiet` suppresses all output (for background use)."""
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     system_prompt = (
         f"It is currently {current_time}. You are an expert researcher understanding the goal of a research paper. \n"
@@ -36,46 +28,68 @@ def get_next_question(context: str, model: str = local_model) -> Question:
         {"role": "user", "content": context}
     ]
     
-    response_str = ""
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("\nConsidering clarifying questions...\n")
+    if not quiet:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print("\nConsidering clarifying questions...\n")
+    
+    question, response_str = structured_call("clarification", model, Question, messages=messages, max_attempts=2, echo=not quiet)
+    if question is not None:
+        return question
+
+    print("Error parsing response: no valid question JSON")
+    # Extract any thinking logic between <think> tags
+    think_match = re.search(r'<think>(.*?)</think>', response_str, flags=re.DOTALL)
+    response_logic = think_match.group(1).strip() if think_match else 'Goal same as prompt.'
     
-    for part in chat(model, messages=messages, stream=True):
-        content = part['message']['content']
-        response_str += content
-        print(content, end='', flush=True)
+    # Remove think tags from final response
+    response_str = re.sub(r'<think>.*?</think>', '', response_str, flags=re.DOTALL)
     
-    try:
-        return Question.model_validate_json(clean_response(response_str))
+    # Fallback to basic Question object if JSON parsing failed
+    return Question(
+        next_question=f"{response_str}\n('complete' to finish)",
+        is_complete=False,
+        research_goal=response_logic
+    )
 
+def with_answer(context: str, question: str, answer: str, question_count: int) -> str:
+    """Append a question and its answer to the context, with completion hints based on question count."""
+    if question_count >= 12:
+        answer += "\nNOTE: We have gathered extensive information through 12 questions. The information is now certifiably complete, please return true to avoid annoying the user."
+    elif question_count >= 6:
+        answer += "\nNOTE: We have gathered substantial information through 6 questions. The information is likely sufficiently complete."
+    return context + f"\nQ: {question}\nA: {answer}\n"
 
-    except Exception as e:
-        print(f"Error parsing response: {e}")
-        # Extract any thinking logic between <think> tags
-        think_match = re.search(r'<think>(.*?)</think>', response_str, flags=re.DOTALL)
-        response_logic = think_match.group(1).strip() if think_match else 'Goal same as prompt.'
-        
-        # Remove think tags from final response
-        response_str = re.sub(r'<think>.*?</think>', '', response_str, flags=re.DOTALL)
-        
-        # Fallback to basic Question object if JSON parsing failed
-        return Question(
-            next_question=f"{response_str}\n('complete' to finish)",
-            is_complete=False,
-            research_goal=response_logic
-        )
+def completed_goal(context: str, response: Question) -> str:
+    """The goal returned when the user ends clarification by typing 'complete'."""
+    context += f"\nFINAL RESEARCH GOAL: {response.research_goal}"
+    context += "\n\nNOTE: Research goal is now complete based on user input."
+    return context
+
+def speculate_while_answering(speculator, context: str, response: Question, question_count: int):
+    """Use the time the user spends typing: draft the structure they get if they answer
+    'complete', and the next question if they skip this one with an empty answer."""
+    from structure import draft_structure
 
-def gather_clarifications(research_query: str) -> str:
-    """Gather clarifications on research scope and research aims through questions."""
+    if question_count <= 5:
+        goal = completed_goal(context, response)
+        speculator.speculate(("structure", goal), draft_structure, goal)
+    skipped = with_answer(context, response.next_question, "", question_count)
+    speculator.speculate(("question", skipped), get_next_question, skipped, quiet=True)
+
+def gather_clarifications(research_query: str, speculator=None) -> str:
+    """Gather clarifications on research scope and research aims through questions.
+
+    With a Speculator, likely next steps are prepared in the background while the
+    user answers; whatever the answer makes stale is discarded.
+    """
     context = f"INITIAL QUERY: {research_query}\n\nCURRENT DATE: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\nQUESTION HISTORY:\n"
     question_count = 0
     answer = ""
     
     while True:
-        # Append completion hints based on question count
-        current_context = context
-        
-        response = get_next_question(current_context)
+        response = speculator.claim(("question", context)) if speculator else None
+        if response is None:
+            response = get_next_question(context)
 
         os.system('cls' if os.name == 'nt' else 'clear')
         
@@ -87,20 +101,19 @@ def gather_clarifications(research_query: str) -> str:
             return context
         
         question_count += 1
+        if speculator:
+            speculate_while_answering(speculator, context, response, question_count)
+
         if question_count > 5:
             answer = input(f"\n{response.next_question}\nYour answer ('complete' to begin research): ")
-            if question_count >= 12:
-                answer += "\nNOTE: We have gathered extensive information through 12 questions. The information is now certifiably complete, please return true to avoid annoying the user."
-            elif question_count >= 6:
-                answer += "\nNOTE: We have gathered substantial information through 6 questions. The information is likely sufficiently complete."
         else:
             answer = input(f"\n{response.next_question}\nYour answer: ")
             if answer.lower() == 'complete':
-                context += f"\nFINAL RESEARCH GOAL: {response.research_goal}"
-                context += "\n\nNOTE: Research goal is now complete based on user input."
-                return context
-        
-        
-
+                if speculator:
+                    speculator.discard(lambda key: key[0] == "question")
+                return completed_goal(context, response)
         
-        context += f"\nQ: {response.next_question}\nA: {answer}\n"
+        context = with_answer(context, response.next_question, answer, question_count)
+        if speculator:
+            # Keep only the speculation that matches the answer actually given
+            speculator.discard(lambda key: key != ("question", context))
@@ -0,0 +1,138 @@
+import time
+
+started = time.perf_counter()
+
+import argparse
+
+import pipeline
+
+default_report_id = "pltr-research"
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run a research report, or any range of its stages, for a saved report."
+    )
+    parser.add_argument("--timing", action="store_true",
+                        help="Print time to first stage and seconds per stage")
+    parser.add_argument("--deadline", type=float, metavar="MINUTES",
+                        help="Finish within this wall-clock time, skipping the least valuable sources")
+    parser.add_argument("--token-budget", type=int, metavar="TOKENS",
+                        help="Spend at most about this many LLM tokens, skipping the least valuable sources")
+    parser.add_argument("--output", choices=["progress", "verbose", "silent"], default="progress",
+                        help="Console output: compact progress (default), every message, or nothing")
+    parser.add_argument("--events-log", metavar="PATH",
+                        help="Also append every progress event as a JSON line to this file")
+    parser.add_argument("--stream-tokens", action="store_true",
+                        help="Echo LLM output tokens as they are generated")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("new", help="Start a new report interactively (same as run.py)")
+
+    serve = commands.add_parser("serve", help="Run the research daemon (see daemon.py)")
+    serve.add_argument("--port", type=int, default=8765)
+
+    submit = commands.add_parser("submit", help="Queue a saved report on the daemon and follow its progress")
+    submit.add_argument("--report", default=default_report_id, help="Report id under research/")
+    submit.add_argument("--port", type=int, default=8765)
+
+    rounds = commands.add_parser("round", help="Run follow-up research rounds that only process what is new")
+    rounds.add_argument("--report", default=default_report_id, help="Report id under research/")
+    rounds.add_argument("--rounds", type=int, default=1, help="Number of rounds to run")
+
+    plan = commands.add_parser("plan", help="Estimate LLM calls, tokens, searches, fetches and time without running")
+    plan.add_argument("--report", default=default_report_id, help="Report id under research/")
+
+    resume = commands.add_parser("resume", help="Interpret sources skipped by saturated sections, then rewrite")
+    resume.add_argument("--report", default=default_report_id, help="Report id under research/")
+
+    for name in pipeline.STAGE_NAMES:
+        stage = commands.add_parser(name, help=f"Run only the {name} stage")
+        stage.add_argument("--report", default=default_report_id, help="Report id under research/")
+
+    for group, (first, last) in pipeline.STAGE_GROUPS.items():
+        stages = commands.add_parser(group, help=f"Run stages {first} to {last}")
+        stages.add_argument("--report", default=default_report_id, help="Report id under research/")
+        stages.add_argument("--from", dest="start", choices=pipeline.STAGE_NAMES, default=first,
+                            help="First stage to run")
+        stages.add_argument("--to", dest="end", choices=pipeline.STAGE_NAMES, default=last,
+                            help="Last stage to run")
+    return parser
+
+def print_timings(to_first_stage: float, timings: dict):
+    print("\n=== Timing ===")
+    print(f"Startup to first stage: {to_first_stage:.2f}s")
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds:.2f}s")
+
+def submit_report(report_id: str, port: int):
+    """Send a saved goal and structure to the daemon and print its events until the job ends."""
+    import json
+    import urllib.request
+
+    goal, sections = pipeline.load_report(report_id)
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/jobs",
+        data=json.dumps({"goal": goal, "sections": sections, "report_id": report_id}).encode(),
+        headers={"Content-Type": "application/json"}, method="POST"
+    )
+    job = json.loads(urllib.request.urlopen(request).read())
+    print(f"Queued {job['job']} for report {job['report_id']} ({job['units_total']} units)")
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/jobs/{job['job']}/events") as events:
+        for line in events:
+            event = json.loads(line)
+            details = " ".join(f"{k}={v}" for k, v in event.items() if k not in ("seq", "time", "job", "type"))
+            print(f"{event['type']}: {details}")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    import events
+    events.configure(args.output, args.events_log, args.stream_tokens)
+
+    if args.command == "new":
+        import run
+        run.main()
+        return
+    if args.command == "serve":
+        import daemon
+        daemon.serve(port=args.port)
+        return
+    if args.command == "submit":
+        submit_report(args.report, args.port)
+        return
+    if args.command == "round":
+        import rounds
+        rounds.run_rounds(args.report, args.rounds)
+        return
+
+    options = {}
+    if args.command in pipeline.STAGE_GROUPS:
+        start, end = args.start, args.end
+    elif args.command == "resume":
+        start, end = "interpret", "final"
+        options["resume_skipped"] = True
+    elif args.command != "plan":
+        start = end = args.command
+
+    goal, sections = pipeline.load_report(args.report)
+    if not sections:
+        print(f"No structure saved for report '{args.report}'")
+        return
+
+    if args.command == "plan":
+        import planner
+        planner.print_plan(planner.plan_report(goal, sections), sections)
+        return
+
+    if args.deadline is not None or args.token_budget is not None:
+        from budget import RunBudget
+        deadline = args.deadline * 60 if args.deadline is not None else None
+        options["budget"] = RunBudget(deadline, args.token_budget)
+
+    to_first_stage = time.perf_counter() - started
+    timings = pipeline.run_stages(args.report, goal, sections, start, end, **options)
+    if args.timing:
+        print_timings(to_first_stage, timings)
+
+if __name__ == "__main__":
+    main()
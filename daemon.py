@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import AsyncExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import events
+import pipeline
+from llm import telemetry
+
+default_host = "127.0.0.1"
+default_port = 8765
+
+# Stages that need the whole report at once; every other stage runs one section per unit
+whole_report_stages = {"final"}
+
+# A job passed over this many times in favour of work on the loaded model runs next regardless
+max_skips = 3
+
+# Seconds an event stream waits for news before checking the job again
+event_poll_seconds = 15
+
+# Report ids and section names become folder names under research/
+REPORT_ID = re.compile(r"[\w-]+")
+
+def stage_model(name: str):
+    """Model a stage's LLM calls run on, or None for stages that don't use one."""
+    if name == "queries":
+        from researcher.query_designer import local_model
+        return local_model
+    if name == "interpret":
+        from researcher.site_contents import local_classification_model
+        return local_classification_model
+    if name in ("insights", "synthesis", "quotes"):
+        from writer.insights import local_model
+        return local_model
+    return None
+
+class WarmResources:
+    """State kept alive across jobs: an event loop thread and a crawler on it.
+
+    The browser behind the crawler is the most expensive thing a report starts, so it
+    is started when a page first needs it and reused by every later job until the
+    daemon stops. Plain HTTP fetches keep their connection pool on the same loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="warm-loop", daemon=True)
+        self.thread.start()
+        self.stack = None
+        self.crawler = None
+
+    def run(self, coroutine):
+        """Run a coroutine on the warm loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get_crawler(self):
+        if self.crawler is None:
+            from researcher import content_scraper
+            self.stack = AsyncExitStack()
+            self.crawler = self.run(self.stack.enter_async_context(content_scraper.LazyCrawler()))
+        return self.crawler
+
+    def reset_crawler(self):
+        """Close the crawler (e.g. after its browser died); the next job starts a new one."""
+        if self.crawler is None:
+            return
+        try:
+            self.run(self.stack.aclose())
+        except Exception as e:
+            events.warning(f"Error closing crawler: {e}")
+        self.stack = self.crawler = None
+
+    def close(self):
+        from researcher import http_fetch
+
+        self.reset_crawler()
+        self.run(http_fetch.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+class Job:
+    """One queued report: its remaining (stage, section) units and the events so far."""
+
+    def __init__(self, job_id: str, report_id: str, goal: str, sections: list):
+        self.id = job_id
+        self.report_id = report_id
+        self.goal = goal
+        self.sections = sections
+        self.units = deque(
+            (name, stage, section)
+            for name, stage in pipeline.STAGES
+            for section in ([None] if name in whole_report_stages else sections)
+        )
+        self.total_units = len(self.units)
+        self.state = "queued"
+        self.skips = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        # LLM usage of the units run so far
+        self.usage = {"llm_calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+        self.events = []
+        self.changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+    def next_model(self):
+        return stage_model(self.units[0][0]) if self.units else None
+
+    def emit(self, event_type: str, **fields):
+        with self.changed:
+            self.events.append({
+                "seq": len(self.events), "time": time.time(), "job": self.id, "type": event_type, **fields
+            })
+            self.changed.notify_all()
+
+    def events_since(self, seq: int, timeout: float) -> list:
+        """Events from `seq` on, waiting up to `timeout` seconds for the first one."""
+        with self.changed:
+            self.changed.wait_for(lambda: len(self.events) > seq or self.finished, timeout)
+            return self.events[seq:]
+
+    def summary(self) -> dict:
+        return {
+            "job": self.id,
+            "report_id": self.report_id,
+            "state": self.state,
+            "sections": len(self.sections),
+            "units_done": self.total_units - len(self.units),
+            "units_total": self.total_units,
+            "submitted_at": self.submitted_at,
+        }
+
+class ResearchDaemon:
+    """Run queued reports on one worker, one (stage, section) unit at a time.
+
+    Units are taken round-robin across jobs so a large report cannot starve a small
+    one, but a job whose next unit runs on the model that is already loaded goes
+    first, since switching models on one GPU costs a full load. A job is never passed
+    over more than `max_skips` times in a row.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.queue = deque()
+        self.wakeup = threading.Condition()
+        self.resources = WarmResources()
+        self.current_model = None
+        self.job_count = 0
+        self.stopping = False
+        self.worker = threading.Thread(target=self._work, name="research-worker", daemon=True)
+
+    def start(self):
+        self.worker.start()
+
+    def stop(self):
+        with self.wakeup:
+            self.stopping = True
+            self.wakeup.notify_all()
+        self.worker.join()
+        self.resources.close()
+
+    def submit(self, goal: str, sections: list, report_id: str = None) -> Job:
+        from researcher import generate_report_id, save_text_file
+
+        with self.wakeup:
+            self.job_count += 1
+            job_id = f"job-{self.job_count}"
+            report_id = report_id or f"{generate_report_id()}-{self.job_count}"
+            save_text_file(report_id, "goal.txt", goal)
+            save_text_file(report_id, "structure.txt", "\n".join(sections))
+            job = Job(job_id, report_id, goal, sections)
+            self.jobs[job_id] = job
+            self.queue.append(job)
+            job.emit("queued", report_id=report_id, units=job.total_units)
+            self.wakeup.notify()
+        return job
+
+    def _pick(self) -> Job:
+        """Choose the next job to advance (see class docstring). Caller holds the lock."""
+        jobs = list(self.queue)
+        chosen = next((job for job in jobs if job.skips >= max_skips), None)
+        if chosen is None:
+            chosen = next(
+                (job for job in jobs if job.next_model() in (None, self.current_model)), jobs[0]
+            )
+        for job in jobs[:jobs.index(chosen)]:
+            job.skips += 1
+        chosen.skips = 0
+        self.queue.remove(chosen)
+        return chosen
+
+    def _work(self):
+        while True:
+            with self.wakeup:
+                self.wakeup.wait_for(lambda: self.queue or self.stopping)
+                if self.stopping:
+                    return
+                job = self._pick()
+            self._run_unit(job)
+            if not job.finished:
+                with self.wakeup:
+                    self.queue.append(job)
+
+    def _run_unit(self, job: Job):
+        name, stage, section = job.units.popleft()
+        if job.state == "queued":
+            job.state = "running"
+            job.started_at = time.time()
+            job.emit("started")
+
+        options = {"next_model": job.next_model()}
+        if name == "content":
+            options.update(crawler=self.resources.get_crawler(), run_async=self.resources.run)
+        model = stage_model(name)
+        if model is not None:
+            self.current_model = model
+
+        job.emit("unit_started", stage=name, section=section)
+        started = time.perf_counter()
+        # Units run one at a time, so the telemetry since this reset is the unit's own
+        telemetry.reset()
+        try:
+            stage(job.report_id, job.goal, job.sections if section is None else [section], **options)
+        except Exception as e:
+            traceback.print_exc()
+            if name == "content":
+                self.resources.reset_crawler()
+            job.units.clear()
+            job.state = "failed"
+            job.emit("failed", stage=name, section=section, error=str(e))
+            return
+        usage = telemetry.usage()
+        telemetry.reset()
+        for key, value in usage.items():
+            job.usage[key] += value
+        job.emit("unit_finished", stage=name, section=section, seconds=round(time.perf_counter() - started, 3), **usage)
+
+        if not job.units:
+            job.state = "done"
+            job.emit(
+                "done", seconds=round(time.time() - job.started_at, 3),
+                final_report=f"research/{job.report_id}/final_report.md", **job.usage
+            )
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /jobs, GET /jobs, GET /jobs/<id>, GET /jobs/<id>/events?since=<seq>."""
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def research(self) -> ResearchDaemon:
+        return self.server.research
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/jobs":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            goal = request["goal"]
+            if not isinstance(request["sections"], list):
+                raise TypeError("sections must be a list")
+            sections = [s.strip() for s in request["sections"] if s.strip()]
+            if not isinstance(goal, str) or not goal.strip() or not sections:
+                raise ValueError("goal and sections must not be empty")
+            if any(re.search(r"[/\\]", s) or s in (".", "..") for s in sections):
+                raise ValueError("section names must not be paths")
+            report_id = request.get("report_id")
+            if report_id is not None and not (isinstance(report_id, str) and REPORT_ID.fullmatch(report_id)):
+                raise ValueError("report_id may only hold letters, digits, '_' and '-'")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json(400, {"error": f"expected {{\"goal\": str, \"sections\": [str], \"report_id\": str}}: {e}"})
+            return
+        job = self.research.submit(goal, sections, report_id)
+        self.send_json(201, job.summary())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["jobs"]:
+            self.send_json(200, [job.summary() for job in self.research.jobs.values()])
+            return
+        job = self.research.jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+        if job is None or len(parts) > 3 or (len(parts) == 3 and parts[2] != "events"):
+            self.send_json(404, {"error": "not found"})
+            return
+        if len(parts) == 2:
+            self.send_json(200, job.summary())
+            return
+
+        # Stream events as JSON lines until the job finishes
+        seq = int(parse_qs(url.query).get("since", ["0"])[0])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                for event in job.events_since(seq, event_poll_seconds):
+                    self.wfile.write((json.dumps(event) + "\n").encode())
+                    seq = event["seq"] + 1
+                self.wfile.flush()
+                if job.finished and seq >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def serve(host: str = default_host, port: int = default_port):
+    research = ResearchDaemon()
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    server.daemon_threads = True
+    server.research = research
+    research.start()
+    print(f"Research daemon listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping research daemon")
+    finally:
+        server.server_close()
+        research.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve research jobs over a local HTTP API.")
+    parser.add_argument("--host", default=default_host)
+    parser.add_argument("--port", type=int, default=default_port)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,196 @@
+import sys
+import threading
+import time
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Progress of a run as typed events on one in-process bus. The pipeline only emits;
+# renderers subscribed to the bus decide what reaches the terminal or a log file, so
+# concurrent work never interleaves half-printed lines and batch runs can be silent.
+
+# Emit every streamed token as an event (for debugging prompts; costly at scale)
+stream_tokens = False
+
+class Event(BaseModel):
+    time: float = Field(default_factory=time.time)
+
+    @property
+    def kind(self) -> str:
+        return type(self).__name__
+
+class Message(Event):
+    text: str
+    level: str = "info"  # "info", "debug" or "warning"
+
+class StageStarted(Event):
+    stage: str
+    report_id: str
+
+class StageFinished(Event):
+    stage: str
+    report_id: str
+    seconds: float
+
+class SourceFetched(Event):
+    url: str
+    ok: bool
+    seconds: float = 0.0
+    chars: int = 0
+    error: Optional[str] = None
+
+class SourceInterpreted(Event):
+    source: str
+    section: str
+    relevant: bool
+    quotes: int = 0
+    reason: Optional[str] = None
+
+class LLMCall(Event):
+    call_type: str
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    seconds: float
+
+class Token(Event):
+    call_type: str
+    text: str
+
+_subscribers = []
+_lock = threading.Lock()
+_configured = False
+
+def subscribe(renderer):
+    """Add a callable that receives every event."""
+    with _lock:
+        _subscribers.append(renderer)
+
+def unsubscribe(renderer):
+    with _lock:
+        if renderer in _subscribers:
+            _subscribers.remove(renderer)
+
+def emit(event: Event):
+    if not _configured:
+        configure()
+    for renderer in list(_subscribers):
+        renderer(event)
+
+def log(text: str, level: str = "info"):
+    emit(Message(text=text, level=level))
+
+def debug(text: str):
+    if wants_debug():
+        emit(Message(text=text, level="debug"))
+
+def warning(text: str):
+    emit(Message(text=text, level="warning"))
+
+def token(call_type: str, text: str):
+    if stream_tokens and text:
+        emit(Token(call_type=call_type, text=text))
+
+def wants_debug() -> bool:
+    """Whether any renderer shows debug messages; lets callers skip building them."""
+    if not _configured:
+        configure()
+    return any(getattr(renderer, "debug", True) for renderer in _subscribers)
+
+class ConsoleRenderer:
+    """Compact terminal view: stage headers, messages and one live counter line per stage.
+
+    The counter line is redrawn in place on a terminal and left out otherwise, so
+    piped output stays one line per message.
+    """
+
+    redraw_seconds = 0.1
+
+    def __init__(self, stream=None, debug: bool = False):
+        self.stream = stream or sys.stdout
+        self.debug = debug
+        self.live = self.stream.isatty()
+        self.status_shown = False
+        self.last_draw = 0.0
+        self.lock = threading.Lock()
+        self._reset_counts()
+
+    def _reset_counts(self):
+        self.counts = {"fetched": 0, "failed": 0, "interpreted": 0, "relevant": 0, "llm calls": 0, "tokens": 0}
+
+    def _clear_status(self):
+        if self.status_shown:
+            self.stream.write("\r\033[K")
+            self.status_shown = False
+
+    def _line(self, text: str):
+        self._clear_status()
+        self.stream.write(text + "\n")
+
+    def _draw_status(self, force: bool = False):
+        if not self.live:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_draw < self.redraw_seconds:
+            return
+        self.last_draw = now
+        status = "  ".join(f"{name} {count}" for name, count in self.counts.items() if count)
+        if status:
+            self.stream.write(f"\r\033[K  {status}")
+            self.status_shown = True
+
+    def __call__(self, event: Event):
+        with self.lock:
+            if isinstance(event, Message):
+                if event.level == "debug" and not self.debug:
+                    return
+                self._line(f"! {event.text}" if event.level == "warning" else event.text)
+            elif isinstance(event, Token):
+                self._clear_status()
+                self.stream.write(event.text)
+            elif isinstance(event, StageStarted):
+                self._reset_counts()
+                self._line(f"\n=== {event.stage} ===")
+            elif isinstance(event, StageFinished):
+                summary = ", ".join(f"{count} {name}" for name, count in self.counts.items() if count)
+                self._line(f"{event.stage} done in {event.seconds:.1f}s" + (f" ({summary})" if summary else ""))
+            elif isinstance(event, SourceFetched):
+                self.counts["fetched" if event.ok else "failed"] += 1
+                self._draw_status()
+            elif isinstance(event, SourceInterpreted):
+                self.counts["interpreted"] += 1
+                self.counts["relevant"] += event.relevant
+                self._draw_status()
+            elif isinstance(event, LLMCall):
+                self.counts["llm calls"] += 1
+                self.counts["tokens"] += event.prompt_tokens + event.output_tokens
+                self._draw_status()
+            self.stream.flush()
+
+class JSONLRenderer:
+    """Append every event as one JSON line, for later analysis or a dashboard."""
+
+    debug = True
+
+    def __init__(self, path: str):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def __call__(self, event: Event):
+        line = event.model_dump_json()
+        with self.lock:
+            self.file.write(f'{{"event":"{event.kind}",{line[1:]}\n')
+            self.file.flush()
+
+def configure(console: str = "progress", jsonl_path: str = None, tokens: bool = False):
+    """Choose the renderers: console "progress" (default), "verbose" (with debug
+    messages) or "silent", plus an optional JSONL log. `tokens` turns on token events."""
+    global _configured, stream_tokens
+    with _lock:
+        _subscribers.clear()
+        if console != "silent":
+            _subscribers.append(ConsoleRenderer(debug=console == "verbose"))
+        if jsonl_path:
+            _subscribers.append(JSONLRenderer(jsonl_path))
+        stream_tokens = tokens
+        _configured = True
@@ -0,0 +1,21 @@
+from llm.client import (
+    generate,
+    chat,
+    preload_model,
+    preload_after_next_request,
+    set_next_keep_alive,
+    keep_alive_active
+)
+from llm.scheduler import ModelScheduler
+from llm.telemetry import (
+    record_call,
+    load_overhead,
+    print_load_report,
+    structured_stats,
+    print_structured_report,
+    prompt_cache_stats,
+    print_prompt_cache_report
+)
+from llm.streaming import JSONStreamParser, stream_structured, call_limits
+from llm.structured import structured_call, repair_json
+from llm.cascade import print_cascade_report
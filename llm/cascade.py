@@ -0,0 +1,127 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+
+import events
+
+# Small-to-large model cascades per call type. With a cascade enabled, a call first
+# runs on a small model; cheap checks of its answer (schema validity, confidence,
+# quote validation, length, coverage) decide whether it is kept or the call is
+# repeated on the model its module is set to use (local_model,
+# local_classification_model, ...), which always ends the cascade. Escalations and
+# estimated GPU time saved are reported.
+
+# Off by default: the small models must be pulled, and an escalation switches models
+# in the middle of a work item, outside the grouping by model that ModelScheduler
+# does. On a GPU that cannot hold both models every escalation swaps them.
+enabled = False
+
+# Call type -> small model tried before the module's own model
+policies = {
+    "serp_queries": "deepseek-r1:8b",
+    "followup_queries": "deepseek-r1:8b",
+    "writer_insight": "deepseek-r1:8b",
+    "synthesis": "deepseek-r1:8b",
+    "quote_integration": "deepseek-r1:8b",
+    "relevance": "deepseek-r1:1.5b",
+    "quotes": "deepseek-r1:1.5b",
+    "site_insights": "deepseek-r1:1.5b",
+    "combined": "deepseek-r1:1.5b",
+}
+
+# GPU seconds per call relative to the 8b model, to estimate what a kept small answer saved
+relative_cost = {"deepseek-r1:1.5b": 0.3, "deepseek-r1:8b": 1.0, "deepseek-r1:32b": 3.5}
+
+# Validator thresholds
+min_confidence = 0.6
+min_quote_validation = 0.5
+min_insight_chars = 200
+min_draft_chars = 400
+
+_stats = defaultdict(lambda: {"calls": 0, "escalated": 0, "small_seconds": 0.0, "saved_seconds": 0.0})
+_lock = threading.Lock()
+
+def ladder(call_type: str, default_model: str) -> list:
+    """Models to try for a call type, smallest first, ending with `default_model`."""
+    if not enabled or policies.get(call_type, default_model) == default_model:
+        return [default_model]
+    return [policies[call_type], default_model]
+
+def run(call_type: str, default_model: str, call: Callable, validate: Callable[[object], bool]):
+    """Run `call(model)` up the call type's cascade until `validate` accepts an answer.
+
+    The answer of the last (largest) model is returned whether or not it validates.
+    """
+    models = ladder(call_type, default_model)
+    for model in models[:-1]:
+        started = time.perf_counter()
+        try:
+            result = call(model)
+            accepted = validate(result)
+            if not accepted:
+                events.debug(f"{call_type}: {model} answer rejected, escalating to {models[-1]}")
+        except Exception as e:
+            events.debug(f"{call_type}: {model} failed ({e}), escalating to {models[-1]}")
+            result, accepted = None, False
+        seconds = time.perf_counter() - started
+        with _lock:
+            stats = _stats[call_type]
+            stats["calls"] += 1
+            stats["small_seconds"] += seconds
+            if accepted:
+                ratio = relative_cost.get(models[-1], 1.0) / relative_cost.get(model, 1.0)
+                stats["saved_seconds"] += seconds * (ratio - 1)
+            else:
+                stats["escalated"] += 1
+                stats["saved_seconds"] -= seconds
+        if accepted:
+            return result
+    return call(models[-1])
+
+def cascade_stats() -> dict:
+    with _lock:
+        return {call_type: dict(stats) for call_type, stats in _stats.items()}
+
+def print_cascade_report():
+    """Print the escalation rate and estimated GPU time saved per call type."""
+    stats = cascade_stats()
+    if not stats:
+        return
+    lines = ["Model cascade:"]
+    for call_type, entry in sorted(stats.items()):
+        rate = entry["escalated"] / entry["calls"] if entry["calls"] else 0.0
+        lines.append(
+            f"  {call_type}: {entry['calls']} calls, {rate:.0%} escalated, "
+            f"~{entry['saved_seconds']:.1f}s GPU time saved"
+        )
+    lines.append(f"  Total saved: ~{sum(entry['saved_seconds'] for entry in stats.values()):.1f}s")
+    events.log("\n".join(lines))
+
+# Validators: cheap checks of an answer, True to keep it
+
+def confident(result) -> bool:
+    """A schema-valid answer whose self-reported confidence is high enough."""
+    return result is not None and getattr(result, "confidence", 1.0) >= min_confidence
+
+def quotes_validated(quotes: list, source: str) -> bool:
+    """Enough of the quotes appear verbatim in the source (an empty list passes)."""
+    if not quotes:
+        return True
+    source = " ".join(source.split())
+    found = sum(" ".join(quote.split()) in source for quote in quotes)
+    return found / len(quotes) >= min_quote_validation
+
+def answer_text(text: Optional[str]) -> str:
+    return re.sub(r'<think>.*?</think>', '', text or "", flags=re.DOTALL).strip()
+
+def long_enough(text: Optional[str], min_chars: int = min_insight_chars) -> bool:
+    return len(answer_text(text)) >= min_chars
+
+def covers(text: Optional[str], terms: list, min_share: float = 0.5) -> bool:
+    """At least `min_share` of `terms` appear in the answer (no terms always passes)."""
+    if not terms:
+        return True
+    answer = answer_text(text).lower()
+    return sum(term.lower() in answer for term in terms) / len(terms) >= min_share
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+import ollama
+from ollama import GenerateResponse, ChatResponse, Message
+
+import events
+import ratelimit
+from llm.telemetry import record_call, chars_per_token
+
+# Keep a model resident across gaps (crawling, user input) while it still has work queued
+keep_alive_active = "30m"
+
+# Rate-limit bucket of the Ollama endpoint in use (see ratelimit.rates)
+endpoint_resource = f"ollama:{os.getenv('OLLAMA_HOST', '127.0.0.1:11434')}"
+
+_lock = threading.Lock()
+_pending_preload = None      # model to load once the current request is running
+_keep_alive_overrides = {}   # model -> keep_alive for its next request
+
+def preload_model(model: str, keep_alive=keep_alive_active, background: bool = True):
+    """Load a model into memory (an empty prompt only loads it). Runs in a thread by default."""
+    def load():
+        started = time.perf_counter()
+        try:
+            response = ollama.generate(model, '', keep_alive=keep_alive)
+        except Exception as e:
+            events.warning(f"Preload of {model} failed: {e}")
+            return
+        record_call("preload", model, response, time.perf_counter() - started)
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+def preload_after_next_request(model: str):
+    """Preload `model` as soon as the next request to another model starts streaming.
+
+    Waiting for the first token guarantees that request is already running, so on a
+    single GPU the preload queues behind it instead of evicting the model it needs.
+    """
+    global _pending_preload
+    with _lock:
+        _pending_preload = model
+
+def set_next_keep_alive(model: str, keep_alive):
+    """Override keep_alive for the next request to `model` (e.g. 0 to unload it straight after)."""
+    with _lock:
+        _keep_alive_overrides[model] = keep_alive
+
+def _keep_alive_for(model: str, keep_alive):
+    if keep_alive is not None:
+        return keep_alive
+    with _lock:
+        return _keep_alive_overrides.pop(model, keep_alive_active)
+
+def _fire_pending_preload(model: str):
+    global _pending_preload
+    with _lock:
+        target = _pending_preload
+        if target is None or target == model:
+            return
+        _pending_preload = None
+    preload_model(target)
+
+def _tracked(call_type: str, model: str, parts, prompt_chars: int = 0):
+    """Pass streamed parts through while recording the final stats of the call."""
+    started = time.perf_counter()
+    final = None
+    streamed = 0
+    try:
+        for part in parts:
+            if streamed == 0:
+                _fire_pending_preload(model)
+            streamed += 1
+            if part.get('done'):
+                final = part
+            yield part
+    finally:
+        if hasattr(parts, 'close'):
+            parts.close()
+        if final is None:
+            # Stopped early by the caller, so Ollama sent no stats: each streamed part is
+            # roughly one generated token, and the prompt is counted as if none was cached
+            final = {
+                "eval_count": streamed,
+                "prompt_eval_count": round(prompt_chars / chars_per_token),
+                "done_reason": "cancelled",
+            }
+        record_call(call_type, model, final, time.perf_counter() - started, prompt_chars)
+
+def generate(model: str, prompt: str, *, call_type: str = "generate", stream: bool = False, keep_alive=None, **kwargs):
+    """ollama.generate with deliberate keep_alive and per-call telemetry.
+
+    Always streams from the server; with stream=False the parts are joined into one response.
+    """
+    ratelimit.throttle_sync(endpoint_resource)
+    parts = ollama.generate(model, prompt, stream=True, keep_alive=_keep_alive_for(model, keep_alive), **kwargs)
+    parts = _tracked(call_type, model, parts, len(prompt))
+    if stream:
+        return parts
+
+    text = ""
+    final = None
+    for part in parts:
+        text += part.get('response', '') or ''
+        final = part
+    fields = final.model_dump(exclude_none=True) if final is not None else {}
+    fields['response'] = text
+    return GenerateResponse(**fields)
+
+def chat(model: str, messages: list, *, call_type: str = "chat", stream: bool = False, keep_alive=None, **kwargs):
+    """ollama.chat with deliberate keep_alive and per-call telemetry."""
+    ratelimit.throttle_sync(endpoint_resource)
+    parts = ollama.chat(model, messages=messages, stream=True, keep_alive=_keep_alive_for(model, keep_alive), **kwargs)
+    parts = _tracked(call_type, model, parts, sum(len(m.get('content') or '') for m in messages))
+    if stream:
+        return parts
+
+    text = ""
+    final = None
+    for part in parts:
+        text += part['message']['content'] or ''
+        final = part
+    fields = final.model_dump(exclude_none=True) if final is not None else {}
+    fields['message'] = Message(role='assistant', content=text)
+    return ChatResponse(**fields)
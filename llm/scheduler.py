@@ -0,0 +1,54 @@
+import inspect
+from collections import OrderedDict
+
+from llm.client import preload_after_next_request, set_next_keep_alive
+
+# Unload a model with its last queued request when a different model runs next.
+# Right for a single GPU that cannot hold both; set False if the models fit side by side.
+unload_on_switch = True
+
+class ModelScheduler:
+    """Queue LLM-bound work by model and drain one model's group at a time.
+
+    Switching models costs a full load on a GPU that holds only one, so pending work
+    is grouped by model. While the last item of a group runs, the next group's model
+    is preloaded in the background.
+    """
+
+    def __init__(self, next_model: str = None):
+        self.pending = OrderedDict()
+        self.current_model = None
+        # Model the caller will use after this scheduler drains (preloaded at the end)
+        self.next_model = next_model
+
+    def submit(self, model: str, fn, *args, **kwargs) -> int:
+        """Queue `fn(*args, **kwargs)` (sync or async) to run with `model`. Returns its ticket."""
+        ticket = sum(len(items) for items in self.pending.values())
+        self.pending.setdefault(model, []).append((ticket, fn, args, kwargs))
+        return ticket
+
+    def _next_group(self) -> str:
+        # Stay on the loaded model if it has work; otherwise take groups in submission order
+        if self.current_model in self.pending:
+            return self.current_model
+        return next(iter(self.pending))
+
+    async def drain(self) -> list:
+        """Run all queued work grouped by model. Results are returned in submission order."""
+        results = {}
+        while self.pending:
+            model = self._next_group()
+            items = self.pending.pop(model)
+            self.current_model = model
+            upcoming = next(iter(self.pending), None) or self.next_model
+
+            for i, (ticket, fn, args, kwargs) in enumerate(items):
+                if i == len(items) - 1 and upcoming and upcoming != model:
+                    preload_after_next_request(upcoming)
+                    if unload_on_switch:
+                        set_next_keep_alive(model, 0)
+                result = fn(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                results[ticket] = result
+        return [results[ticket] for ticket in sorted(results)]
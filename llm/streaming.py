@@ -0,0 +1,192 @@
+import json
+from typing import Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+import events
+from llm.client import generate, chat
+
+# Per call type: max streamed reasoning tokens inside <think>, and total output tokens (num_predict)
+call_limits = {
+    "serp_queries": {"reasoning": 1024, "num_predict": 1536},
+    "followup_queries": {"reasoning": 1024, "num_predict": 1536},
+    "relevance": {"reasoning": 512, "num_predict": 768},
+    "quotes": {"reasoning": 768, "num_predict": 1536},
+    "combined": {"reasoning": 768, "num_predict": 2048},
+    "clarification": {"reasoning": 1024, "num_predict": 1536},
+}
+default_limits = {"reasoning": 1024, "num_predict": 2048}
+
+# Output budget for the no-reasoning retry after a cap was hit
+fallback_num_predict = 512
+
+# Parts still read after a valid object for the final part, which carries the call's
+# prompt stats. With a JSON-schema `format` Ollama ends right after the object, so
+# this is rarely more than a few; longer tails are cut off and their stats estimated.
+drain_parts = 64
+
+class JSONStreamParser:
+    """Incrementally scan streamed model output for the first schema-valid JSON object.
+
+    DeepSeek-R1 opens with a <think> block that often contains draft JSON; everything
+    up to </think> only counts towards the reasoning budget. After that, balanced
+    top-level objects are validated as soon as their closing brace arrives.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.text = ""
+        self.reasoning_tokens = 0
+        self.answer_start = None
+        self.pos = 0
+        self.depth = 0
+        self.obj_start = None
+        self.in_string = False
+        self.escape = False
+        self.result = None
+
+    @property
+    def thinking(self) -> bool:
+        return self.answer_start is None
+
+    def feed(self, fragment: str, thinking: str = None) -> Optional[BaseModel]:
+        """Add a streamed fragment. Returns the parsed object once one is complete and valid."""
+        if thinking:
+            # Servers that split reasoning out send it in a separate field
+            self.reasoning_tokens += 1
+        if not fragment or self.result is not None:
+            return self.result
+        self.text += fragment
+
+        if self.answer_start is None:
+            stripped = self.text.lstrip()
+            if stripped.startswith('<think>'):
+                end = self.text.find('</think>')
+                if end == -1:
+                    self.reasoning_tokens += 1
+                    return None
+                self.answer_start = end + len('</think>')
+            elif '<think>'.startswith(stripped):
+                return None
+            else:
+                self.answer_start = 0
+            self.pos = self.answer_start
+        return self._scan()
+
+    def _scan(self) -> Optional[BaseModel]:
+        text = self.text
+        while self.pos < len(text):
+            ch = text[self.pos]
+            self.pos += 1
+            if self.obj_start is None:
+                if ch == '{':
+                    self.obj_start = self.pos - 1
+                    self.depth = 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.depth += 1
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    candidate = text[self.obj_start:self.pos]
+                    self.obj_start = None
+                    self.result = self._validate(candidate)
+                    if self.result is not None:
+                        return self.result
+        return None
+
+    def _validate(self, candidate: str) -> Optional[BaseModel]:
+        try:
+            return self.schema.model_validate(json.loads(candidate))
+        except (json.JSONDecodeError, ValidationError):
+            return None
+
+def _text_of(part) -> str:
+    if 'message' in part and part['message'] is not None:
+        return part['message'].get('content') or ''
+    return part.get('response') or ''
+
+def _thinking_of(part) -> str:
+    if 'message' in part and part['message'] is not None:
+        return part['message'].get('thinking') or ''
+    return part.get('thinking') or ''
+
+def _run(model, schema, call_type, prompt, messages, options, echo, **kwargs) -> Tuple[Optional[BaseModel], str, str, int]:
+    """Stream one call, stopping shortly after a valid object arrives. Returns (result, text, outcome, tokens)."""
+    limits = call_limits.get(call_type, default_limits)
+    parser = JSONStreamParser(schema)
+    if messages is not None:
+        parts = chat(model, messages, call_type=call_type, stream=True, options=options, **kwargs)
+    else:
+        parts = generate(model, prompt, call_type=call_type, stream=True, options=options, **kwargs)
+
+    outcome = "stop"
+    tokens = 0
+    try:
+        for part in parts:
+            tokens += 1
+            fragment = _text_of(part)
+            if echo:
+                events.token(call_type, fragment)
+            if parser.feed(fragment, _thinking_of(part)) is not None:
+                outcome = "complete"
+                if not part.get('done'):
+                    for _, rest in zip(range(drain_parts), parts):
+                        if rest.get('done'):
+                            break
+                break
+            if parser.thinking and parser.reasoning_tokens > limits["reasoning"]:
+                outcome = "reasoning_cap"
+                break
+            if part.get('done'):
+                outcome = part.get('done_reason') or "stop"
+    finally:
+        # Closing the stream drops the connection, which makes Ollama stop generating
+        parts.close()
+    return parser.result, parser.text, outcome, tokens
+
+def stream_structured(
+    model: str,
+    schema: Type[BaseModel],
+    call_type: str,
+    prompt: str = None,
+    messages: list = None,
+    echo: bool = False,
+    **kwargs
+) -> Tuple[Optional[BaseModel], str, int]:
+    """Generate until the first schema-valid JSON object, within the call type's token caps.
+
+    If the reasoning cap or num_predict is hit before a valid object arrives, the call
+    is retried once with reasoning disabled and a short output budget. Returns
+    (parsed object or None, raw streamed text of the first attempt, tokens generated).
+    """
+    limits = call_limits.get(call_type, default_limits)
+    result, text, outcome, tokens = _run(
+        model, schema, call_type, prompt, messages, {"num_predict": limits["num_predict"]}, echo, **kwargs
+    )
+    if result is not None or outcome not in ("reasoning_cap", "length"):
+        return result, text, tokens
+
+    events.debug(f"{call_type}: {outcome.replace('_', ' ')} hit without a valid answer, retrying without reasoning")
+    nudge = "\n\nAnswer immediately with only the JSON object."
+    if messages is not None:
+        messages = messages + [{"role": "user", "content": nudge.strip()}]
+    else:
+        prompt = prompt + nudge
+    try:
+        result, _, _, fallback_tokens = _run(
+            model, schema, f"{call_type}_fallback", prompt, messages,
+            {"num_predict": fallback_num_predict}, echo, think=False, **kwargs
+        )
+        tokens += fallback_tokens
+    except Exception as e:
+        events.warning(f"{call_type}: fallback failed: {e}")
+        result = None
+    return result, text, tokens
@@ -0,0 +1,159 @@
+import json
+import re
+import typing
+from typing import Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+import events
+import ratelimit
+from llm.streaming import stream_structured
+from llm.telemetry import record_structured
+
+def _fenced_blocks(text: str) -> list:
+    return [m.strip() for m in re.findall(r'```(?:json)?\s*(.*?)```', text, flags=re.DOTALL)]
+
+def _json_spans(text: str) -> list:
+    """Outermost {...} or [...] spans; an unterminated span runs to the end of the text."""
+    spans = []
+    i = 0
+    while i < len(text):
+        if text[i] not in '{[':
+            i += 1
+            continue
+        depth = 0
+        in_string = escape = False
+        for j in range(i, len(text)):
+            ch = text[j]
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == '\\':
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in '{[':
+                depth += 1
+            elif ch in '}]':
+                depth -= 1
+                if depth == 0:
+                    spans.append(text[i:j + 1])
+                    i = j + 1
+                    break
+        else:
+            spans.append(text[i:])
+            break
+    return spans
+
+def _close_truncated(candidate: str) -> str:
+    """Close strings and brackets left open by output that was cut off mid-object."""
+    stack = []
+    in_string = escape = False
+    for ch in candidate:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]' and stack:
+            stack.pop()
+    if in_string:
+        candidate += '"'
+    candidate = re.sub(r',\s*$', '', candidate.rstrip())
+    return candidate + ''.join(reversed(stack))
+
+def _variants(candidate: str):
+    yield candidate
+    fixed = (candidate
+             .replace('“', '"').replace('”', '"')
+             .replace('‘', "'").replace('’', "'"))
+    fixed = re.sub(r',\s*([}\]])', r'\1', fixed)
+    fixed = re.sub(r'\bTrue\b', 'true', fixed)
+    fixed = re.sub(r'\bFalse\b', 'false', fixed)
+    fixed = re.sub(r'\bNone\b', 'null', fixed)
+    yield fixed
+    yield _close_truncated(fixed)
+
+def _coerce(data, schema: Type[BaseModel]):
+    """Fit common near-misses to the schema, e.g. a bare list for a single-list-field model."""
+    fields = schema.model_fields
+    list_fields = [name for name, f in fields.items() if typing.get_origin(f.annotation) in (list, typing.List)]
+    if isinstance(data, list) and len(fields) == 1 and list_fields:
+        return {list_fields[0]: data}
+    if isinstance(data, dict):
+        lowered = {k.lower(): v for k, v in data.items() if isinstance(k, str)}
+        if set(fields) - set(data) and set(fields) <= set(lowered):
+            return {name: lowered[name] for name in fields}
+        if len(fields) == 1 and list_fields and len(data) == 1:
+            value = next(iter(data.values()))
+            if isinstance(value, list):
+                return {list_fields[0]: value}
+    return data
+
+def repair_json(text: str, schema: Type[BaseModel]) -> Optional[BaseModel]:
+    """Recover a schema-valid object from near-valid output without another generation."""
+    text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
+    text = text.split('</think>')[-1]
+    for candidate in _fenced_blocks(text) + _json_spans(text):
+        for variant in _variants(candidate):
+            try:
+                data = json.loads(variant)
+            except json.JSONDecodeError:
+                continue
+            try:
+                return schema.model_validate(_coerce(data, schema))
+            except ValidationError:
+                continue
+    return None
+
+def structured_call(
+    call_site: str,
+    model: str,
+    schema: Type[BaseModel],
+    prompt: str = None,
+    messages: list = None,
+    max_attempts: int = 3,
+    echo: bool = False,
+    **kwargs
+) -> Tuple[Optional[BaseModel], str]:
+    """Generate a schema-valid object, constrained by Ollama's JSON-schema `format`.
+
+    Each attempt streams until a valid object arrives (see stream_structured). Output
+    that is near-valid is repaired locally before spending another generation on a
+    retry. Attempts, repairs and tokens spent on discarded attempts are recorded per
+    call site. Returns (object or None, raw text of the last attempt).
+    """
+    format_schema = schema.model_json_schema()
+    wasted_tokens = 0
+    text = ""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            result, text, tokens = stream_structured(
+                model, schema, call_site, prompt=prompt, messages=messages, echo=echo,
+                format=format_schema, **kwargs
+            )
+        except Exception as e:
+            # A request error (server down, overloaded), not a bad answer: back off before retrying
+            events.warning(f"{call_site}: attempt {attempt}/{max_attempts} failed: {e}")
+            if attempt < max_attempts:
+                ratelimit.wait_backoff_sync("ollama", attempt)
+            continue
+        if result is not None:
+            record_structured(call_site, attempt, repaired=False, succeeded=True, wasted_tokens=wasted_tokens)
+            return result, text
+        result = repair_json(text, schema)
+        if result is not None:
+            record_structured(call_site, attempt, repaired=True, succeeded=True, wasted_tokens=wasted_tokens)
+            return result, text
+        events.debug(f"{call_site}: attempt {attempt}/{max_attempts} returned no valid JSON")
+        wasted_tokens += tokens
+
+    record_structured(call_site, max_attempts, repaired=False, succeeded=False, wasted_tokens=wasted_tokens)
+    return None, text
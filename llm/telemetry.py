@@ -0,0 +1,177 @@
+import threading
+from collections import defaultdict
+
+import events
+
+# A load_duration above this means the model actually had to be loaded, not just looked up
+cold_load_seconds = 0.5
+# Rough characters per token: the prompt tokens of calls stopped before Ollama's
+# stats, and the token estimates of savings reports (boilerplate, duplicate quotes)
+chars_per_token = 4.0
+
+_calls = []
+_structured = defaultdict(lambda: {
+    "calls": 0, "attempts": 0, "retries": 0, "repaired": 0, "failed": 0, "wasted_tokens": 0
+})
+_lock = threading.Lock()
+
+def _seconds(nanoseconds) -> float:
+    return (nanoseconds or 0) / 1e9
+
+def record_call(call_type: str, model: str, final, wall_seconds: float, prompt_chars: int = 0) -> dict:
+    """Record the timing stats Ollama returns on the final part of a response.
+
+    `prompt_chars` is the length of the prompt sent; Ollama only counts the prompt
+    tokens it had to evaluate, so the difference is what its prompt cache saved.
+    """
+    final = final or {}
+    entry = {
+        "call_type": call_type,
+        "model": model,
+        "wall_seconds": wall_seconds,
+        "prompt_chars": prompt_chars,
+        "load_seconds": _seconds(final.get("load_duration")),
+        "prompt_eval_count": final.get("prompt_eval_count") or 0,
+        "prompt_eval_seconds": _seconds(final.get("prompt_eval_duration")),
+        "eval_count": final.get("eval_count") or 0,
+        "eval_seconds": _seconds(final.get("eval_duration")),
+        "total_seconds": _seconds(final.get("total_duration")),
+        "done_reason": final.get("done_reason"),
+    }
+    with _lock:
+        _calls.append(entry)
+    events.emit(events.LLMCall(
+        call_type=call_type, model=model, prompt_tokens=entry["prompt_eval_count"],
+        output_tokens=entry["eval_count"], seconds=wall_seconds
+    ))
+    return entry
+
+def calls() -> list:
+    """Snapshot of every recorded call."""
+    with _lock:
+        return list(_calls)
+
+def usage() -> dict:
+    """LLM calls and tokens recorded since the last reset."""
+    with _lock:
+        return {
+            "llm_calls": len(_calls),
+            "prompt_tokens": sum(call["prompt_eval_count"] for call in _calls),
+            "output_tokens": sum(call["eval_count"] for call in _calls),
+        }
+
+def reset():
+    with _lock:
+        _calls.clear()
+        _structured.clear()
+
+def record_structured(call_site: str, attempts: int, repaired: bool, succeeded: bool, wasted_tokens: int):
+    """Account for one structured-output call: retries, local repairs and tokens thrown away."""
+    with _lock:
+        stats = _structured[call_site]
+        stats["calls"] += 1
+        stats["attempts"] += attempts
+        stats["retries"] += attempts - 1
+        stats["repaired"] += int(repaired)
+        stats["failed"] += int(not succeeded)
+        stats["wasted_tokens"] += wasted_tokens
+
+def structured_stats() -> dict:
+    with _lock:
+        return {site: dict(stats) for site, stats in _structured.items()}
+
+def load_overhead() -> dict:
+    """Model load time per model, split into loads on the critical path and background preloads."""
+    summary = defaultdict(lambda: {"loads": 0, "load_seconds": 0.0, "preloads": 0, "preload_seconds": 0.0})
+    for entry in calls():
+        if entry["load_seconds"] < cold_load_seconds:
+            continue
+        stats = summary[entry["model"]]
+        if entry["call_type"] == "preload":
+            stats["preloads"] += 1
+            stats["preload_seconds"] += entry["load_seconds"]
+        else:
+            stats["loads"] += 1
+            stats["load_seconds"] += entry["load_seconds"]
+    return dict(summary)
+
+def print_load_report():
+    """Print how much time went into loading models and how much of it was hidden by preloading."""
+    overhead = load_overhead()
+    if not overhead:
+        events.log("Model loads: no cold loads recorded")
+        return
+    lines = ["Model loads:"]
+    for model, stats in overhead.items():
+        lines.append(
+            f"  {model}: {stats['loads']} blocking loads ({stats['load_seconds']:.1f}s), "
+            f"{stats['preloads']} background preloads ({stats['preload_seconds']:.1f}s overlapped)"
+        )
+    blocking = sum(s["load_seconds"] for s in overhead.values())
+    hidden = sum(s["preload_seconds"] for s in overhead.values())
+    lines.append(f"  Total: {blocking:.1f}s blocking, {hidden:.1f}s hidden by preloading")
+    events.log("\n".join(lines))
+
+def print_structured_report():
+    """Print retries, repairs and wasted generation per structured-output call site."""
+    stats = structured_stats()
+    if not stats:
+        return
+    lines = ["Structured output:"]
+    for site, entry in sorted(stats.items()):
+        lines.append(
+            f"  {site}: {entry['calls']} calls, {entry['retries']} retries, {entry['repaired']} repaired, "
+            f"{entry['failed']} failed, {entry['wasted_tokens']} wasted tokens"
+        )
+    events.log("\n".join(lines))
+
+def measured(entry: dict) -> bool:
+    """Whether a call's prompt stats came from Ollama rather than an estimate (calls stopped early)."""
+    return entry["done_reason"] != "cancelled" and entry["prompt_eval_count"] > 0
+
+def tokens_per_char(entries: list) -> dict:
+    """Per model, prompt tokens per character of the call that evaluated the most per
+    character: one with nothing cached, whose count is the whole prompt's."""
+    ratios = {}
+    for entry in entries:
+        if entry.get("prompt_chars") and measured(entry):
+            ratio = entry["prompt_eval_count"] / entry["prompt_chars"]
+            ratios[entry["model"]] = max(ratios.get(entry["model"], 0.0), ratio)
+    return ratios
+
+def prompt_cache_stats() -> dict:
+    """Per call type: prompt tokens sent, evaluated, and prompt-eval seconds saved by the cache.
+
+    Ollama only reports the tokens it evaluated; the tokens sent are measured per model
+    by the call with the most tokens per character, which had nothing cached. Calls
+    stopped before Ollama's final stats are left out.
+    """
+    entries = calls()
+    ratios = tokens_per_char(entries)
+    summary = {}
+    for entry in entries:
+        if not entry.get("prompt_chars") or not measured(entry):
+            continue
+        stats = summary.setdefault(entry["call_type"], {"calls": 0, "sent": 0.0, "evaluated": 0, "seconds": 0.0, "saved_seconds": 0.0})
+        sent = entry["prompt_chars"] * ratios[entry["model"]]
+        cached = max(sent - entry["prompt_eval_count"], 0.0)
+        stats["calls"] += 1
+        stats["sent"] += sent
+        stats["evaluated"] += entry["prompt_eval_count"]
+        stats["seconds"] += entry["prompt_eval_seconds"]
+        stats["saved_seconds"] += cached * entry["prompt_eval_seconds"] / entry["prompt_eval_count"]
+    return summary
+
+def print_prompt_cache_report():
+    """Print how much prompt evaluation Ollama's prompt cache saved per call type."""
+    stats = prompt_cache_stats()
+    if not stats:
+        return
+    lines = ["Prompt cache:"]
+    for call_type, entry in sorted(stats.items()):
+        reused = max(1 - entry["evaluated"] / entry["sent"], 0.0) if entry["sent"] else 0.0
+        lines.append(
+            f"  {call_type}: {entry['calls']} calls, ~{reused:.0%} of prompt tokens reused, "
+            f"{entry['seconds']:.1f}s prompt eval, ~{entry['saved_seconds']:.1f}s saved"
+        )
+    events.log("\n".join(lines))
@@ -0,0 +1,145 @@
+import os
+import time
+
+# Stages of a report in order. Each stage imports only what it needs, so running
+# just the writer passes never loads the browser or search stack.
+
+def stage_folders(report_id, goal, sections, **options):
+    from researcher import create_folders
+    create_folders(report_id, sections)
+
+def stage_queries(report_id, goal, sections, **options):
+    from researcher import create_serp_queries
+    create_serp_queries(report_id, sections, goal, options.get("precomputed_queries"))
+
+def stage_links(report_id, goal, sections, **options):
+    from researcher import gather_links
+    gather_links(report_id, sections, options.get("precomputed_links"))
+
+def stage_content(report_id, goal, sections, **options):
+    from researcher import gather_link_content
+    gather_link_content(report_id, sections, options.get("crawler"), options.get("run_async"), goal, options.get("budget"))
+
+def stage_interpret(report_id, goal, sections, **options):
+    from researcher import interpret_link_content
+    from writer.insights import local_model as writer_model
+    interpret_link_content(report_id, sections, goal, next_model=options.get("next_model", writer_model),
+                           resume_skipped=options.get("resume_skipped", False), budget=options.get("budget"))
+
+def stage_insights(report_id, goal, sections, **options):
+    from writer import insights_writer
+    insights_writer(report_id, sections, options.get("budget"))
+
+def stage_synthesis(report_id, goal, sections, **options):
+    from writer import synthesis_writer
+    synthesis_writer(report_id, sections, goal)
+
+def stage_quotes(report_id, goal, sections, **options):
+    from writer import quotes_writer
+    quotes_writer(report_id, sections, options.get("budget"))
+
+def stage_final(report_id, goal, sections, **options):
+    from writer import final_draft_writer
+    final_draft_writer(report_id, sections)
+
+STAGES = [
+    ("folders", stage_folders),
+    ("queries", stage_queries),
+    ("links", stage_links),
+    ("content", stage_content),
+    ("interpret", stage_interpret),
+    ("insights", stage_insights),
+    ("synthesis", stage_synthesis),
+    ("quotes", stage_quotes),
+    ("final", stage_final),
+]
+
+STAGE_NAMES = [name for name, _ in STAGES]
+
+# Named stage ranges: (first, last)
+STAGE_GROUPS = {
+    "research": ("folders", "interpret"),
+    "write": ("insights", "final"),
+    "all": ("folders", "final"),
+}
+
+def select_stages(start: str = None, end: str = None) -> list:
+    """Stages from `start` to `end` inclusive (defaults: first and last)."""
+    first = STAGE_NAMES.index(start) if start else 0
+    last = STAGE_NAMES.index(end) if end else len(STAGE_NAMES) - 1
+    if first > last:
+        raise ValueError(f"Stage '{start}' comes after '{end}'")
+    return STAGES[first:last + 1]
+
+def run_stages(report_id: str, goal: str, sections: list, start: str = None, end: str = None, **options) -> dict:
+    """Run a range of stages for a report. Returns seconds spent per stage.
+
+    Each stage's LLM usage is added to the planner's history, and the plan for the
+    remaining stages is reported as an ETA after each one.
+    """
+    import events
+    import planner
+    from llm.telemetry import calls
+
+    selected = select_stages(start, end)
+    eta = planner.ETA(planner.plan_report(goal, sections, [name for name, _ in selected]))
+    timings = {}
+    for name, stage in selected:
+        events.emit(events.StageStarted(stage=name, report_id=report_id))
+        started = time.perf_counter()
+        calls_before = len(calls())
+        stage(report_id, goal, sections, **options)
+        timings[name] = time.perf_counter() - started
+        events.emit(events.StageFinished(stage=name, report_id=report_id, seconds=timings[name]))
+        # Resumed or budgeted runs do only part of a stage's usual work
+        if not options.get("resume_skipped") and options.get("budget") is None:
+            planner.call_history().record_stage(
+                name, len(sections), timings[name], calls()[calls_before:],
+                planner.stage_units(report_id, sections, name)
+            )
+        eta.finished(name, timings[name])
+        if name != selected[-1][0]:
+            events.log(eta.report())
+
+    from llm.telemetry import print_load_report, print_structured_report, print_prompt_cache_report
+    print_load_report()
+    print_structured_report()
+    print_prompt_cache_report()
+    from llm.cascade import print_cascade_report
+    print_cascade_report()
+    import ratelimit
+    ratelimit.print_report()
+    if options.get("budget") is not None:
+        options["budget"].print_report()
+    return timings
+
+def research_report(report_id: str, goal: str, sections: list, precomputed_queries=None, precomputed_links=None) -> dict:
+    """Run every research and writing stage for an existing goal and structure.
+
+    Queries and search results prepared ahead of time (see speculation.py) are reused per section.
+    """
+    timings = run_stages(
+        report_id, goal, sections,
+        precomputed_queries=precomputed_queries, precomputed_links=precomputed_links
+    )
+    import events
+    events.log(f"Research completed with ID: {report_id}\nFinal report: research/{report_id}/final_report.md")
+    return timings
+
+def load_report(report_id: str):
+    """Load the goal and section structure saved for a report. Returns (goal, sections)."""
+    from researcher import base_path
+
+    def read(filename):
+        filepath = os.path.join(base_path, report_id, filename)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            import events
+            events.warning(f"{filepath} not found")
+            return ""
+
+    goal = read("goal.txt")
+    sections = [s.strip() for s in read("structure.txt").split('\n') if s.strip()]
+    return goal, sections
@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+
+import events
+from researcher import base_path
+from llm.telemetry import measured
+from sqlite_store import connect, transaction
+
+# What a report will cost before it runs: LLM calls, tokens, searches, fetches and
+# time per stage and model. Calls per section and tokens per call are calibrated
+# from the telemetry of earlier runs, which every pipeline run adds to; until a
+# stage has history, the priors below are used. The same plan drives a live ETA.
+
+history_path = os.path.join(base_path, ".cache", "telemetry.db")
+
+# Per stage: (call type, model setting, calls per section, prompt tokens, output tokens).
+# Model settings are "module:name" and resolved when a plan is made.
+call_priors = {
+    "queries": [("serp_queries", "researcher.query_designer:local_model", 1, 300, 700)],
+    "interpret": [
+        ("relevance", "researcher.site_contents:local_classification_model", 10, 2500, 300),
+        ("quotes", "researcher.site_contents:local_inference_model", 5, 3000, 700),
+        ("site_insights", "researcher.site_contents:local_inference_model", 5, 3000, 600),
+    ],
+    "insights": [("writer_insight", "writer.insights:local_model", 5, 1500, 900)],
+    "synthesis": [("synthesis", "writer.synthesis:local_model", 1, 5000, 1800)],
+    "quotes": [("quote_integration", "writer.relevant_quote_finder:local_model", 1, 5000, 1800)],
+}
+
+# Call types that are not made while a setting is true: with the site analysis reused,
+# the insights pass only calls the model for learnings written without one
+skipped_when = {"writer_insight": "writer.insights:reuse_site_insights"}
+
+# Searches (links stage) and fetches (content stage) per section before there is history
+unit_priors = {"links": 3, "content": 15}
+# Seconds per search or fetch, and per section for stages without LLM calls or units
+unit_seconds_priors = {"links": 1.0, "content": 1.5}
+stage_seconds_priors = {"folders": 0.0, "final": 0.5}
+
+# Tokens per second (prompt, output) for models without history
+tokens_per_second = {
+    "deepseek-r1:8b": (1500.0, 60.0),
+    "deepseek-r1:32b": (500.0, 20.0),
+}
+default_tokens_per_second = (800.0, 30.0)
+
+# A live ETA scales the remaining plan by how far off the finished stages were, within these bounds
+eta_scale_bounds = (0.25, 4.0)
+
+_history = None
+_history_lock = threading.Lock()
+
+class CallHistory:
+    """Per-stage LLM usage and stage times of earlier runs, summed over all reports."""
+
+    def __init__(self, path: str = history_path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS stage_calls (stage TEXT, call_type TEXT, model TEXT, "
+                "sections INTEGER DEFAULT 0, calls INTEGER DEFAULT 0, prompt_tokens INTEGER DEFAULT 0, "
+                "output_tokens INTEGER DEFAULT 0, prompt_seconds REAL DEFAULT 0, eval_seconds REAL DEFAULT 0, "
+                "PRIMARY KEY (stage, call_type, model))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS stage_runs (stage TEXT PRIMARY KEY, runs INTEGER DEFAULT 0, "
+                "sections INTEGER DEFAULT 0, units INTEGER DEFAULT 0, seconds REAL DEFAULT 0, llm_seconds REAL DEFAULT 0)"
+            )
+
+    def record_stage(self, stage: str, sections: int, seconds: float, calls: list, units: int = 0):
+        """Add one run of `stage` over `sections` sections, with the LLM calls it made."""
+        usage = {}
+        for call in calls:
+            if call["call_type"] == "preload":
+                continue
+            entry = usage.setdefault((call["call_type"], call["model"]), [0, 0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += call["prompt_eval_count"]
+            entry[2] += call["eval_count"]
+            prompt_seconds, eval_seconds = call_seconds(call)
+            entry[3] += prompt_seconds
+            entry[4] += eval_seconds
+        llm_seconds = sum(call["wall_seconds"] for call in calls if call["call_type"] != "preload")
+        with connect(self.path) as db:
+            with transaction(db):
+                for (call_type, model), (count, prompt, output, prompt_seconds, eval_seconds) in usage.items():
+                    db.execute(
+                        "INSERT OR IGNORE INTO stage_calls (stage, call_type, model) VALUES (?, ?, ?)",
+                        (stage, call_type, model)
+                    )
+                    db.execute(
+                        "UPDATE stage_calls SET sections = sections + ?, calls = calls + ?, prompt_tokens = prompt_tokens + ?, "
+                        "output_tokens = output_tokens + ?, prompt_seconds = prompt_seconds + ?, eval_seconds = eval_seconds + ? "
+                        "WHERE stage = ? AND call_type = ? AND model = ?",
+                        (sections, count, prompt, output, prompt_seconds, eval_seconds, stage, call_type, model)
+                    )
+                db.execute("INSERT OR IGNORE INTO stage_runs (stage) VALUES (?)", (stage,))
+                db.execute(
+                    "UPDATE stage_runs SET runs = runs + 1, sections = sections + ?, units = units + ?, "
+                    "seconds = seconds + ?, llm_seconds = llm_seconds + ? WHERE stage = ?",
+                    (sections, units, seconds, llm_seconds, stage)
+                )
+
+    def stage_calls(self, stage: str) -> list:
+        """(call_type, model, sections, calls, prompt_tokens, output_tokens) rows of a stage."""
+        with connect(self.path) as db:
+            return db.execute(
+                "SELECT call_type, model, sections, calls, prompt_tokens, output_tokens FROM stage_calls WHERE stage = ?",
+                (stage,)
+            ).fetchall()
+
+    def stage_run(self, stage: str):
+        """(runs, sections, units, seconds, llm_seconds) of a stage, or None without history."""
+        with connect(self.path) as db:
+            row = db.execute(
+                "SELECT runs, sections, units, seconds, llm_seconds FROM stage_runs WHERE stage = ?", (stage,)
+            ).fetchone()
+        return row if row and row[1] else None
+
+    def rates(self) -> dict:
+        """Measured (prompt, output) tokens per second per model."""
+        with connect(self.path) as db:
+            rows = db.execute(
+                "SELECT model, SUM(prompt_tokens), SUM(prompt_seconds), SUM(output_tokens), SUM(eval_seconds) "
+                "FROM stage_calls GROUP BY model"
+            ).fetchall()
+        measured = {}
+        for model, prompt, prompt_seconds, output, eval_seconds in rows:
+            default_prompt, default_output = tokens_per_second.get(model, default_tokens_per_second)
+            measured[model] = (
+                prompt / prompt_seconds if prompt_seconds else default_prompt,
+                output / eval_seconds if eval_seconds else default_output,
+            )
+        return measured
+
+def call_seconds(call: dict) -> tuple:
+    """(prompt, output) seconds of a recorded call. Calls stopped before Ollama's stats
+    (see llm/client.py) only have their wall time, split by the default rates."""
+    if measured(call):
+        return call["prompt_eval_seconds"], call["eval_seconds"]
+    prompt_rate, output_rate = tokens_per_second.get(call["model"], default_tokens_per_second)
+    prompt, output = call["prompt_eval_count"] / prompt_rate, call["eval_count"] / output_rate
+    scale = call["wall_seconds"] / (prompt + output) if prompt + output else 0.0
+    return prompt * scale, output * scale
+
+def call_history() -> CallHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = CallHistory()
+        return _history
+
+def resolve_setting(setting: str):
+    import importlib
+    module, name = setting.split(":")
+    return getattr(importlib.import_module(module), name)
+
+def skipped(call_type: str) -> bool:
+    return call_type in skipped_when and bool(resolve_setting(skipped_when[call_type]))
+
+def stage_units(report_id: str, sections: list, stage: str) -> int:
+    """Searches run by the links stage or pages fetched by the content stage, read from the report's files."""
+    filename = {"links": "queries.txt", "content": "links.txt"}.get(stage)
+    if filename is None:
+        return 0
+    count = 0
+    for section in sections:
+        path = os.path.join(base_path, report_id, "structured_research", section, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        count += len(lines) - 1 if stage == "links" else sum(line.startswith("http") for line in lines)
+    return count
+
+def llm_seconds(model: str, prompt_tokens: float, output_tokens: float, rates: dict) -> float:
+    prompt_rate, output_rate = rates.get(model) or tokens_per_second.get(model, default_tokens_per_second)
+    return prompt_tokens / prompt_rate + output_tokens / output_rate
+
+def plan_stage(stage: str, sections: int, history: CallHistory, rates: dict) -> dict:
+    """Estimated calls, tokens, searches/fetches and seconds of one stage over `sections` sections."""
+    estimate = {"stage": stage, "calls": [], "units": 0, "seconds": 0.0, "calibrated": False}
+    rows = history.stage_calls(stage)
+    if rows:
+        estimate["calibrated"] = True
+        for call_type, model, seen_sections, calls, prompt, output in rows:
+            if skipped(call_type):
+                continue
+            count = calls / seen_sections * sections
+            estimate["calls"].append((call_type, model, count, count * prompt / calls, count * output / calls))
+    else:
+        for call_type, setting, per_section, prompt, output in call_priors.get(stage, []):
+            if skipped(call_type):
+                continue
+            count = per_section * sections
+            estimate["calls"].append((call_type, resolve_setting(setting), count, count * prompt, count * output))
+    estimate["seconds"] = sum(llm_seconds(model, prompt, output, rates) for _, model, _, prompt, output in estimate["calls"])
+
+    run = history.stage_run(stage)
+    if stage in unit_priors:
+        per_section = run[2] / run[1] if run and run[2] else unit_priors[stage]
+        estimate["units"] = per_section * sections
+    if run:
+        estimate["calibrated"] = True
+        # Time spent outside LLM calls (searching, fetching, file work) per section
+        estimate["seconds"] += max(run[3] - run[4], 0.0) / run[1] * sections
+    elif stage in unit_seconds_priors:
+        estimate["seconds"] += unit_seconds_priors[stage] * estimate["units"]
+    else:
+        estimate["seconds"] += stage_seconds_priors.get(stage, 0.0) * sections
+    return estimate
+
+def plan_report(goal: str, sections: list, stages: list = None) -> list:
+    """Estimate every stage (or the named `stages`) of a report with this goal and structure."""
+    import pipeline
+
+    history = call_history()
+    rates = history.rates()
+    return [plan_stage(stage, len(sections), history, rates) for stage in stages or pipeline.STAGE_NAMES]
+
+def format_duration(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+def print_plan(plan: list, sections: list):
+    """Print the estimate per stage, then totals per model."""
+    lines = [f"Plan for {len(sections)} sections ({'calibrated' if any(s['calibrated'] for s in plan) else 'priors only'}):"]
+    lines.append(f"  {'stage':<10} {'llm calls':>9} {'prompt tok':>10} {'output tok':>10} {'searches':>8} {'fetches':>7} {'time':>7}")
+    per_model = {}
+    for estimate in plan:
+        calls = sum(c[2] for c in estimate["calls"])
+        prompt = sum(c[3] for c in estimate["calls"])
+        output = sum(c[4] for c in estimate["calls"])
+        searches = estimate["units"] if estimate["stage"] == "links" else 0
+        fetches = estimate["units"] if estimate["stage"] == "content" else 0
+        lines.append(
+            f"  {estimate['stage']:<10} {calls:>9.0f} {prompt:>10.0f} {output:>10.0f} {searches:>8.0f} {fetches:>7.0f} "
+            f"{format_duration(estimate['seconds']):>7}" + ("" if estimate["calibrated"] else "  (prior)")
+        )
+        for _, model, count, prompt_tokens, output_tokens in estimate["calls"]:
+            totals = per_model.setdefault(model, [0.0, 0.0, 0.0])
+            totals[0] += count
+            totals[1] += prompt_tokens
+            totals[2] += output_tokens
+    for model, (count, prompt, output) in per_model.items():
+        lines.append(f"  {model}: {count:.0f} calls, {prompt:.0f} prompt + {output:.0f} output tokens")
+    lines.append(f"  Total: about {format_duration(sum(s['seconds'] for s in plan))}")
+    events.log("\n".join(lines))
+
+class ETA:
+    """Remaining time of a run: the plan for the stages still to come, scaled by how the finished ones compared."""
+
+    def __init__(self, plan: list):
+        self.planned = {estimate["stage"]: estimate["seconds"] for estimate in plan}
+        self.actual = {}
+
+    def finished(self, stage: str, seconds: float):
+        self.actual[stage] = seconds
+
+    def remaining(self) -> float:
+        planned_done = sum(self.planned[stage] for stage in self.actual if stage in self.planned)
+        scale = sum(self.actual.values()) / planned_done if planned_done else 1.0
+        low, high = eta_scale_bounds
+        scale = min(max(scale, low), high)
+        return scale * sum(seconds for stage, seconds in self.planned.items() if stage not in self.actual)
+
+    def report(self) -> str:
+        remaining = self.remaining()
+        finish = time.strftime("%H:%M", time.localtime(time.time() + remaining))
+        return f"ETA: about {format_duration(remaining)} left (done around {finish})"
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+import events
+
+# Rate limits per resource as token buckets, and jittered exponential backoff for
+# real errors, in place of fixed sleeps. A request only waits when its resource's
+# bucket is empty; time spent waiting (throttled) or backing off is reported.
+
+# Resource kind -> (requests per second, burst). None: no limit. A resource is
+# "kind" or "kind:name" (e.g. "host:example.com"); each name gets its own bucket.
+rates = {
+    "search": (1.0, 3),          # Custom Search API
+    "host": (2.0, 4),            # each website
+    "ollama": (None, None),      # each Ollama endpoint (local: requests queue on the GPU anyway)
+}
+
+backoff_base_seconds = 1.0
+backoff_max_seconds = 30.0
+
+class TokenBucket:
+    """`rate` tokens per second up to `capacity`; taking a token waits until one is available."""
+
+    def __init__(self, rate: Optional[float], capacity: Optional[int]):
+        self.rate = rate
+        self.capacity = capacity or 1
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens, going into debt if needed. Returns how long the caller must wait."""
+        if self.rate is None:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= cost
+            return max(-self.tokens / self.rate, 0.0)
+
+_buckets = {}
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {"requests": 0, "throttled": 0, "throttled_seconds": 0.0, "backoffs": 0, "backoff_seconds": 0.0})
+
+def kind_of(resource: str) -> str:
+    return resource.split(":", 1)[0]
+
+def bucket(resource: str) -> TokenBucket:
+    with _lock:
+        if resource not in _buckets:
+            _buckets[resource] = TokenBucket(*rates.get(kind_of(resource), (None, None)))
+        return _buckets[resource]
+
+def _account_request(resource: str, wait: float):
+    with _lock:
+        stats = _stats[kind_of(resource)]
+        stats["requests"] += 1
+        if wait > 0:
+            stats["throttled"] += 1
+            stats["throttled_seconds"] += wait
+
+def _account_backoff(resource: str, wait: float):
+    with _lock:
+        stats = _stats[kind_of(resource)]
+        stats["backoffs"] += 1
+        stats["backoff_seconds"] += wait
+
+async def throttle(resource: str, cost: float = 1.0):
+    """Wait until `resource` may take another request."""
+    wait = bucket(resource).reserve(cost)
+    _account_request(resource, wait)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+def throttle_sync(resource: str, cost: float = 1.0):
+    """throttle for blocking callers (e.g. LLM calls made from threads)."""
+    wait = bucket(resource).reserve(cost)
+    _account_request(resource, wait)
+    if wait > 0:
+        time.sleep(wait)
+
+def backoff(attempt: int, base: float = None, cap: float = None) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    base = backoff_base_seconds if base is None else base
+    cap = backoff_max_seconds if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+async def wait_backoff(resource: str, attempt: int, **kwargs):
+    """Back off after a failed request to `resource`."""
+    wait = backoff(attempt, **kwargs)
+    _account_backoff(resource, wait)
+    await asyncio.sleep(wait)
+
+def wait_backoff_sync(resource: str, attempt: int, **kwargs):
+    wait = backoff(attempt, **kwargs)
+    _account_backoff(resource, wait)
+    time.sleep(wait)
+
+def stats() -> dict:
+    with _lock:
+        return {kind: dict(entry) for kind, entry in _stats.items()}
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+def print_report():
+    """Print time spent throttled and backing off per resource kind."""
+    entries = {kind: entry for kind, entry in stats().items() if entry["throttled"] or entry["backoffs"]}
+    if not entries:
+        return
+    lines = ["Rate limits:"]
+    for kind, entry in sorted(entries.items()):
+        lines.append(
+            f"  {kind}: {entry['requests']} requests, {entry['throttled']} throttled ({entry['throttled_seconds']:.1f}s), "
+            f"{entry['backoffs']} backoffs ({entry['backoff_seconds']:.1f}s)"
+        )
+    events.log("\n".join(lines))
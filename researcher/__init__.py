@@ -1,16 +1,15 @@
 import os
-import time
 import asyncio
 from datetime import datetime
-from researcher.query_designer import generate_serp_queries
+
+import events
+
+# Stage dependencies (search client, crawl4ai, LLM client) are imported inside the
+# stage that needs them, so loading this package stays cheap.
 
 # from deep_research_utils.link_scraper import get_links_from_serp
 # TODO: Make the scraper work, too much JUNK in the scrape response for good results
 
-from researcher.search_api_get_links import get_links_from_serp
-from researcher.content_scraper import scrape_links_file
-from researcher.site_contents import process_section
-
 base_path = "research"
 
 def generate_report_id():
@@ -28,16 +27,22 @@ def create_folders(report_id, structure):
         with open(os.path.join(folder_path, "queries.txt"), "w") as f:
             f.write(f"Research queries for: {folder}\n")
 
-def create_serp_queries(report_id, section_structure, goal):
-    """Create a CSV file with SERP queries per section."""
+def create_serp_queries(report_id, section_structure, goal, precomputed=None):
+    """Create a CSV file with SERP queries per section.
+
+    `precomputed` maps sections to SERPQueries generated earlier (e.g. speculatively).
+    """
+    from researcher.query_designer import generate_serp_queries
+
     deep_research_folder = os.path.join(base_path, report_id, "structured_research")
     os.makedirs(deep_research_folder, exist_ok=True)
 
     for section in section_structure:
-        queries = generate_serp_queries(section, goal)
+        queries = (precomputed or {}).get(section) or generate_serp_queries(section, goal)
 
         folder_path = os.path.join(deep_research_folder, section)
         with open(os.path.join(folder_path, "queries.txt"), "w") as f:
+            f.write(f"Research queries for: {section}\n")
             f.write("\n".join(queries.queries))
 
 def save_text_file(report_id, filename, content):
@@ -48,21 +53,29 @@ def save_text_file(report_id, filename, content):
         f.write(content)
 
 
-def gather_links(report_id, section_structure):
-    """Start the scraping process for each section."""
+def gather_links(report_id, section_structure, precomputed=None):
+    """Start the scraping process for each section.
+
+    `precomputed` maps sections to {query: links_and_titles} searched earlier.
+    """
+    from researcher.search_api_get_links import get_links_from_serp
+
     deep_research_folder = os.path.join(base_path, report_id, "structured_research")
     
     async def scrape_section(folder, folder_path):
         """Start the scraping process for each section."""
-        print(f"\nScraping for: {folder}")
         queries_file = os.path.join(folder_path, "queries.txt")
         links_file = os.path.join(folder_path, "links.txt")
         
         with open(queries_file, 'r') as f:
             queries = [q.strip() for q in f.readlines() if q.strip()]
         
+        searched = (precomputed or {}).get(folder) or {}
         for i, query in enumerate(queries[1:], 1):  # Skip header line
-            links_and_titles = await get_links_from_serp(query, links_file)
+            if query in searched and searched[query] != 0:  # 0 marks a failed search
+                links_and_titles = searched[query]
+            else:
+                links_and_titles = await get_links_from_serp(query, links_file)
             # Write formatted output
             if links_and_titles:
                 os.makedirs(os.path.dirname(links_file), exist_ok=True)
@@ -70,9 +83,9 @@ def gather_links(report_id, section_structure):
                 with open(links_file, mode, encoding='utf-8') as f:
                     for title, link in links_and_titles:
                         f.write(f"{title}\n{link}\n\n")
-                print(f"Appended {len(links_and_titles)} links to {links_file}")
+                events.debug(f"Appended {len(links_and_titles)} links to {links_file}")
             else:
-                print(f"No valid links found for query: {query}")
+                events.warning(f"No valid links found for query: {query}")
     
     async def main():
         tasks = []
@@ -82,44 +95,84 @@ def gather_links(report_id, section_structure):
         await asyncio.gather(*tasks)
     
     asyncio.run(main())
-    print("Scraping complete")
 
-def gather_link_content(report_id, section_structure):
-    """Scrape content for all links.txt files in research directory."""
+def gather_link_content(report_id, section_structure, crawler=None, run_async=None, goal="", budget=None):
+    """Scrape content for all links.txt files in research directory.
+
+    A long-lived caller can pass a started `crawler` together with `run_async`, which
+    runs a coroutine on the event loop that crawler belongs to. With a `budget` (see
+    budget.py), links of all sections are fetched most valuable first until the time
+    for fetching runs out.
+    """
+    from researcher.content_scraper import LazyCrawler, scrape_links_file, scrape_links_by_value, write_evidence_meta
+    from researcher import http_fetch
+    from researcher.boilerplate import strip_evidence, print_boilerplate_savings
+    from researcher.fetch_policy import stage_deadline, stats as fetch_stats
+    from researcher.site_contents import local_classification_model
+    from llm import preload_model
+
     deep_research_folder = os.path.join(base_path, report_id, "structured_research")
+
+    # The GPU is idle while pages are fetched: load the interpretation model now
+    preload_model(local_classification_model)
+    fetch_stats.reset()
+    deadline = stage_deadline()
+
+    async def fetch_all(links_files, browser):
+        if budget is not None:
+            for evidence_dir, sources in (await scrape_links_by_value(links_files, goal, budget, browser, deadline)).items():
+                os.makedirs(evidence_dir, exist_ok=True)
+                write_evidence_meta(evidence_dir, sources)
+        else:
+            await asyncio.gather(*(scrape_links_file(links_file, browser, deadline) for links_file in links_files))
     
     async def main():
-        tasks = []
+        links_files = []
         
         for folder in section_structure:
             folder_path = os.path.join(deep_research_folder, folder)
             links_file = os.path.join(folder_path, "links.txt")
             if os.path.exists(links_file):
-                print(f"\nProcessing links from: {folder}")
-                tasks.append(scrape_links_file(links_file))
+                links_files.append(links_file)
         
-        if tasks:
-            await asyncio.gather(*tasks)
+        if not links_files:
+            events.warning("No links.txt files found to process")
+        elif crawler is not None:
+            await fetch_all(links_files, crawler)
         else:
-            print("No links.txt files found to process")
+            # One browser for every section, started only if a page needs it
+            async with LazyCrawler() as browser:
+                await fetch_all(links_files, browser)
+            await http_fetch.close()
     
-    asyncio.run(main())
-    print("Content gathering complete")
+    (run_async or asyncio.run)(main())
+    fetch_stats.print_report()
+
+    # Pages saved before their site's boilerplate was learned are stripped now
+    evidence_dirs = [os.path.join(deep_research_folder, folder, "evidence") for folder in section_structure]
+    print_boilerplate_savings(strip_evidence(evidence_dirs))
+
+def interpret_link_content(report_id, section_structure, goal, next_model=None, resume_skipped=False, budget=None):
+    """Interpret and summarize the content of all scraped links.
+
+    `next_model` is the model used after this stage; it is preloaded while the last
+    interpretation call runs. With `resume_skipped`, only the sources that saturated
+    sections skipped on an earlier run are interpreted. A `budget` (see budget.py)
+    orders sources by expected value and stops interpretation when it runs out.
+    """
+    from researcher.site_contents import interpret_sections, resume_skipped as resume
 
-def interpret_link_content(report_id, section_structure, goal):
-    """Interpret and summarize the content of all scraped links."""
     deep_research_folder = os.path.join(base_path, report_id, "structured_research")
     
+    sections = []
     for folder in section_structure:
         folder_path = os.path.join(deep_research_folder, folder)
         if os.path.exists(folder_path):
-            print(f"\nProcessing section: {folder}")
-            print("=" * 50)
-            # Process section and wait for completion
-            asyncio.run(process_section(folder_path, folder, goal))
-            print(f"Completed section: {folder}")
-            print("=" * 50)
-            # Force pause between sections
-            time.sleep(2)
+            sections.append((folder_path, folder))
     
-    print("Content interpretation complete")
\ No newline at end of file
+    events.log(f"Interpreting evidence of {len(sections)} sections")
+    if resume_skipped:
+        asyncio.run(resume(sections, goal, next_model))
+    else:
+        asyncio.run(interpret_sections(sections, goal, next_model, budget))
+
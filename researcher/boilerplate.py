@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+import events
+
+from llm.telemetry import chars_per_token
+from researcher import base_path
+from researcher.text_processing import split_frontmatter, evidence_text
+from sqlite_store import connect, transaction
+
+# Learn per domain which sentences every page repeats (navigation, cookie banners,
+# newsletter prompts, footers) and drop them from evidence before they reach a prompt.
+
+cache_path = os.path.join(base_path, ".cache", "boilerplate.db")
+remove_boilerplate = True
+
+# A sentence is boilerplate once it was seen on at least `min_pages` pages of its
+# domain and on at least `min_share` of all pages seen from that domain
+min_pages = 3
+min_share = 0.3
+
+_learner = None
+
+def fingerprint(sentence: str) -> str:
+    """Hash of a sentence with case, whitespace and numbers (dates, counts) normalized."""
+    normalized = re.sub(r'\d+', '0', re.sub(r'\s+', ' ', sentence.lower())).strip()
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+def domain_of(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def split_sentences(content: str) -> List[str]:
+    # clean_sentences joins one sentence per paragraph
+    return [s for s in content.split('\n\n') if s.strip()]
+
+class BoilerplateLearner:
+    """Sentence fingerprint counts per domain, persisted across reports in SQLite.
+
+    Each page is counted once per URL, so re-fetching a page does not inflate its
+    sentences. Several processes (pipeline, daemon, workers) can share the file.
+    """
+
+    def __init__(self, path: str = cache_path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS pages (domain TEXT, url TEXT, PRIMARY KEY (domain, url))")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sentences (domain TEXT, fingerprint TEXT, pages INTEGER, "
+                "PRIMARY KEY (domain, fingerprint))"
+            )
+
+    def observe(self, url: str, sentences: List[str]):
+        """Count the distinct sentences of a page unless this URL was counted before."""
+        domain = domain_of(url)
+        fingerprints = {fingerprint(s) for s in sentences}
+        with connect(self.path) as db:
+            with transaction(db):
+                added = db.execute("INSERT OR IGNORE INTO pages VALUES (?, ?)", (domain, url)).rowcount
+                if added:
+                    db.executemany(
+                        "INSERT INTO sentences VALUES (?, ?, 1) "
+                        "ON CONFLICT (domain, fingerprint) DO UPDATE SET pages = pages + 1",
+                        [(domain, fp) for fp in fingerprints]
+                    )
+
+    def boilerplate(self, domain: str, sentences: List[str]) -> set:
+        """Fingerprints among `sentences` that recur often enough on `domain` to drop."""
+        fingerprints = list({fingerprint(s) for s in sentences})
+        with connect(self.path) as db:
+            total = db.execute("SELECT COUNT(*) FROM pages WHERE domain = ?", (domain,)).fetchone()[0]
+            if total < min_pages:
+                return set()
+            threshold = max(min_pages, min_share * total)
+            found = set()
+            # Stay under SQLite's bound parameter limit on very long pages
+            for i in range(0, len(fingerprints), 500):
+                batch = fingerprints[i:i + 500]
+                rows = db.execute(
+                    f"SELECT fingerprint FROM sentences WHERE domain = ? AND pages >= ? "
+                    f"AND fingerprint IN ({','.join('?' * len(batch))})",
+                    (domain, threshold, *batch)
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def strip(self, url: str, content: str) -> Tuple[str, int]:
+        """Drop known boilerplate sentences. Returns (content, characters removed)."""
+        sentences = split_sentences(content)
+        repeated = self.boilerplate(domain_of(url), sentences)
+        if not repeated:
+            return content, 0
+        kept = [s for s in sentences if fingerprint(s) not in repeated]
+        stripped = '\n\n'.join(kept)
+        return stripped, len(content) - len(stripped)
+
+def learner() -> BoilerplateLearner:
+    global _learner
+    if _learner is None:
+        _learner = BoilerplateLearner()
+    return _learner
+
+def learn_and_strip(url: str, content: str) -> Tuple[str, int]:
+    """Count a freshly scraped page, then strip what its domain is known to repeat."""
+    if not remove_boilerplate:
+        return content, 0
+    learner().observe(url, split_sentences(content))
+    return learner().strip(url, content)
+
+def strip_evidence(evidence_dirs: List[str]) -> Dict[str, dict]:
+    """Re-strip saved evidence with everything learned so far. Returns savings per domain.
+
+    The first pages from a domain are written before its boilerplate is known; this
+    pass catches them once the whole batch has been counted.
+    """
+    paths = []
+    for evidence_dir in evidence_dirs:
+        if os.path.isdir(evidence_dir):
+            paths += [os.path.join(evidence_dir, f) for f in sorted(os.listdir(evidence_dir)) if f.endswith('.md')]
+    return strip_evidence_files(paths)
+
+def strip_evidence_files(paths: List[str]) -> Dict[str, dict]:
+    """strip_evidence for specific evidence files."""
+    savings = defaultdict(lambda: {"pages": 0, "chars": 0})
+    if not remove_boilerplate:
+        return {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            metadata, content = split_frontmatter(f.read())
+        url = metadata.get("source")
+        if not url:
+            continue
+        content, removed = learner().strip(url, content)
+        total_removed = int(metadata.get("boilerplate_removed", 0)) + removed
+        if removed:
+            metadata["boilerplate_removed"] = str(total_removed)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(evidence_text(metadata, content))
+        stats = savings[domain_of(url)]
+        stats["pages"] += 1
+        stats["chars"] += total_removed
+    return dict(savings)
+
+def print_boilerplate_savings(savings: Dict[str, dict]):
+    """Print characters and estimated prompt tokens removed per domain."""
+    removed = {domain: stats for domain, stats in savings.items() if stats["chars"]}
+    if not removed:
+        return
+    lines = ["Boilerplate removed:"]
+    for domain, stats in sorted(removed.items(), key=lambda item: -item[1]["chars"]):
+        lines.append(f"  {domain}: {stats['chars']} chars (~{round(stats['chars'] / chars_per_token)} tokens) from {stats['pages']} pages")
+    total = sum(stats["chars"] for stats in removed.values())
+    lines.append(f"  Total: ~{round(total / chars_per_token)} tokens less per pass over the evidence "
+                 f"(relevance, quotes and insights each read it)")
+    events.log("\n".join(lines))
@@ -1,67 +1,122 @@
 import os
 import asyncio
-from crawl4ai import AsyncWebCrawler
-from typing import List, Tuple
+import time
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+from typing import List, Optional, Tuple
 import json
-import re
 
-def clean_sentences(content: str) -> str:
-    """Clean and ensure complete sentences."""
-    # First clean markdown
-    content = clean_markdown(content)
-    
-    # Split into sentences (considering ellipsis and common abbreviations)
-    sentences = re.findall(r'[^.!?]+[.!?](?:\s|$)', content)
-    
-    # Filter out incomplete sentences and clean each sentence
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        # Check if it's a complete sentence (starts with capital, ends with punctuation)
-        if (sentence and 
-            sentence[0].isupper() and 
-            sentence[-1] in '.!?' and
-            len(sentence.split()) > 3):  # Minimum word count for meaningful sentence
-            cleaned_sentences.append(sentence)
-    
-    return '\n\n'.join(cleaned_sentences)
+import events
+from events import SourceFetched
 
-def clean_markdown(content: str) -> str:
-    """Clean markdown content by removing links but keeping link text."""
-    # Remove inline links but keep text: [text](url) -> text
-    content = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', content)
-    
-    # Remove reference-style links at bottom of document
-    content = re.sub(r'^\[[^\]]+\]:\s*http.*$', '', content, flags=re.MULTILINE)
-    
-    # Remove plain URLs
-    content = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', content)
-    
-    # Remove empty lines created by link removal
-    content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
-    
-    return content.strip()
+from researcher.text_processing import clean_markdown, clean_sentences, clean_page, evidence_text
+from researcher.boilerplate import learn_and_strip
+from researcher.local_search import evidence_index
+from researcher.domains import domain_history
+from researcher.fetch_policy import PermanentFetchError, FetchNotAttempted, guarded_fetch, stats as fetch_stats
+from researcher import http_fetch
 
-async def scrape_url(url: str, crawler: AsyncWebCrawler) -> Tuple[str, str, dict]:
-    """Scrape a single URL and return its content."""
-    try:
-        result = await crawler.arun(url=url)
-        cleaned_content = clean_sentences(result.markdown)
-        return url, cleaned_content, {"success": True, "error": None}
-    except Exception as e:
-        return url, "", {"success": False, "error": str(e)}
+class LazyCrawler:
+    """An AsyncWebCrawler whose browser is only started when a page first needs it.
 
-async def scrape_links_file(links_file_path: str):
-    """Scrape all URLs from a links file and save results."""
-    if not os.path.exists(links_file_path):
-        print(f"Links file not found: {links_file_path}")
-        return
+    Most pages are fetched without a browser (see http_fetch.py), so a stage that
+    never falls back to one never pays its startup time or memory.
+    """
 
-    # Create evidence directory
-    evidence_dir = os.path.join(os.path.dirname(links_file_path), "evidence")
-    os.makedirs(evidence_dir, exist_ok=True)
+    def __init__(self):
+        self.crawler = None
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.crawler is not None:
+            crawler, self.crawler = self.crawler, None
+            await crawler.__aexit__(*exc)
+        return False
+
+    async def arun(self, *args, **kwargs):
+        async with self.lock:
+            if self.crawler is None:
+                crawler = AsyncWebCrawler()
+                await crawler.__aenter__()
+                self.crawler = crawler
+        return await self.crawler.arun(*args, **kwargs)
+
+def stored_evidence(url: str) -> Optional[str]:
+    """Evidence text an earlier report saved for `url`, when searching the local index."""
+    from researcher.search_api_get_links import SEARCH_BACKEND
+
+    if SEARCH_BACKEND == "google":
+        return None
+    return evidence_index().stored_content(url)
+
+def light_fetch_config() -> CrawlerRunConfig:
+    """Crawler settings for domains known to be slow or flaky: no waiting for late
+    scripts or images, and a short page timeout."""
+    return CrawlerRunConfig(wait_until="domcontentloaded", page_timeout=15000, exclude_all_images=True)
+
+async def scrape_url(url: str, crawler: AsyncWebCrawler, deadline: Optional[float] = None) -> Tuple[str, str, dict]:
+    """Scrape a single URL and return its content.
+
+    The fetch is bounded by the request timeout and the stage `deadline` (a
+    time.monotonic() value), and retried, hedged and broken per host as set in fetch_policy.
+    """
+    stored = await asyncio.to_thread(stored_evidence, url)
+    if stored:
+        return url, stored, {"success": True, "error": None, "stored": True}
+    light = await asyncio.to_thread(lambda: domain_history().use_light_fetch(url))
+    plain = http_fetch.enabled and not await asyncio.to_thread(lambda: domain_history().needs_browser(url))
+    judged = False
+
+    async def fetch() -> Tuple[str, str, bool]:
+        """One attempt (or hedge). Returns (markdown, the tier that fetched it, whether it fell back to the browser)."""
+        nonlocal judged
+        # A plain HTTP fetch first, unless the domain is known to need the browser
+        if plain:
+            markdown, complete = await http_fetch.fetch_markdown(url)
+            # A URL counts once towards its domain's plain-fetch record, however many attempts it takes
+            if complete and not judged:
+                judged = True
+                await asyncio.to_thread(lambda: domain_history().record_http_fetch(url, markdown is not None))
+            if markdown is not None:
+                return markdown, "http", False
+        result = await crawler.arun(url=url, config=light_fetch_config() if light else None)
+        if getattr(result, "success", True) is False:
+            status = getattr(result, "status_code", None) or 0
+            error = getattr(result, "error_message", None) or f"status {status}"
+            if 400 <= status < 500 and status not in (408, 429):
+                raise PermanentFetchError(error)
+            raise RuntimeError(error)
+        return result.markdown or "", "browser", plain
+
+    started = time.monotonic()
+    try:
+        markdown, tier, fell_back = await guarded_fetch(url, fetch, deadline)
+        # Large pages are cleaned in a worker process so other fetches keep going
+        cleaned_content = await clean_page(markdown)
+        info = {"success": True, "error": None}
+    except FetchNotAttempted as e:
+        # Nothing was learned about the domain: keep it out of the domain history
+        return url, "", {"success": False, "error": str(e), "not_attempted": True}
+    except Exception as e:
+        cleaned_content, info = "", {"success": False, "error": str(e) or type(e).__name__}
+    if light:
+        info["light_fetch"] = True
+    if cleaned_content:
+        info["tier"] = tier
+        fetch_stats.counts["browser_fetches" if tier == "browser" else "http_fetches"] += 1
+        if fell_back:
+            fetch_stats.counts["browser_fallbacks"] += 1
+    seconds = time.monotonic() - started
+    await asyncio.to_thread(
+        lambda: domain_history().record_fetch(url, bool(cleaned_content), seconds, len(cleaned_content))
+    )
+    events.emit(SourceFetched(url=url, ok=bool(cleaned_content), seconds=seconds, chars=len(cleaned_content), error=info["error"]))
+    return url, cleaned_content, info
 
-    # Read and parse links file
+def read_links_file(links_file_path: str) -> List[Tuple[str, str]]:
+    """Parse a links.txt file into (title, url) pairs."""
     links = []
     current_title = None
     with open(links_file_path, 'r', encoding='utf-8') as f:
@@ -74,42 +129,120 @@ async def scrape_links_file(links_file_path: str):
                 current_title = None
             elif line:
                 current_title = line
+    return links
 
-    sources = []
+async def scrape_link(idx: int, title: str, url: str, evidence_dir: str, crawler: AsyncWebCrawler,
+                      deadline: Optional[float] = None) -> Optional[dict]:
+    """Scrape one link into its evidence file. Returns the source's metadata, or None if nothing was retrieved."""
+    result = await scrape_url(url, crawler, deadline)
+    if not result[1]:  # No content was retrieved
+        return None
+
+    # Create sanitized filename
+    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+    safe_title = safe_title[:100]  # Limit filename length
     
-    async with AsyncWebCrawler() as crawler:
-        for idx, (title, url) in enumerate(links, 1):
-            print(f"\nScraping ({idx}/{len(links)}): {title}")
-            
-            result = await scrape_url(url, crawler)
-            if result[1]:  # If content was retrieved
-                # Create sanitized filename
-                safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-                safe_title = safe_title[:100]  # Limit filename length
-                
-                # Save individual content file
-                content_path = os.path.join(evidence_dir, f"{idx:02d}-{safe_title}.md")
-                with open(content_path, 'w', encoding='utf-8') as f:
-                    f.write(f"---\ntitle: {title}\nsource: {url}\n---\n\n")
-                    f.write(result[1])
-                
-                sources.append({
-                    "id": idx,
-                    "title": title,
-                    "url": url,
-                    "file": f"{idx:02d}-{safe_title}.md",
-                    "scrape_info": result[2]
-                })
-                print(f"Successfully scraped: {title}")
-            else:
-                print(f"Failed to scrape: {title}")
-
-        # Save metadata
-        meta_path = os.path.join(evidence_dir, "evidence.meta.json")
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                "total_sources": len(sources),
-                "sources": sources
-            }, f, indent=2)
-
-    print(f"\nAll content saved to: {evidence_dir}")
\ No newline at end of file
+    # Drop navigation, banners and footers this site is known to repeat
+    content, removed = await asyncio.to_thread(learn_and_strip, url, result[1])
+    metadata = {"title": title, "source": url}
+    if removed:
+        metadata["boilerplate_removed"] = removed
+
+    # Save individual content file
+    os.makedirs(evidence_dir, exist_ok=True)
+    content_path = os.path.join(evidence_dir, f"{idx:02d}-{safe_title}.md")
+    with open(content_path, 'w', encoding='utf-8') as f:
+        f.write(evidence_text(metadata, content))
+    # Make the new page searchable by later reports right away
+    await asyncio.to_thread(lambda: evidence_index().add(content_path))
+    
+    return {
+        "id": idx,
+        "title": title,
+        "url": url,
+        "file": f"{idx:02d}-{safe_title}.md",
+        "scrape_info": result[2]
+    }
+
+async def scrape_links(links: List[Tuple[str, str]], evidence_dir: str, crawler: AsyncWebCrawler,
+                       deadline: Optional[float] = None) -> List[dict]:
+    """Scrape (title, url) pairs into evidence files. Returns the metadata of each saved source."""
+    sources = []
+    for idx, (title, url) in enumerate(links, 1):
+        events.debug(f"Scraping ({idx}/{len(links)}): {title}")
+        source = await scrape_link(idx, title, url, evidence_dir, crawler, deadline)
+        if source:
+            sources.append(source)
+    return sources
+
+async def scrape_links_by_value(links_files: List[str], goal: str, budget, crawler: AsyncWebCrawler,
+                                deadline: Optional[float] = None) -> dict:
+    """Scrape the links of several sections, most valuable first, while the budget allows.
+
+    Links are ranked by expected value (see budget.py); a section's value drops as it
+    gathers sources. Returns {evidence_dir: [source metadata]}.
+    """
+    from budget import expected_value, serp_rank, target_terms
+
+    pending = []
+    for links_file in links_files:
+        evidence_dir = os.path.join(os.path.dirname(links_file), "evidence")
+        targets = target_terms(os.path.basename(os.path.dirname(links_file)), goal)
+        for idx, (title, url) in enumerate(read_links_file(links_file), 1):
+            pending.append((evidence_dir, idx, title, url, targets))
+    rates = await asyncio.to_thread(lambda: {item[3]: domain_history().value(item[3]) for item in pending})
+    fetched = {os.path.join(os.path.dirname(links_file), "evidence"): [] for links_file in links_files}
+
+    def value(item) -> float:
+        evidence_dir, idx, title, url, targets = item
+        return expected_value(serp_rank(idx), title, targets, rates[url], len(fetched[evidence_dir]))
+
+    async def fetch_next():
+        # One fetcher per section, as without a budget, all taking from the same ranking
+        while pending and budget.allows("content"):
+            item = max(pending, key=value)
+            pending.remove(item)
+            evidence_dir, idx, title, url, _ = item
+            events.debug(f"Scraping ({idx}, value {value(item):.2f}): {title}")
+            source = await scrape_link(idx, title, url, evidence_dir, crawler, deadline)
+            if source:
+                fetched[evidence_dir].append(source)
+
+    await asyncio.gather(*(fetch_next() for _ in links_files))
+    if pending:
+        events.log(f"Out of time for fetching: skipped {len(pending)} lower-value links")
+        budget.skip("content", len(pending))
+    return {evidence_dir: sorted(sources, key=lambda s: s["id"]) for evidence_dir, sources in fetched.items()}
+
+def write_evidence_meta(evidence_dir: str, sources: List[dict]):
+    meta_path = os.path.join(evidence_dir, "evidence.meta.json")
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "total_sources": len(sources),
+            "sources": sources
+        }, f, indent=2)
+
+async def scrape_links_file(links_file_path: str, crawler: AsyncWebCrawler = None, deadline: Optional[float] = None):
+    """Scrape all URLs from a links file and save results.
+
+    Pass an already started `crawler` to reuse its browser; otherwise one is started
+    and closed for this file.
+    """
+    if not os.path.exists(links_file_path):
+        events.warning(f"Links file not found: {links_file_path}")
+        return
+
+    # Create evidence directory
+    evidence_dir = os.path.join(os.path.dirname(links_file_path), "evidence")
+    os.makedirs(evidence_dir, exist_ok=True)
+
+    links = read_links_file(links_file_path)
+
+    if crawler is not None:
+        sources = await scrape_links(links, evidence_dir, crawler, deadline)
+    else:
+        async with LazyCrawler() as crawler:
+            sources = await scrape_links(links, evidence_dir, crawler, deadline)
+
+    write_evidence_meta(evidence_dir, sources)
+    events.debug(f"All content saved to: {evidence_dir}")
\ No newline at end of file
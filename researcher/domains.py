@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+from researcher import base_path
+from researcher.boilerplate import domain_of
+from sqlite_store import connect, transaction
+
+# What each domain's pages turned out to be worth: fetch success, fetch latency,
+# cleaned length and how often they passed the relevance check. Kept across reports
+# in SQLite and used to skip, deprioritize or fetch more cheaply from poor domains.
+# Counts decay with age so a domain that was broken for a while can recover.
+
+cache_path = os.path.join(base_path, ".cache", "domains.db")
+
+# Counts lose half their weight after this many days
+half_life_days = 30
+# Decayed observations needed before a domain is judged at all
+min_observations = 3
+# Skip a domain's links when fewer of its fetches succeed, or fewer of its pages are relevant
+skip_below_success = 0.2
+skip_below_relevance = 0.1
+# ...or when its pages clean down to less than this on average (paywalls, consent walls)
+skip_below_chars = 300
+# Fetch with the light crawler settings below this success rate or above this latency
+light_below_success = 0.6
+slow_fetch_seconds = 10.0
+# Interpret a domain's pages after the others below this relevance pass rate
+poor_below_relevance = 0.4
+# Go straight to the browser when fewer of the domain's plain HTTP fetches returned a complete page
+browser_below_http_complete = 0.5
+
+counters = ["fetches", "failures", "fetch_seconds", "chars", "interpreted", "relevant", "http_fetches", "http_complete"]
+
+_history = None
+_history_lock = threading.Lock()
+
+class DomainHistory:
+    """Decayed per-domain fetch and relevance outcomes, shared by every process that uses the cache."""
+
+    def __init__(self, path: str = cache_path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS domain_stats (domain TEXT PRIMARY KEY, "
+                + ", ".join(f"{name} REAL DEFAULT 0" for name in counters) + ", updated REAL)"
+            )
+            # Caches written before a counter existed get its column added
+            columns = {row[1] for row in db.execute("PRAGMA table_info(domain_stats)")}
+            for name in counters:
+                if name not in columns:
+                    db.execute(f"ALTER TABLE domain_stats ADD COLUMN {name} REAL DEFAULT 0")
+
+    @staticmethod
+    def _decayed(row, now: float) -> dict:
+        if row is None:
+            return dict.fromkeys(counters, 0.0)
+        *values, updated = row
+        weight = 0.5 ** ((now - (updated or now)) / (half_life_days * 86400))
+        return {name: value * weight for name, value in zip(counters, values)}
+
+    def _add(self, url: str, **increments):
+        domain, now = domain_of(url), time.time()
+        with connect(self.path) as db:
+            with transaction(db):
+                row = db.execute(
+                    f"SELECT {', '.join(counters)}, updated FROM domain_stats WHERE domain = ?", (domain,)
+                ).fetchone()
+                stats = self._decayed(row, now)
+                for name, value in increments.items():
+                    stats[name] += value
+                db.execute(
+                    f"INSERT OR REPLACE INTO domain_stats (domain, {', '.join(counters)}, updated) "
+                    f"VALUES (?, {', '.join('?' for _ in counters)}, ?)",
+                    (domain, *(stats[name] for name in counters), now)
+                )
+
+    def record_fetch(self, url: str, success: bool, seconds: float, chars: int):
+        self._add(url, fetches=1, failures=0 if success else 1, fetch_seconds=seconds, chars=chars)
+
+    def record_relevance(self, url: str, relevant: bool):
+        self._add(url, interpreted=1, relevant=int(relevant))
+
+    def record_http_fetch(self, url: str, complete: bool):
+        """Whether a plain HTTP fetch (see http_fetch.py) returned the whole page."""
+        self._add(url, http_fetches=1, http_complete=int(complete))
+
+    def stats(self, url: str) -> dict:
+        """Decayed counts for the URL's domain as of now."""
+        with connect(self.path) as db:
+            row = db.execute(
+                f"SELECT {', '.join(counters)}, updated FROM domain_stats WHERE domain = ?", (domain_of(url),)
+            ).fetchone()
+        return self._decayed(row, time.time())
+
+    def relevance_rate(self, url: str) -> float:
+        """Smoothed share of the domain's pages that were relevant; 0.5 for an unknown domain."""
+        stats = self.stats(url)
+        return (stats["relevant"] + 1) / (stats["interpreted"] + 2)
+
+    def success_rate(self, url: str) -> float:
+        """Smoothed share of the domain's fetches that returned content."""
+        stats = self.stats(url)
+        return (stats["fetches"] - stats["failures"] + 1) / (stats["fetches"] + 2)
+
+    def value(self, url: str) -> float:
+        """Chance that a link from this domain ends up as relevant evidence."""
+        return self.success_rate(url) * self.relevance_rate(url)
+
+    def should_skip(self, url: str) -> bool:
+        stats = self.stats(url)
+        if stats["fetches"] >= min_observations:
+            successes = stats["fetches"] - stats["failures"]
+            if successes < skip_below_success * stats["fetches"] or stats["chars"] < skip_below_chars * successes:
+                return True
+        return stats["interpreted"] >= min_observations and stats["relevant"] < skip_below_relevance * stats["interpreted"]
+
+    def use_light_fetch(self, url: str) -> bool:
+        stats = self.stats(url)
+        if stats["fetches"] < min_observations:
+            return False
+        successes = stats["fetches"] - stats["failures"]
+        slow = successes > 0 and stats["fetch_seconds"] / stats["fetches"] > slow_fetch_seconds
+        return slow or successes < light_below_success * stats["fetches"]
+
+    def needs_browser(self, url: str) -> bool:
+        """The domain's pages need the headless browser: plain HTTP fetches kept coming back incomplete."""
+        stats = self.stats(url)
+        return stats["http_fetches"] >= min_observations and stats["http_complete"] < browser_below_http_complete * stats["http_fetches"]
+
+    def is_poor(self, url: str) -> bool:
+        stats = self.stats(url)
+        return stats["interpreted"] >= min_observations and stats["relevant"] < poor_below_relevance * stats["interpreted"]
+
+def domain_history() -> DomainHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = DomainHistory()
+        return _history
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlparse
+
+import events
+import ratelimit
+
+# Bounds on how long fetching a page may take: a timeout per request and per stage,
+# a few retries with jittered backoff, an optional hedged second request for slow
+# pages and a circuit breaker per host. Latencies are kept for a percentile report.
+
+request_timeout_seconds = 45.0
+stage_timeout_seconds = 900.0
+max_attempts = 3
+backoff_base_seconds = 1.0
+backoff_max_seconds = 10.0
+# Start a second, parallel request if the first has not answered after this long (None: never)
+hedge_after_seconds: Optional[float] = 15.0
+# Consecutive failures that open a host's breaker, and how long it then stays open
+breaker_failures = 3
+breaker_cooldown_seconds = 120.0
+
+class PermanentFetchError(Exception):
+    """A failure retrying will not fix (e.g. 404)."""
+
+class FetchNotAttempted(Exception):
+    """No request was made: the stage is out of time or the host's breaker is open.
+    Says nothing about the page or its domain."""
+
+class CircuitBreaker:
+    """Stops requests to a host after repeated failures; one probe is let through after a cooldown."""
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if not self.probing and now - self.opened_at >= breaker_cooldown_seconds:
+            self.probing = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self, now: float):
+        self.failures += 1
+        self.probing = False
+        if self.failures >= breaker_failures:
+            self.opened_at = now
+
+class FetchStats:
+    """Per-URL fetch latencies and outcome counts since the last reset."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.latencies = []
+        self.counts = Counter()
+
+    def percentile(self, share: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+    def print_report(self):
+        if not self.latencies and not self.counts:
+            return
+        report = (
+            f"Fetch latency over {len(self.latencies)} fetches: p50 {self.percentile(0.5):.2f}s, "
+            f"p90 {self.percentile(0.9):.2f}s, p99 {self.percentile(0.99):.2f}s, max {max(self.latencies, default=0.0):.2f}s"
+        )
+        if self.counts:
+            report += "\n  " + ", ".join(f"{name.replace('_', ' ')} {count}" for name, count in sorted(self.counts.items()))
+        events.log(report)
+
+T = TypeVar("T")
+
+breakers = defaultdict(CircuitBreaker)
+stats = FetchStats()
+
+def stage_deadline() -> float:
+    """Monotonic time by which a fetching stage starting now must be done."""
+    return time.monotonic() + stage_timeout_seconds
+
+async def hedged(fetch: Callable[[], Awaitable[T]], timeout: float) -> T:
+    """Run `fetch`, adding a second concurrent try if the first is slow. First success wins."""
+    started = time.monotonic()
+    tasks = {asyncio.ensure_future(fetch())}
+    try:
+        if hedge_after_seconds is not None and hedge_after_seconds < timeout:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after_seconds)
+            if not done:
+                stats.counts["hedged"] += 1
+                tasks.add(asyncio.ensure_future(fetch()))
+        error = None
+        while tasks:
+            remaining = timeout - (time.monotonic() - started)
+            done, tasks = await asyncio.wait(tasks, timeout=max(remaining, 0), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise asyncio.TimeoutError()
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def guarded_fetch(url: str, fetch: Callable[[], Awaitable[T]], deadline: Optional[float] = None) -> T:
+    """Fetch a URL within the request and stage deadlines, retrying and honouring the host's breaker.
+
+    `fetch` starts one request and returns its result (the page's markdown, or a
+    tuple with it). Returns the first successful result. Raises the last error when
+    every attempt failed, or FetchNotAttempted when no request was made at all.
+    """
+    host = urlparse(url).netloc.lower()
+    breaker = breakers[host]
+    started = None
+    error = None
+    try:
+        for attempt in range(1, max_attempts + 1):
+            now = time.monotonic()
+            remaining = request_timeout_seconds if deadline is None else min(request_timeout_seconds, deadline - now)
+            if remaining <= 0:
+                stats.counts["stage_deadline"] += 1
+                if error is not None:
+                    raise error
+                raise FetchNotAttempted("fetching stage is out of time")
+            if not breaker.allow(now):
+                stats.counts["breaker_open"] += 1
+                if error is not None:
+                    raise error
+                raise FetchNotAttempted(f"circuit open for {host}")
+            started = started or now
+            await ratelimit.throttle(f"host:{host}")
+            try:
+                markdown = await hedged(fetch, remaining)
+            except PermanentFetchError:
+                # The page is gone, not the host
+                stats.counts["errors"] += 1
+                raise
+            except Exception as e:
+                error = e
+                stats.counts["timeouts" if isinstance(e, asyncio.TimeoutError) else "errors"] += 1
+                breaker.failure(time.monotonic())
+                if attempt < max_attempts:
+                    stats.counts["retries"] += 1
+                    await ratelimit.wait_backoff(f"host:{host}", attempt, base=backoff_base_seconds, cap=backoff_max_seconds)
+                continue
+            breaker.success()
+            return markdown
+        raise error
+    finally:
+        if started is not None:
+            stats.latencies.append(time.monotonic() - started)
@@ -0,0 +1,145 @@
+import asyncio
+import re
+import weakref
+from typing import Optional, Tuple
+
+import httpx
+
+import events
+
+# A plain HTTP tier in front of the headless browser. Static articles, plain text and
+# PDFs are fetched with a pooled keep-alive client and converted to markdown the way
+# crawl4ai converts a rendered page; only pages whose HTML does not hold their text
+# (script-built pages, bot challenges) go to the browser. Domains whose pages keep
+# needing the browser skip this tier (see needs_browser in domains.py).
+
+enabled = True
+timeout_seconds = 15.0
+connect_timeout_seconds = 5.0
+max_connections = 50
+max_keepalive_connections = 20
+# Larger responses are left to the browser
+max_bytes = 5_000_000
+headers = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/pdf,text/plain;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# A page is complete when its paragraphs (lines of at least `paragraph_words` words)
+# hold at least `min_prose_words` words; navigation and script shells do not
+min_prose_words = 150
+paragraph_words = 12
+
+CHALLENGE = re.compile(
+    r"<title>\s*(just a moment|attention required|access denied)|cf-browser-verification|"
+    r"checking (if the site connection is secure|your browser)|g-recaptcha|hcaptcha",
+    flags=re.IGNORECASE
+)
+
+# One client per event loop: pooled connections belong to the loop that opened them
+_clients = weakref.WeakKeyDictionary()
+
+def new_client(transport: httpx.AsyncBaseTransport = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=headers,
+        follow_redirects=True,
+        timeout=httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+        transport=transport,
+    )
+
+def client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = new_client()
+    return _clients[loop]
+
+async def close():
+    """Close the running loop's client, if one was opened."""
+    started = _clients.pop(asyncio.get_running_loop(), None)
+    if started is not None:
+        await started.aclose()
+
+def prose_words(markdown: str) -> int:
+    return sum(
+        len(words) for words in (line.split() for line in markdown.splitlines())
+        if len(words) >= paragraph_words
+    )
+
+def looks_complete(markdown: str, html: str = "") -> bool:
+    """Whether text fetched without a browser holds the page's content."""
+    return not CHALLENGE.search(html[:20000]) and prose_words(markdown) >= min_prose_words
+
+def decode(body: bytes, encoding: str) -> str:
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def html_markdown(url: str, html: str) -> str:
+    """Markdown of an HTML page, by the same scraping and markdown strategies the crawler uses."""
+    from crawl4ai import WebScrapingStrategy, DefaultMarkdownGenerator
+
+    cleaned = WebScrapingStrategy().scrap(url, html).cleaned_html
+    return DefaultMarkdownGenerator().generate_markdown(input_html=cleaned, base_url=url).raw_markdown
+
+def pdf_text(data: bytes) -> str:
+    """Text of a PDF, or "" when pypdf is not installed or cannot read it."""
+    try:
+        from io import BytesIO
+        from pypdf import PdfReader
+    except ImportError:
+        return ""
+    try:
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(BytesIO(data)).pages)
+    except Exception as e:
+        events.debug(f"Could not read PDF: {e}")
+        return ""
+
+async def fetch_markdown(url: str) -> Tuple[Optional[str], bool]:
+    """Fetch a page without the browser. Returns (markdown, judged).
+
+    markdown is None when the page needs the browser: an error status, a body this
+    tier cannot read, or text that does not look complete. judged is True only when
+    an HTML or text page was downloaded and converted, so its completeness says
+    something about the domain; network errors, error statuses, oversized bodies and
+    other types say nothing.
+    """
+    try:
+        async with client().stream("GET", url) as response:
+            if response.status_code != 200:
+                events.debug(f"HTTP {response.status_code} without browser: {url}")
+                return None, False
+            if int(response.headers.get("content-length") or 0) > max_bytes:
+                return None, False
+            body = bytearray()
+            async for part in response.aiter_bytes():
+                body += part
+                if len(body) > max_bytes:
+                    return None, False
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            encoding = response.encoding or "utf-8"
+    except httpx.HTTPError as e:
+        events.debug(f"Plain fetch failed ({type(e).__name__}): {url}")
+        return None, False
+
+    html = ""
+    try:
+        if content_type in ("text/html", "application/xhtml+xml", ""):
+            html = decode(body, encoding)
+            markdown = await asyncio.to_thread(html_markdown, url, html)
+        elif content_type in ("text/plain", "text/markdown"):
+            markdown = decode(body, encoding)
+        elif content_type == "application/pdf":
+            markdown = await asyncio.to_thread(pdf_text, bytes(body))
+            return (markdown if looks_complete(markdown) else None), False
+        else:
+            return None, False
+    except Exception as e:
+        events.debug(f"Could not convert {content_type} page ({e}): {url}")
+        return None, False
+    return (markdown if looks_complete(markdown, html) else None), True
@@ -0,0 +1,139 @@
+import glob
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+
+import events
+from researcher import base_path
+from researcher.text_processing import split_frontmatter
+from sqlite_store import connect, transaction
+
+# BM25 search over every evidence file scraped so far, kept in an SQLite FTS5 index.
+# Lets research reuse past scrapes instead of spending Custom Search quota, and run
+# with no network at all.
+
+index_path = os.path.join(base_path, ".cache", "evidence_index.db")
+evidence_glob = os.path.join(base_path, "*", "structured_research", "*", "evidence", "*.md")
+
+_index = None
+_index_lock = threading.Lock()
+
+def query_terms(query: str) -> List[str]:
+    """Plain words of a search query; operators and punctuation are dropped."""
+    return [term for term in re.findall(r'\w+', query.lower()) if len(term) > 1]
+
+class EvidenceIndex:
+    """Inverted index of evidence files, one entry per source URL (the newest copy wins)."""
+
+    def __init__(self, path: str = index_path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, path TEXT UNIQUE, "
+                "url TEXT, title TEXT, mtime REAL, size INTEGER)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS documents_url ON documents (url)")
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS evidence USING fts5(title, content, tokenize='porter unicode61')"
+            )
+
+    def add(self, path: str) -> bool:
+        """Index or re-index one evidence file if it changed. Returns True if it was (re)indexed."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        with connect(self.path) as db:
+            row = db.execute("SELECT id, mtime, size FROM documents WHERE path = ?", (path,)).fetchone()
+            if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+                return False
+            with open(path, 'r', encoding='utf-8') as f:
+                metadata, content = split_frontmatter(f.read())
+            url = metadata.get("source")
+            if not url:
+                return False
+            with transaction(db):
+                if row:
+                    db.execute("DELETE FROM evidence WHERE rowid = ?", (row[0],))
+                    db.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                cursor = db.execute(
+                    "INSERT INTO documents (path, url, title, mtime, size) VALUES (?, ?, ?, ?, ?)",
+                    (path, url, metadata.get("title", url), stat.st_mtime, stat.st_size)
+                )
+                db.execute(
+                    "INSERT INTO evidence (rowid, title, content) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, metadata.get("title", ""), content)
+                )
+        return True
+
+    def remove_missing(self) -> int:
+        """Drop entries whose file no longer exists."""
+        with connect(self.path) as db:
+            gone = [(doc_id,) for doc_id, path in db.execute("SELECT id, path FROM documents") if not os.path.exists(path)]
+            db.executemany("DELETE FROM evidence WHERE rowid = ?", gone)
+            db.executemany("DELETE FROM documents WHERE id = ?", gone)
+        return len(gone)
+
+    def update(self, pattern: str = evidence_glob) -> int:
+        """Bring the index up to date with the evidence on disk. Only changed files are read."""
+        changed = sum(self.add(path) for path in glob.glob(pattern))
+        removed = self.remove_missing()
+        if changed or removed:
+            events.log(f"Evidence index: {changed} files indexed, {removed} removed")
+        return changed
+
+    def _match(self, expression: str, limit: int) -> List[Tuple[str, str]]:
+        with connect(self.path) as db:
+            rows = db.execute(
+                "SELECT documents.title, documents.url, documents.mtime FROM evidence "
+                "JOIN documents ON documents.id = evidence.rowid "
+                "WHERE evidence MATCH ? ORDER BY bm25(evidence) LIMIT ?",
+                (expression, limit * 4)
+            ).fetchall()
+        # The same URL may be stored by several reports; keep its best-ranked copy
+        results, seen = [], set()
+        for title, url, _ in rows:
+            if url not in seen:
+                seen.add(url)
+                results.append((title, url))
+        return results[:limit]
+
+    def search(self, query: str, limit: int, broad: bool = False) -> List[Tuple[str, str]]:
+        """Best (title, url) matches for a query, ranked by BM25.
+
+        Sources containing every query term come first. With `broad`, the rest is filled
+        with sources matching any term, which suits offline runs where nothing else is
+        available.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        quoted = [f'"{term}"' for term in terms]
+        results = self._match(" AND ".join(quoted), limit)
+        if broad and len(results) < limit:
+            urls = {url for _, url in results}
+            results += [hit for hit in self._match(" OR ".join(quoted), limit) if hit[1] not in urls]
+        return results[:limit]
+
+    def stored_content(self, url: str) -> Optional[str]:
+        """Most recently saved evidence text for a URL, if any."""
+        with connect(self.path) as db:
+            rows = db.execute("SELECT path FROM documents WHERE url = ? ORDER BY mtime DESC", (url,)).fetchall()
+        for (path,) in rows:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return split_frontmatter(f.read())[1]
+            except FileNotFoundError:
+                continue
+        return None
+
+def evidence_index() -> EvidenceIndex:
+    """The process-wide index, synced with the evidence on disk the first time it is used."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EvidenceIndex()
+            _index.update()
+        return _index
@@ -1,57 +1,66 @@
 from typing import List, Optional
 from pydantic import BaseModel
-from ollama import generate
-import re
-import time
+import events
+from llm import structured_call, cascade
 
 local_model = 'deepseek-r1:32b'
 
 class SERPQueries(BaseModel):
     queries: List[str]
 
-def clean_response(response_str: str) -> str:
-    """Extract only the JSON content between ```json and ``` markers."""
-    pattern = r'```json\s*(.*?)\s*```'
-    match = re.search(pattern, response_str, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    return response_str.strip()
+def distinct_queries(result: Optional[SERPQueries]) -> bool:
+    """Cascade check: at least two distinct, non-empty queries."""
+    return result is not None and len({q.strip().lower() for q in result.queries if q.strip()}) >= 2
 
-def generate_serp_queries(section, goal, attempt=0, max_attempts=5) -> SERPQueries:
+def generate_serp_queries(section, goal, max_attempts=3, quiet=False) -> SERPQueries:
     """
-    Recursively try to generate valid SERP queries until successful or max attempts reached.
+    Generate SERP queries for a section, falling back to basic queries if no valid answer comes back.
+    `quiet` suppresses streamed output (for background use).
     """
-    if attempt >= max_attempts:
+    prompt = (
+        f"Given the report Section you are working on and the Research Goal detail the Google search queries to find the most specific information to inform the goal.\n"
+        f"Make sure each query is specific and relevant to the Section\n" f"limit the queries to around three (3) items.\n\n"
+        f"Section: {section}\n"
+        f"Research Goal: {goal}\n\n"
+        f"IMPERATIVE OBJECTIVE: Generate EXACTLY one JSON object with a string list of queries in a `queries` field"
+    )
+
+    if not quiet:
+        events.log(f"Generating queries for: {section}")
+    queries = cascade.run("serp_queries", local_model, lambda model: structured_call(
+        "serp_queries", model, SERPQueries, prompt=prompt, max_attempts=max_attempts, echo=not quiet
+    )[0], distinct_queries)
+    if queries is None:
         # Fallback to basic queries if all attempts fail
         return SERPQueries(queries=[
             f"research {section}",
             f"how to {section.lower()}",
             f"best practices {section.lower()}"
         ])
+    return queries
 
+def generate_followup_queries(section, goal, draft, previous_queries, max_attempts=3) -> List[str]:
+    """Queries for what the current draft of a section still lacks, excluding ones already searched."""
     prompt = (
-        f"Given the report Section you are working on and the Research Goal detail the Google search queries to find the most specific information to inform the goal.\n"
-        f"Make sure each query is specific and relevant to the Section\n" f"limit the queries to around three (3) items.\n\n"
+        f"You are improving one section of a research report. Read the current draft and identify the gaps: "
+        f"claims without evidence, missing figures, open questions and angles the Research Goal needs that are not covered.\n"
+        f"Detail around three (3) Google search queries that would fill the most important gaps. "
+        f"Do not repeat the queries already searched.\n\n"
         f"Section: {section}\n"
         f"Research Goal: {goal}\n\n"
+        f"Queries already searched:\n" + "\n".join(f"- {q}" for q in previous_queries) + "\n\n"
+        f"Current draft:\n{draft[:6000]}\n\n"
         f"IMPERATIVE OBJECTIVE: Generate EXACTLY one JSON object with a string list of queries in a `queries` field"
     )
 
-    try:
-        response = ""
-        print(f"\nAttempt {attempt + 1}/{max_attempts} for: {section}")
-        
-        for part in generate(local_model, prompt, stream=True):
-            response += part.get('response', '')
-            print(part.get('response', ''), end='')
-
-        cleaned = clean_response(response)
-        return SERPQueries.model_validate_json(cleaned)
-
-    except Exception as e:
-        print(f"\nAttempt {attempt + 1} failed: {str(e)}")
-        time.sleep(1)  # Brief pause before retry
-        return generate_serp_queries(section, goal, attempt + 1, max_attempts)
+    events.log(f"Generating follow-up queries for: {section}")
+    queries = cascade.run("followup_queries", local_model, lambda model: structured_call(
+        "followup_queries", model, SERPQueries, prompt=prompt, max_attempts=max_attempts, echo=True
+    )[0], distinct_queries)
+    if queries is None:
+        return []
+    searched = {q.strip().lower() for q in previous_queries}
+    return [q.strip() for q in queries.queries if q.strip() and q.strip().lower() not in searched]
 
 if __name__ == "__main__":
     sections = [
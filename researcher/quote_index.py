@@ -0,0 +1,118 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import Optional
+
+from llm.telemetry import chars_per_token
+
+# Collapses repeated quotes: the same sentence extracted from two overlapping chunks,
+# or the same statement syndicated across several sources. Exact repeats are found by
+# a hash of the normalized text, near-duplicates (reworded punctuation, a sentence cut
+# short at a chunk border) by overlap of word shingles. Each group keeps its fullest
+# verbatim text and every source it was attributed to. A quote that is only contained
+# in a longer one is merged only from the source of that longer text, so no source is
+# cited for words its page did not have.
+
+# Words per shingle, and the overlap that makes two quotes the same quote: Jaccard
+# similarity, or the share of the shorter quote's shingles found in the longer one
+shingle_words = 3
+min_similarity = 0.8
+min_containment = 0.9
+
+def normalize(text: str) -> str:
+    """Lowercase words only: case, punctuation, quote marks and whitespace do not matter."""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+def quote_hash(text: str) -> str:
+    return hashlib.blake2b(normalize(text).encode(), digest_size=8).hexdigest()
+
+def shingles(text: str) -> set:
+    words = normalize(text).split()
+    if len(words) <= shingle_words:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+
+class QuoteIndex:
+    """Groups of duplicate quotes with their attributions, built one quote at a time."""
+
+    def __init__(self):
+        self.groups = []
+        self.by_hash = {}
+        self.by_shingle = defaultdict(set)
+        self.added = 0
+        self.removed_chars = 0
+
+    def _near_duplicate(self, grams: set, attribution: Optional[dict]) -> Optional[int]:
+        candidates = defaultdict(int)
+        for gram in grams:
+            for group_id in self.by_shingle.get(gram, ()):
+                candidates[group_id] += 1
+        for group_id, shared in sorted(candidates.items(), key=lambda item: -item[1]):
+            group = self.groups[group_id]
+            other = group["shingles"]
+            union = len(grams) + len(other) - shared
+            if shared / union >= min_similarity:
+                return group_id
+            # Containment (a quote cut short) only within the source of the group's text
+            if shared / min(len(grams), len(other)) >= min_containment and attribution == group["source"]:
+                return group_id
+        return None
+
+    def add(self, text: str, attribution: dict = None, item=None, validated: bool = True) -> bool:
+        """Index a quote, with where it came from and an optional payload. True if it was new.
+
+        `validated` is False for quotes not found verbatim in their source; such a quote
+        never replaces a verbatim one, however long.
+        """
+        self.added += 1
+        digest = quote_hash(text)
+        grams = shingles(text)
+        group_id = self.by_hash.get(digest)
+        if group_id is None and grams:
+            group_id = self._near_duplicate(grams, attribution)
+        if group_id is None:
+            group_id = len(self.groups)
+            self.groups.append({
+                "text": text, "item": item, "validated": validated, "source": attribution,
+                "attributions": [], "count": 0, "shingles": grams,
+            })
+            new = True
+        else:
+            group = self.groups[group_id]
+            if (validated, len(text)) > (group["validated"], len(group["text"])):
+                # Keep the verbatim, fuller version, e.g. the one not cut at a chunk border
+                self.removed_chars += len(group["text"])
+                group.update(
+                    text=text, item=item, validated=validated, source=attribution, shingles=group["shingles"] | grams
+                )
+            else:
+                self.removed_chars += len(text)
+            new = False
+        group = self.groups[group_id]
+        group["count"] += 1
+        self.by_hash[digest] = group_id
+        for gram in grams:
+            self.by_shingle[gram].add(group_id)
+        if attribution is not None and attribution not in group["attributions"]:
+            group["attributions"].append(attribution)
+        return new
+
+    def unique(self) -> list:
+        """(text, item, attributions) of every group, in first-seen order. The source of
+        the kept text comes first among the attributions."""
+        return [
+            (group["text"], group["item"], sorted(group["attributions"], key=lambda a: a != group["source"]))
+            for group in self.groups
+        ]
+
+    @property
+    def removed_tokens(self) -> int:
+        return round(self.removed_chars / chars_per_token)
+
+    def summary(self) -> dict:
+        return {
+            "quotes": self.added,
+            "unique": len(self.groups),
+            "duplicates": self.added - len(self.groups),
+            "removed_tokens": self.removed_tokens,
+        }
@@ -0,0 +1,105 @@
+import json
+import os
+import re
+from collections import deque
+from typing import List
+
+import events
+
+# Per-section novelty tracking. Search results are interpreted in rank order; once
+# the last few sources add almost no quotes or concepts the section already has, the
+# rest are skipped and recorded in saturation.json so they can be resumed later.
+
+stop_on_saturation = True
+# Sources always interpreted before a section can count as saturated
+min_documents = 6
+# Sliding window of most recent sources whose average novelty is checked
+window = 4
+# Saturated when the window's average share of new quotes and concepts drops below this
+min_novelty = 0.15
+# Sources per section interpreted between novelty checks
+batch_size = 3
+
+state_filename = "saturation.json"
+
+STOPWORDS = set(
+    "about above after again against among because been before being below between could "
+    "does doing during each further having however might other should since their there "
+    "these those through under until which while would years within without where".split()
+)
+
+def normalize_quote(quote: str) -> str:
+    return re.sub(r'[^a-z0-9 ]', '', re.sub(r'\s+', ' ', quote.lower())).strip()
+
+def concepts(text: str) -> set:
+    """Content words of a text, a cheap stand-in for the concepts it covers."""
+    return {word for word in re.findall(r'[a-z][a-z\-]{4,}', text.lower()) if word not in STOPWORDS}
+
+class NoveltyTracker:
+    """How much each interpreted source adds to what a section already has."""
+
+    def __init__(self):
+        self.quotes = set()
+        self.concepts = set()
+        self.history = []
+        self.recent = deque(maxlen=window)
+
+    def seed(self, quotes: List[str], insights: str = ""):
+        """Count a source the section already had as known, without recording its novelty."""
+        self.quotes |= {normalize_quote(q) for q in quotes if q.strip()}
+        self.concepts |= concepts(" ".join(quotes) + " " + (insights or ""))
+
+    def add(self, quotes: List[str], insights: str = "") -> float:
+        """Record a source's quotes and insights. Returns the share of them that was new."""
+        quote_keys = {normalize_quote(q) for q in quotes if q.strip()}
+        words = concepts(" ".join(quotes) + " " + (insights or ""))
+        total = len(quote_keys) + len(words)
+        new = len(quote_keys - self.quotes) + len(words - self.concepts)
+        novelty = new / total if total else 0.0
+        self.quotes |= quote_keys
+        self.concepts |= words
+        self.history.append(round(novelty, 3))
+        self.recent.append(novelty)
+        return novelty
+
+    @property
+    def saturated(self) -> bool:
+        if not stop_on_saturation or len(self.history) < min_documents or len(self.recent) < window:
+            return False
+        return sum(self.recent) / len(self.recent) < min_novelty
+
+def state_path(section_path: str) -> str:
+    return os.path.join(section_path, state_filename)
+
+def load_state(section_path: str) -> dict:
+    path = state_path(section_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def record(section_path: str, tracker: NoveltyTracker, skipped: List[str]):
+    """Save a section's novelty history and the evidence files it skipped (saturated or out of budget)."""
+    state = load_state(section_path)
+    state["novelty"] = state.get("novelty", []) + tracker.history
+    state["saturated"] = tracker.saturated or bool(state.get("saturated") and not tracker.history)
+    state["skipped"] = sorted(set(state.get("skipped", [])) | {os.path.basename(path) for path in skipped})
+    with open(state_path(section_path), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    if skipped:
+        reason = "saturated" if tracker.saturated else "out of budget"
+        events.log(f"Skipped {len(skipped)} sources after {len(tracker.history)} ({reason}), see {state_path(section_path)}")
+
+def is_saturated(section_path: str) -> bool:
+    return bool(load_state(section_path).get("saturated"))
+
+def skipped_evidence(section_path: str) -> List[str]:
+    return [os.path.join(section_path, "evidence", name) for name in load_state(section_path).get("skipped", [])]
+
+def mark_resumed(section_path: str, resumed: List[str]):
+    state = load_state(section_path)
+    names = {os.path.basename(path) for path in resumed}
+    state["skipped"] = [name for name in state.get("skipped", []) if name not in names]
+    state["saturated"] = False
+    with open(state_path(section_path), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
@@ -1,9 +1,14 @@
 import os
 import asyncio
-from googleapiclient.discovery import build
+import threading
 from dotenv import load_dotenv
+import events
+import ratelimit
 
 number_results = 5
+# Attempts per search when the API answers with a rate-limit or server error
+max_attempts = 4
+retry_statuses = {429, 500, 502, 503, 504}
 
 # Load environment variables, prioritizing .env.local
 load_dotenv('.env.local')  # Load .env.local first
@@ -11,31 +16,89 @@ load_dotenv('.env.example')        # Fall back to .env if variables not found
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 SEARCH_ENGINE_ID = os.getenv("SEARCH_ENGINE_ID")
+# Optional override of the Custom Search host (e.g. a local stand-in for benchmarks)
+SEARCH_API_ENDPOINT = os.getenv("SEARCH_API_ENDPOINT")
+# Where links come from: "google" (Custom Search API), "local-first" (the index of
+# evidence scraped by earlier reports, topped up from Google when it has too few
+# matches) or "local" (the index only; needs no network)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "google")
+
+# Service objects are not thread-safe, so each thread builds and keeps its own
+_local = threading.local()
+
+def search_service():
+    """The Custom Search service for this thread, built on first use and reused after."""
+    if getattr(_local, "service", None) is None:
+        # The discovery client is slow to import; only pay for it when searching
+        from googleapiclient.discovery import build
+
+        client_options = {"api_endpoint": SEARCH_API_ENDPOINT} if SEARCH_API_ENDPOINT else None
+        _local.service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY, client_options=client_options)
+    return _local.service
 
 async def get_links_from_serp(query: str, output_file: str):
+    """Search for a query with the configured backend. Returns (title, link) pairs, or 0 if the search failed."""
+    if SEARCH_BACKEND == "google":
+        return await get_links_from_google(query)
+
+    from researcher.local_search import evidence_index
+
+    local = await asyncio.to_thread(evidence_index().search, query, number_results, SEARCH_BACKEND == "local")
+    if SEARCH_BACKEND == "local" or len(local) >= number_results:
+        events.debug(f"Found {len(local)} stored sources for: {query}")
+        return local
+
+    remote = await get_links_from_google(query)
+    if not remote:
+        return local or remote
+    urls = {link for _, link in local}
+    return (local + [(title, link) for title, link in remote if link not in urls])[:number_results]
+
+async def get_links_from_google(query: str):
     """Use Google Custom Search API to get search results and save formatted links/titles."""
+    from researcher.domains import domain_history
+
     try:
-        # Create a service object
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
-        
-        # Execute the search with num parameter to limit results
-        result = service.cse().list(q=query, cx=SEARCH_ENGINE_ID, num=number_results).execute()
+        result = await search_with_retries(query)
         
         # Extract and format results
         links_and_titles = []
+        skipped = 0
         if 'items' in result:
             for item in result['items'][:number_results]:  # Double ensure limit of 3
                 title = item['title']
                 link = item['link']
-                if not any(bad in link.lower() for bad in ['youtube.com', 'facebook.com']):
-                    links_and_titles.append((title, link))
+                if any(bad in link.lower() for bad in ['youtube.com', 'facebook.com']):
+                    continue
+                # Domains whose pages keep failing to scrape or keep being irrelevant
+                if await asyncio.to_thread(lambda: domain_history().should_skip(link)):
+                    skipped += 1
+                    continue
+                links_and_titles.append((title, link))
+        if skipped:
+            events.log(f"Skipped {skipped} links from poorly performing domains for: {query}")
 
         return links_and_titles
         
     except Exception as e:
-        print(f"Error during API search: {str(e)}")
+        events.warning(f"Error during API search: {str(e)}")
         return 0
 
-    finally:
-        # Add small delay between requests to respect rate limits
-        await asyncio.sleep(1)
+def retryable(error: Exception) -> bool:
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return int(status) in retry_statuses if status is not None else isinstance(error, (TimeoutError, ConnectionError))
+
+async def search_with_retries(query: str) -> dict:
+    """One Custom Search request within the search rate limit, retried with backoff on rate-limit and server errors."""
+    for attempt in range(1, max_attempts + 1):
+        await ratelimit.throttle("search")
+        try:
+            # Execute the search with num parameter to limit results
+            return await asyncio.to_thread(
+                lambda: search_service().cse().list(q=query, cx=SEARCH_ENGINE_ID, num=number_results).execute()
+            )
+        except Exception as e:
+            if attempt == max_attempts or not retryable(e):
+                raise
+            events.debug(f"Search attempt {attempt} failed ({e}), retrying: {query}")
+            await ratelimit.wait_backoff("search", attempt)
@@ -1,126 +1,459 @@
 import os
 import gc
+import time
+import asyncio
 import re
-from ollama import generate
+from typing import Optional
+import events
+from events import SourceInterpreted
+from llm import generate, structured_call, ModelScheduler, cascade
+from researcher import saturation
+from researcher.saturation import NoveltyTracker
+from researcher.domains import domain_history
+from researcher.quote_index import QuoteIndex
+from researcher.text_processing import split_frontmatter
 from .content_chunker import chunk_content, log_memory_usage
-from .quote_processor import extract_quotes, Quote
+from .quote_processor import extract_quotes, validate_quote, Quote
+from .prompts import document_prompt, document_window, relevance_task, insights_task, analysis_task, combined_task, with_quotes
 from .file_handlers import (
-    RelevanceCheck, initialize_learning_file, 
-    append_quote, insert_insights
+    RelevanceCheck, ChunkInterpretation, initialize_learning_file, 
+    append_quote, insert_insights, read_learning
 )
 
 local_classification_model = 'deepseek-r1:8b'
 local_inference_model = 'deepseek-r1:8b'
 
-async def check_relevance(content: str, section: str, goal: str) -> RelevanceCheck:
-    """Determine if the content is relevant to the research goals."""
-    print("\n=== Starting Relevance Check ===")
-    
-    prompt = (
-        f"Analyze whether the source contains information relevant to informing the goal of the research:\n\n"
-        f"REPORT SECTION: {section}\n"
-        f"RESEARCH GOAL: {goal}\n\n"
-        f"Return EXACTLY one JSON object in a code block with:\n"
-        f"- `is_relevant`: boolean\n"
-        f"- `confidence`: float (0-1)\n"
-        f"- `reason`: brief explanation\n\n"
-        f"CONTENT:\n{content[:4000]}..."
-    )
+relevance_attempts = 5
+# Interpret sources whose relevance check never parsed rather than dropping them
+keep_unverified_sources = True
+# One structured call per chunk returning relevance, quotes and a partial insight,
+# instead of separate relevance, quote and insight passes (see interpret_combined)
+combined_interpretation = False
+# Write site insights as the writer's detailed per-source analysis, so the insights
+# pass can reuse them instead of making a large-model call per learning (see writer/insights.py)
+writer_ready_insights = True
 
-    try:
-        print("Generating relevance response...")
-        response = generate(local_classification_model, prompt, stream=False)
-        json_str = response['response'].strip().split('```json')[-1].split('```')[0].strip()
-        return RelevanceCheck.model_validate_json(json_str)
-
-    except Exception as e:
-        print(f"Relevance check failed: {str(e)}")
-        return RelevanceCheck(
-            is_relevant=False,
-            confidence=0.0,
-            reason="Failed to generate valid relevance check"
-        )
+async def check_relevance(content: str, section: str, goal: str) -> Optional[RelevanceCheck]:
+    """Determine if the content is relevant to the research goals. None if no valid answer came back."""
+    prompt = document_prompt(section, goal, content, relevance_task)
 
-async def generate_insights(content: str, section: str, goal: str) -> str:
-    """Generate insights from content."""
-    print("\n=== Starting Insights Generation ===")
-    
-    prompt = (
-        f"You are analyzing research content for insights.\n"
-        f"Write a clear, concise paragraph explaining how this content contributes to:\n\n"
-        f"SECTION: {section}\n"
-        f"RESEARCH GOAL: {goal}\n\n"
-        f"Focus only on relevant insights. Be specific and practical.\n\n"
-        f"CONTENT:\n{content[:2000]}..."
+    relevance = cascade.run("relevance", local_classification_model, lambda model: structured_call(
+        "relevance", model, RelevanceCheck, prompt=prompt, max_attempts=relevance_attempts
+    )[0], cascade.confident)
+    if relevance is None:
+        events.warning("Relevance check failed: no valid answer after retries")
+    return relevance
+
+def unverified_relevance() -> Optional[RelevanceCheck]:
+    """Stand-in for a relevance check that never parsed; None means skip the source."""
+    if not keep_unverified_sources:
+        return None
+    return RelevanceCheck(
+        is_relevant=True,
+        confidence=0.0,
+        reason="Relevance check returned no valid answer; kept unverified"
     )
 
-    response_data = generate(local_inference_model, prompt, stream=False)
-    insights = response_data['response'].strip()
+async def generate_insights(content: str, section: str, goal: str, quotes: list = None) -> str:
+    """Generate insights from content.
+
+    As the writer's analysis (writer_ready_insights), the insights also see `quotes`
+    extracted from the whole document, not only its first window.
+    """
+    task = with_quotes(analysis_task, quotes or []) if writer_ready_insights else insights_task
+    prompt = document_prompt(section, goal, content, task)
+
+    insights = cascade.run("site_insights", local_inference_model, lambda model: generate(
+        model, prompt, call_type="site_insights"
+    )['response'].strip(), cascade.long_enough)
     return re.sub(r'<think>.*?</think>', '', insights, flags=re.DOTALL)
 
-async def interpret_evidence_file(evidence_path: str, section: str, goal: str):
-    """Process a single evidence file."""
-    print(f"\n{'='*50}")
-    print(f"Processing: {os.path.basename(evidence_path)}")
-    print(f"{'='*50}")
-    
-    log_memory_usage("start")
-    
-    print(f"Reading evidence file: {evidence_path}")
+async def interpret_chunk(chunk: str, section: str, goal: str, chunk_prog: str) -> Optional[ChunkInterpretation]:
+    """Relevance, quotes and a partial insight for one chunk in a single call. None if no valid answer came back."""
+    prompt = document_prompt(section, goal, chunk, combined_task)
+    result = cascade.run("combined", local_inference_model, lambda model: structured_call(
+        "combined", model, ChunkInterpretation, prompt=prompt, max_attempts=relevance_attempts
+    )[0], lambda result: cascade.confident(result) and cascade.quotes_validated(result.quotes, chunk))
+    if result is None:
+        events.debug(f"No valid combined answer for chunk {chunk_prog}")
+    return result
+
+async def merge_chunks(chunks: list, results: list):
+    """Merge per-chunk combined answers into (relevance, quotes per chunk, insights).
+
+    The first chunk decides relevance, as the relevance pass only reads that much.
+    Quotes and partial insights of chunks the model itself judged irrelevant are
+    dropped; repeated quotes from overlapping chunks are kept once.
+    """
+    first = results[0] if results else None
+    relevance = None if first is None else RelevanceCheck(
+        is_relevant=first.is_relevant, confidence=first.confidence, reason=first.reason
+    )
+    seen = set()
+    chunk_quotes = []
+    insights = []
+    for chunk, result in zip(chunks, results):
+        quotes = []
+        if result is not None and (result is first or is_relevant(result)):
+            for text in result.quotes:
+                key = ' '.join(text.split()).lower()
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                quotes.append(Quote(text=text, validated=await validate_quote(text, chunk)))
+            insight = re.sub(r'<think>.*?</think>', '', result.insight, flags=re.DOTALL).strip()
+            if insight and insight not in insights:
+                insights.append(insight)
+        chunk_quotes.append(quotes)
+    return relevance, chunk_quotes, "\n\n".join(insights)
+
+async def interpret_combined(content: str, section: str, goal: str):
+    """Interpret a document with one combined call per chunk. Returns (relevance, quotes per chunk, insights).
+
+    The rest of the document is only read when its first chunk is relevant.
+    """
+    chunks = await asyncio.to_thread(chunk_content, content, document_window)
+    results = [await interpret_chunk(chunk, section, goal, f"1 of {len(chunks)}") for chunk in chunks[:1]]
+    first = results[0] if results else None
+    # A first chunk whose answer never parsed is read on like a relevant one when unverified sources are kept
+    if (first is not None and is_relevant(first)) or (first is None and keep_unverified_sources):
+        for i, chunk in enumerate(chunks[1:], 2):
+            results.append(await interpret_chunk(chunk, section, goal, f"{i} of {len(chunks)}"))
+    return await merge_chunks(chunks, results)
+
+def read_evidence_file(evidence_path: str):
+    """Read an evidence file and split its frontmatter. Returns (metadata, content)."""
     with open(evidence_path, 'r', encoding='utf-8') as f:
         raw_content = f.read()
-    
-    metadata = {}
-    content = raw_content
-    if content.startswith('---'):
-        try:
-            print("Extracting metadata...")
-            header = content.split('---', 2)[1]
-            content = content.split('---', 2)[2].strip()
-            for line in header.strip().split('\n'):
-                if ': ' in line:
-                    key, value = line.split(': ', 1)
-                    metadata[key.strip()] = value.strip()
-        except Exception as e:
-            print(f"Failed to parse metadata: {e}")
-            pass
-
-    relevance = await check_relevance(content, section, goal)
-    if not (relevance.is_relevant and relevance.confidence > 0.7):
-        print(f"\033[91mSkipped irrelevant content:\033[0m {relevance.reason}")
-        return
+    return split_frontmatter(raw_content)
+
+def is_relevant(relevance: RelevanceCheck) -> bool:
+    return relevance.is_relevant and relevance.confidence > 0.7
 
-    print("\033[92mContent is relevant. Processing chunks...\033[0m")
+def learnings_path_for(evidence_path: str) -> str:
     learnings_dir = os.path.join(os.path.dirname(os.path.dirname(evidence_path)), "learnings")
-    print(f"Creating learnings directory: {learnings_dir}")
     os.makedirs(learnings_dir, exist_ok=True)
-    
     base_filename = os.path.basename(evidence_path).replace('.md', '')
-    learnings_path = os.path.join(learnings_dir, f"{base_filename}.md")
-    print(f"Target learning file path: {learnings_path}")
-    
-    print("Initializing learning file...")
-    await initialize_learning_file(learnings_path, metadata, relevance)
-    
-    chunks = chunk_content(content)
-    for i, chunk in enumerate(chunks, 1):
-        quotes = await extract_quotes(chunk, section, goal, f"{i} of {len(chunks)}")
+    return os.path.join(learnings_dir, f"{base_filename}.md")
+
+async def write_learning(evidence_path: str, metadata: dict, relevance: RelevanceCheck, chunk_quotes: list, insights: str, analysis: bool = False):
+    """Write the learning file for a relevant source from its extracted quotes and insights.
+
+    `analysis` marks insights written with the writer's analysis task, which the insights pass may reuse.
+    """
+    learnings_path = learnings_path_for(evidence_path)
+    await initialize_learning_file(learnings_path, metadata, relevance, "analysis" if analysis else "summary")
+    # Overlapping chunks often yield the same quote twice
+    index = QuoteIndex()
+    for quotes in chunk_quotes:
         for quote in quotes:
-            await append_quote(learnings_path, quote)
-    
-    insights = await generate_insights(content, section, goal)
+            index.add(quote.text, item=quote, validated=quote.validated)
+    for _, quote, _ in index.unique():
+        await append_quote(learnings_path, quote)
     await insert_insights(learnings_path, insights)
+    events.debug(
+        f"Wrote learnings: {os.path.basename(learnings_path)}"
+        + (f" ({index.added - len(index.groups)} duplicate quotes dropped)" if index.added > len(index.groups) else "")
+    )
+
+async def interpret_sections(sections: list, goal: str, next_model: str = None, budget=None):
+    """Interpret every evidence file of the given (section_path, section_name) pairs."""
+    paths = []
+    for section_path, section_name in sections:
+        evidence_dir = os.path.join(section_path, "evidence")
+        if not os.path.exists(evidence_dir):
+            continue
+        for filename in sorted(os.listdir(evidence_dir)):
+            if filename.endswith('.md'):
+                paths.append((os.path.join(evidence_dir, filename), section_name))
+    await interpret_files(paths, goal, next_model, budget=budget)
+
+def seed_trackers(trackers: dict, queues: dict):
+    """Seed each section's novelty tracker with the learnings it already has (earlier
+    rounds, a resumed run), leaving out those of the sources about to be interpreted again."""
+    for section_path, tracker in trackers.items():
+        learnings_dir = os.path.join(section_path, "learnings")
+        if not os.path.isdir(learnings_dir):
+            continue
+        queued = {os.path.basename(document[0]) for document in queues[section_path]}
+        for filename in sorted(os.listdir(learnings_dir)):
+            if not filename.endswith('.md') or filename in queued:
+                continue
+            try:
+                tracker.seed(*read_learning(os.path.join(learnings_dir, filename)))
+            except OSError as e:
+                events.warning(f"Could not read learning {filename}: {e}")
+
+def link_index(evidence_path: str) -> int:
+    """Position of an evidence file's link in its links file, from the file name."""
+    prefix = os.path.basename(evidence_path).split('-', 1)[0]
+    return int(prefix) if prefix.isdigit() else 1
+
+async def interpret_files(paths: list, goal: str, next_model: str = None, stop_when_saturated: bool = True, budget=None):
+    """Interpret the given (evidence_path, section_name) pairs.
+
+    Each section's sources are taken in rank order, a few at a time, and a section
+    stops once its recent sources add too little new (see saturation.py). With a
+    `budget` (see budget.py), the most valuable sources of all sections go first and
+    no new batch starts once interpretation is out of time or tokens. Sources left
+    over are recorded in their section's saturation.json.
+    """
+    # Reading and parsing files runs in threads so it never holds up the loop
+    loaded = await asyncio.gather(*(asyncio.to_thread(read_evidence_file, path) for path, _ in paths))
+    queues = {}
+    for (evidence_path, section_name), (metadata, content) in zip(paths, loaded):
+        section_path = os.path.dirname(os.path.dirname(evidence_path))
+        queues.setdefault(section_path, []).append((evidence_path, section_name, metadata, content))
+    # Pages from domains that are rarely relevant go last, where saturation or the budget can drop them
+    poor = await asyncio.to_thread(lambda: {
+        document[0] for queue in queues.values() for document in queue
+        if domain_history().is_poor(document[2].get("source", ""))
+    })
+    for queue in queues.values():
+        queue.sort(key=lambda document: document[0] in poor)
+    trackers = {section_path: NoveltyTracker() for section_path in queues}
+    await asyncio.to_thread(seed_trackers, trackers, queues)
+    covered = {section_path: 0 for section_path in queues}
+
+    def active(section_path: str) -> bool:
+        return bool(queues[section_path]) and not (stop_when_saturated and trackers[section_path].saturated)
+
+    if budget is not None:
+        from budget import expected_value, serp_rank, target_terms
+
+        documents = [document for queue in queues.values() for document in queue]
+        rates = await asyncio.to_thread(
+            lambda: {path: domain_history().value(metadata.get("source", "")) for path, _, metadata, _ in documents}
+        )
+        targets = {section_path: target_terms(queue[0][1], goal) for section_path, queue in queues.items()}
+
+        def value(section_path: str, document) -> float:
+            evidence_path, _, _, content = document
+            return expected_value(
+                serp_rank(link_index(evidence_path)), content, targets[section_path], rates[evidence_path], covered[section_path]
+            )
+
+    while True:
+        sections = [section_path for section_path in queues if active(section_path)]
+        if budget is not None:
+            pending = sum(len(queues[s]) for s in sections)
+            size = budget.affordable("interpret", min(pending, saturation.batch_size * len(sections)))
+            if pending and not size:
+                events.log("Out of budget for interpretation")
+                break
+            ranked = sorted(
+                ((value(s, document), s, document) for s in sections for document in queues[s]),
+                key=lambda item: -item[0]
+            )[:size]
+            batch = [(s, document) for _, s, document in ranked]
+            for s, document in batch:
+                queues[s].remove(document)
+        else:
+            batch = []
+            for section_path in sections:
+                size = saturation.batch_size if stop_when_saturated else len(queues[section_path])
+                batch += [(section_path, document) for document in queues[section_path][:size]]
+                del queues[section_path][:size]
+        if not batch:
+            break
+        remaining = any(active(section_path) for section_path in queues)
+        started, tokens = time.monotonic(), budget.tokens() if budget is not None else 0
+        outcomes = await interpret_batch([document for _, document in batch], goal, None if remaining else next_model)
+        if budget is not None:
+            budget.record("interpret", len(batch), time.monotonic() - started, budget.tokens() - tokens)
+        for (section_path, _), outcome in zip(batch, outcomes):
+            quotes, insights = outcome or ([], "")
+            trackers[section_path].add(quotes, insights)
+            covered[section_path] += outcome is not None
+
+    if budget is not None:
+        budget.skip("interpret", sum(len(queue) for queue in queues.values()))
+    if stop_when_saturated or budget is not None:
+        for section_path, queue in queues.items():
+            saturation.record(section_path, trackers[section_path], [document[0] for document in queue])
+    gc.collect()
+
+async def interpret_batch(documents: list, goal: str, next_model: str = None) -> list:
+    """Interpret (evidence_path, section_name, metadata, content) documents.
+
+    When relevance and extraction use the same model, each document is interpreted
+    in one go, so its first quote call directly follows its relevance check and
+    reuses that prompt's cached prefix. With two models, work is queued on a
+    ModelScheduler in two phases, relevance checks then quote and insight
+    extraction, so each model's calls run back to back instead of alternating per
+    document. Returns (quote texts, insights) per document, None for skipped ones.
+    """
+    if combined_interpretation:
+        return await interpret_batch_combined(documents, goal, next_model)
+
+    if local_classification_model == local_inference_model:
+        scheduler = ModelScheduler(next_model=next_model)
+        for document in documents:
+            scheduler.submit(local_inference_model, interpret_document, document, goal)
+        events.log(f"Interpreting {len(documents)} sources")
+        return await scheduler.drain()
+
+    relevance_scheduler = ModelScheduler(next_model=local_inference_model)
+    for evidence_path, section_name, metadata, content in documents:
+        relevance_scheduler.submit(local_classification_model, check_relevance, content, section_name, goal)
+
+    events.log(f"Checking relevance of {len(documents)} sources")
+    relevances = await relevance_scheduler.drain()
+
+    extraction_scheduler = ModelScheduler(next_model=next_model)
+    relevant = {}
+    for index, ((evidence_path, section_name, metadata, content), relevance) in enumerate(zip(documents, relevances)):
+        relevance = await settle_relevance(evidence_path, section_name, metadata, relevance)
+        if relevance is None:
+            continue
+        ticket = extraction_scheduler.submit(local_inference_model, extract_document, content, section_name, goal)
+        relevant[index] = (relevance, ticket)
+
+    events.log(f"Extracting quotes and insights from {len(relevant)} relevant sources")
+    results = await extraction_scheduler.drain()
+
+    outcomes = [None] * len(documents)
+    for index, (relevance, ticket) in relevant.items():
+        outcomes[index] = await finish_document(documents[index], relevance, *results[ticket])
+    return outcomes
+
+async def interpret_document(document: tuple, goal: str) -> Optional[tuple]:
+    """Check one document's relevance and, if relevant, extract and write its learning right away."""
+    evidence_path, section_name, metadata, content = document
+    relevance = await check_relevance(content, section_name, goal)
+    relevance = await settle_relevance(evidence_path, section_name, metadata, relevance)
+    if relevance is None:
+        return None
+    return await finish_document(document, relevance, *await extract_document(content, section_name, goal))
+
+async def extract_document(content: str, section: str, goal: str) -> tuple:
+    """Quotes from every chunk of a relevant document, then its insights. Returns (quotes per chunk, insights).
+
+    The first chunk is the shared document window, so its quote call reuses the
+    prompt prefix of the relevance check; the insights come last so they can see
+    the quotes of every chunk.
+    """
+    chunks = await asyncio.to_thread(chunk_content, content, document_window)
+    chunk_quotes = [
+        await extract_quotes(chunk, section, goal, f"{i} of {len(chunks)}") for i, chunk in enumerate(chunks, 1)
+    ]
+    index = QuoteIndex()
+    for quotes in chunk_quotes:
+        for quote in quotes:
+            index.add(quote.text, validated=quote.validated)
+    insights = await generate_insights(content, section, goal, [text for text, _, _ in index.unique()])
+    return chunk_quotes, insights
+
+async def finish_document(document: tuple, relevance: RelevanceCheck, chunk_quotes: list, insights: str) -> tuple:
+    """Write a relevant document's learning and report it. Returns (quote texts, insights)."""
+    evidence_path, section_name, metadata, _ = document
+    await write_learning(evidence_path, metadata, relevance, chunk_quotes, insights, writer_ready_insights)
+    quotes = [quote.text for chunk in chunk_quotes for quote in chunk]
+    events.emit(SourceInterpreted(
+        source=metadata.get("source", evidence_path), section=section_name, relevant=True, quotes=len(quotes)
+    ))
+    return quotes, insights
+
+async def settle_relevance(evidence_path: str, section_name: str, metadata: dict, relevance: Optional[RelevanceCheck]):
+    """Record a document's relevance outcome. Returns the relevance to interpret it with, or None to skip it."""
+    if relevance is not None and metadata.get("source"):
+        await asyncio.to_thread(lambda: domain_history().record_relevance(metadata["source"], is_relevant(relevance)))
+    if relevance is None:
+        relevance = unverified_relevance()
+        if relevance is None:
+            events.emit(SourceInterpreted(
+                source=metadata.get("source", evidence_path), section=section_name, relevant=False,
+                reason="relevance check returned no valid answer"
+            ))
+        return relevance
+    if not is_relevant(relevance):
+        events.emit(SourceInterpreted(
+            source=metadata.get("source", evidence_path), section=section_name, relevant=False, reason=relevance.reason
+        ))
+        return None
+    return relevance
+
+async def interpret_batch_combined(documents: list, goal: str, next_model: str = None) -> list:
+    """interpret_batch with one combined call per chunk (see interpret_combined).
+
+    First chunks of all documents go first; the remaining chunks only of the
+    documents whose first chunk was relevant.
+    """
+    chunked = [await asyncio.to_thread(chunk_content, document[3], document_window) for document in documents]
+    first_scheduler = ModelScheduler(next_model=local_inference_model)
+    for (evidence_path, section_name, metadata, content), chunks in zip(documents, chunked):
+        for chunk in chunks[:1]:
+            first_scheduler.submit(local_inference_model, interpret_chunk, chunk, section_name, goal, f"1 of {len(chunks)}")
+    events.log(f"Interpreting {len(documents)} sources")
+    firsts = iter(await first_scheduler.drain())
+    results = [[next(firsts)] if chunks else [] for chunks in chunked]
+
+    rest_scheduler = ModelScheduler(next_model=next_model)
+    relevant = {}
+    for index, (evidence_path, section_name, metadata, content) in enumerate(documents):
+        first = results[index][0] if results[index] else None
+        relevance = None if first is None else RelevanceCheck(
+            is_relevant=first.is_relevant, confidence=first.confidence, reason=first.reason
+        )
+        relevance = await settle_relevance(evidence_path, section_name, metadata, relevance)
+        if relevance is None:
+            continue
+        chunks = chunked[index]
+        tickets = [
+            rest_scheduler.submit(local_inference_model, interpret_chunk, chunk, section_name, goal, f"{i} of {len(chunks)}")
+            for i, chunk in enumerate(chunks[1:], 2)
+        ]
+        relevant[index] = (relevance, tickets)
+    rest = await rest_scheduler.drain()
+
+    outcomes = [None] * len(documents)
+    for index, (relevance, tickets) in relevant.items():
+        evidence_path, section_name, metadata, _ = documents[index]
+        _, chunk_quotes, insights = await merge_chunks(chunked[index], results[index] + [rest[t] for t in tickets])
+        await write_learning(evidence_path, metadata, relevance, chunk_quotes, insights)
+        outcomes[index] = ([quote.text for quotes in chunk_quotes for quote in quotes], insights)
+        events.emit(SourceInterpreted(
+            source=metadata.get("source", evidence_path), section=section_name, relevant=True,
+            quotes=len(outcomes[index][0])
+        ))
+    return outcomes
+
+async def resume_skipped(sections: list, goal: str, next_model: str = None) -> int:
+    """Interpret the sources saturated sections skipped, for (section_path, section_name) pairs."""
+    paths = []
+    for section_path, section_name in sections:
+        paths += [(path, section_name) for path in saturation.skipped_evidence(section_path) if os.path.exists(path)]
+    events.log(f"Resuming {len(paths)} skipped sources")
+    if paths:
+        await interpret_files(paths, goal, next_model, stop_when_saturated=False)
+    for section_path, _ in sections:
+        saturation.mark_resumed(section_path, [path for path, _ in paths])
+    return len(paths)
+
+async def interpret_evidence_file(evidence_path: str, section: str, goal: str):
+    """Process a single evidence file."""
+    events.debug(f"Processing: {os.path.basename(evidence_path)}")
+    log_memory_usage("start")
     
-    print(f"Completed processing: {os.path.basename(learnings_path)}")
+    metadata, content = await asyncio.to_thread(read_evidence_file, evidence_path)
+
+    if combined_interpretation:
+        relevance, chunk_quotes, insights = await interpret_combined(content, section, goal)
+    else:
+        relevance = await check_relevance(content, section, goal)
+    relevance = await settle_relevance(evidence_path, section, metadata, relevance)
+    if relevance is None:
+        return
+
+    if not combined_interpretation:
+        chunk_quotes, insights = await extract_document(content, section, goal)
+    await write_learning(evidence_path, metadata, relevance, chunk_quotes, insights, writer_ready_insights and not combined_interpretation)
+    events.emit(SourceInterpreted(
+        source=metadata.get("source", evidence_path), section=section, relevant=True,
+        quotes=sum(len(quotes) for quotes in chunk_quotes)
+    ))
     gc.collect()
 
-async def process_section(section_path: str, section_name: str, goal: str):
+async def process_section(section_path: str, section_name: str, goal: str, next_model: str = None):
     """Process all evidence files in a section."""
-    evidence_dir = os.path.join(section_path, "evidence")
-    if not os.path.exists(evidence_dir):
-        return
-    
-    for filename in sorted(os.listdir(evidence_dir)):
-        if filename.endswith('.md'):
-            evidence_path = os.path.join(evidence_dir, filename)
-            await interpret_evidence_file(evidence_path, section_name, goal)
+    await interpret_sections([(section_path, section_name)], goal, next_model)
@@ -1,20 +1,31 @@
 import os
+import re
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from researcher.text_processing import split_frontmatter
 from .quote_processor import Quote
 import hashlib
+import events
 
 class RelevanceCheck(BaseModel):
     is_relevant: bool
     confidence: float
     reason: str
 
-async def initialize_learning_file(learnings_path: str, metadata: Dict, relevance: RelevanceCheck):
-    """Initialize the learning file with metadata."""
-    print(f"Creating new learning file at: {learnings_path}")
+class ChunkInterpretation(BaseModel):
+    is_relevant: bool
+    confidence: float
+    reason: str
+    quotes: List[str]
+    insight: str
+
+async def initialize_learning_file(learnings_path: str, metadata: Dict, relevance: RelevanceCheck, insights_kind: str = "summary"):
+    """Initialize the learning file with metadata.
+
+    `insights_kind` records which task wrote the insights: "summary" or "analysis".
+    """
     try:
         with open(learnings_path, 'w', encoding='utf-8') as f:
-            print("Writing metadata section...")
             source_title = metadata.get('title', 'Unknown')
             f.write("---\n")
             f.write(f"source_title: {source_title}\n")
@@ -22,11 +33,11 @@ async def initialize_learning_file(learnings_path: str, metadata: Dict, relevanc
             f.write(f"source_id: {hashlib.md5(source_title.encode()).hexdigest()[:15]}\n")
             f.write(f"relevance_score: {relevance.confidence}\n")
             f.write(f"relevance_reason: {relevance.reason}\n")
+            f.write(f"insights: {insights_kind}\n")
             f.write("---\n\n")
             f.write("## Supporting Quotes\n\n")
-        print(f"Successfully initialized {learnings_path}")
     except Exception as e:
-        print(f"Error creating learning file: {e}")
+        events.warning(f"Error creating learning file: {e}")
         raise
 
 async def append_quote(learnings_path: str, quote: Quote):
@@ -40,12 +51,11 @@ async def append_quote(learnings_path: str, quote: Quote):
             #     f.write(f"{quote.context}\n\n")
         # print("Quote appended successfully")
     except Exception as e:
-        print(f"Error appending quote: {e}")
+        events.warning(f"Error appending quote: {e}")
         raise
 
 async def insert_insights(learnings_path: str, insights: str):
     """Insert insights after metadata section."""
-    print(f"Inserting insights into {learnings_path}")
     try:
         with open(learnings_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
@@ -59,13 +69,23 @@ async def insert_insights(learnings_path: str, insights: str):
                     insert_pos = i + 1
                     break
         
-        print(f"Inserting insights at position {insert_pos}")
         lines.insert(insert_pos, "\n## Insights\n\n")
         lines.insert(insert_pos + 1, insights + "\n\n")
         
         with open(learnings_path, 'w', encoding='utf-8') as f:
             f.writelines(lines)
-        print("Insights inserted successfully")
     except Exception as e:
-        print(f"Error inserting insights: {e}")
+        events.warning(f"Error inserting insights: {e}")
         raise
+
+def read_learning(learnings_path: str) -> Tuple[List[str], str]:
+    """The quotes and insights of a written learning file."""
+    with open(learnings_path, 'r', encoding='utf-8') as f:
+        _, body = split_frontmatter(f.read())
+    match = re.search(r'^## Insights\n(.*?)(?=^## |\Z)', body, flags=re.DOTALL | re.MULTILINE)
+    insights = match.group(1).strip() if match else ""
+    quotes = [
+        line.split(' ', 1)[1].strip() for line in body.splitlines()
+        if line.startswith("> ") or line.startswith("(summarized) ")
+    ]
+    return quotes, insights
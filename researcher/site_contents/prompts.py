@@ -0,0 +1,82 @@
+# Prompts for interpreting a source, laid out so consecutive calls share the longest
+# possible prefix and Ollama can reuse its cached prompt evaluation: the parts that
+# are the same for a whole section come first, then the document, and only then the
+# instructions that differ per call. Relevance, quote and insight calls on the same
+# document therefore share everything up to the task, which pays off when they run
+# back to back: the relevance check is directly followed by the first quote call.
+
+# Characters of a document shown to every call on it; the first quote chunk is this
+# same window, so it shares its prefix with the relevance and insight prompts
+document_window = 4000
+
+def section_context(section: str, goal: str) -> str:
+    """The stable head of every prompt for a section."""
+    return (
+        f"You are analyzing a research source for one section of a report.\n\n"
+        f"RESEARCH GOAL: {goal}\n"
+        f"REPORT SECTION: {section}\n\n"
+    )
+
+def document_prompt(section: str, goal: str, content: str, task: str) -> str:
+    """Section context, then the document (cut to the shared window), then the task."""
+    return f"{section_context(section, goal)}CONTENT:\n{content[:document_window]}\n\nTASK: {task}"
+
+relevance_task = (
+    "Analyze whether the source above contains information relevant to informing the goal of the research.\n"
+    "Return EXACTLY one JSON object in a code block with:\n"
+    "- `is_relevant`: boolean\n"
+    "- `confidence`: float (0-1)\n"
+    "- `reason`: brief explanation"
+)
+
+quotes_task = (
+    "Extract relevant DIRECT quotes from the content above that support the section and goal.\n"
+    "NOTE: DO NOT RESTATE THE GOAL, you are evaluating a data source.\n"
+    "Return EXACTLY one JSON object with `quotes` as an array of strings."
+)
+
+insights_task = (
+    "Write a clear, concise paragraph explaining how the content above contributes to the section and goal.\n"
+    "Focus only on relevant insights. Be specific and practical."
+)
+
+# Characters of quotes from the whole document given to the analysis task
+quotes_window = 4000
+
+def with_quotes(task: str, quotes: list) -> str:
+    """A task followed by quotes from the whole document, so it covers more than the
+    shared window; added after the task, the prompt keeps the window's prefix."""
+    if not quotes:
+        return task
+    listed, used = [], 0
+    for quote in quotes:
+        if used + len(quote) > quotes_window:
+            break
+        listed.append(f"> {quote}")
+        used += len(quote)
+    return f"{task}\n\nQUOTES FROM THE WHOLE SOURCE:\n" + "\n".join(listed)
+
+# The insight task when the writer reuses site insights (see writer_ready_insights):
+# the detailed per-source analysis the insights pass would otherwise ask the large model for
+analysis_task = (
+    "Provide a detailed technical analysis of what the content above contributes to the section and goal, focusing on:\n"
+    "1. Key technical specifications and requirements\n"
+    "2. Implementation considerations\n"
+    "3. Dependencies and constraints\n"
+    "4. Performance metrics and targets\n"
+    "5. Critical success factors\n"
+    "Use the quotes below as well as the content above. Focus only on relevant insights.\n"
+    "Format as clear, actionable technical insights."
+)
+
+combined_task = (
+    "Analyze whether the content above is relevant to informing the goal of the research, and if so,\n"
+    "extract relevant DIRECT quotes from it and explain what it contributes to the section.\n"
+    "NOTE: DO NOT RESTATE THE GOAL, you are evaluating a data source.\n"
+    "Return EXACTLY one JSON object in a code block with:\n"
+    "- `is_relevant`: boolean\n"
+    "- `confidence`: float (0-1)\n"
+    "- `reason`: brief explanation\n"
+    "- `quotes`: array of strings copied exactly from the content (empty if not relevant)\n"
+    "- `insight`: one clear, concise paragraph of specific, practical insights (empty if not relevant)"
+)
@@ -0,0 +1,95 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Text cleaning for scraped pages. Everything here is pure CPU work on strings, kept
+# free of heavy imports so pool workers start quickly.
+
+INLINE_LINK = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+REFERENCE_LINK = re.compile(r'^\[[^\]]+\]:\s*http.*$', flags=re.MULTILINE)
+PLAIN_URL = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+EXTRA_BLANK_LINES = re.compile(r'\n\s*\n\s*\n')
+SENTENCE = re.compile(r'[^.!?]+[.!?](?:\s|$)')
+
+# Pages shorter than this are cleaned in place; shipping them to a worker costs more
+pool_min_chars = 20_000
+# Worker processes for page cleaning (default: all cores but one)
+pool_workers = max(1, (os.cpu_count() or 2) - 1)
+
+_pool = None
+
+def clean_markdown(content: str) -> str:
+    """Clean markdown content by removing links but keeping link text."""
+    # Remove inline links but keep text: [text](url) -> text
+    content = INLINE_LINK.sub(r'\1', content)
+
+    # Remove reference-style links at bottom of document
+    content = REFERENCE_LINK.sub('', content)
+
+    # Remove plain URLs
+    content = PLAIN_URL.sub('', content)
+
+    # Remove empty lines created by link removal
+    content = EXTRA_BLANK_LINES.sub('\n\n', content)
+
+    return content.strip()
+
+def clean_sentences(content: str) -> str:
+    """Clean and ensure complete sentences."""
+    # First clean markdown
+    content = clean_markdown(content)
+
+    # Keep complete sentences (starts with capital, ends with punctuation, more than three words)
+    cleaned_sentences = []
+    for match in SENTENCE.finditer(content):
+        sentence = match.group().strip()
+        if (sentence and
+            sentence[0].isupper() and
+            sentence[-1] in '.!?' and
+            len(sentence.split()) > 3):  # Minimum word count for meaningful sentence
+            cleaned_sentences.append(sentence)
+
+    return '\n\n'.join(cleaned_sentences)
+
+def split_frontmatter(raw_content: str):
+    """Split `---` delimited frontmatter from an evidence file. Returns (metadata, content)."""
+    metadata = {}
+    content = raw_content
+    if content.startswith('---'):
+        try:
+            _, header, content = content.split('---', 2)
+            content = content.strip()
+            for line in header.strip().split('\n'):
+                if ': ' in line:
+                    key, value = line.split(': ', 1)
+                    metadata[key.strip()] = value.strip()
+        except Exception as e:
+            import events  # not imported up front: pool workers load this module
+            events.warning(f"Failed to parse metadata: {e}")
+    return metadata, content
+
+def evidence_text(metadata: dict, content: str) -> str:
+    """Inverse of split_frontmatter: an evidence file with its frontmatter."""
+    header = "".join(f"{key}: {value}\n" for key, value in metadata.items())
+    return f"---\n{header}---\n\n{content}"
+
+def text_pool() -> ProcessPoolExecutor:
+    """The shared process pool, started on first use.
+
+    Workers are spawned rather than forked: the pipeline runs threads (preloads,
+    speculation, the daemon's loop) that a fork could copy mid-lock.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=pool_workers, mp_context=multiprocessing.get_context("spawn"))
+        atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+async def clean_page(markdown: str) -> str:
+    """Clean crawler markdown into sentences without blocking the event loop on large pages."""
+    if len(markdown) < pool_min_chars:
+        return clean_sentences(markdown)
+    return await asyncio.get_running_loop().run_in_executor(text_pool(), clean_sentences, markdown)
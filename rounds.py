@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import events
+import pipeline
+from researcher import base_path, saturation
+
+# Multi-round research: every round after the first searches for what the drafts
+# still lack and then does work only for what is new. Content hashes of evidence,
+# learnings and writings from the end of the previous round decide what is new, so
+# a round's cost follows the new information rather than the size of the report.
+
+state_filename = "rounds.json"
+
+def section_path(report_id: str, section: str) -> str:
+    return os.path.join(base_path, report_id, "structured_research", section)
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def hash_folder(folder: str, extension: str) -> dict:
+    if not os.path.isdir(folder):
+        return {}
+    return {
+        os.path.join(folder, name): file_hash(os.path.join(folder, name))
+        for name in sorted(os.listdir(folder)) if name.endswith(extension)
+    }
+
+def snapshot(report_id: str, sections: list) -> dict:
+    """Content hashes of every evidence, learning and insight file in the report."""
+    stamps = {"evidence": {}, "learnings": {}, "writings": {}}
+    for section in sections:
+        path = section_path(report_id, section)
+        stamps["evidence"].update(hash_folder(os.path.join(path, "evidence"), ".md"))
+        stamps["learnings"].update(hash_folder(os.path.join(path, "learnings"), ".md"))
+        stamps["writings"].update(hash_folder(os.path.join(path, "writings"), ".txt"))
+    return stamps
+
+def changed_files(before: dict, after: dict) -> list:
+    return [path for path, digest in after.items() if before.get(path) != digest]
+
+def load_state(report_id: str):
+    path = os.path.join(base_path, report_id, state_filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(report_id: str, state: dict):
+    with open(os.path.join(base_path, report_id, state_filename), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+def read_queries(report_id: str, section: str) -> list:
+    queries_file = os.path.join(section_path(report_id, section), "queries.txt")
+    if not os.path.exists(queries_file):
+        return []
+    with open(queries_file, 'r', encoding='utf-8') as f:
+        return [q.strip() for q in f.readlines()[1:] if q.strip()]  # Skip header line
+
+def read_draft(report_id: str, section: str) -> str:
+    for filename in ("draft.txt", "section_gist.txt"):
+        path = os.path.join(section_path(report_id, section), filename)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+    return "(No findings yet.)"
+
+def search_new_links(report_id: str, new_queries: dict) -> dict:
+    """Search follow-up queries and append links not seen anywhere in the report yet.
+
+    Returns {section: [(idx, title, url)]} with indices continuing each section's links file.
+    """
+    from researcher.content_scraper import read_links_file
+    from researcher.search_api_get_links import get_links_from_serp
+
+    async def search_all():
+        searches = [(section, query) for section, queries in new_queries.items() for query in queries]
+        results = await asyncio.gather(*(get_links_from_serp(query, None) for _, query in searches))
+        return list(zip(searches, results))
+
+    seen = set()
+    known = {}
+    for section in new_queries:
+        links_file = os.path.join(section_path(report_id, section), "links.txt")
+        known[section] = read_links_file(links_file) if os.path.exists(links_file) else []
+        seen.update(url for _, url in known[section])
+
+    new_links = {section: [] for section in new_queries}
+    for (section, query), links in asyncio.run(search_all()):
+        for title, url in links or []:
+            if url in seen:
+                continue
+            seen.add(url)
+            idx = len(known[section]) + len(new_links[section]) + 1
+            new_links[section].append((idx, title, url))
+
+    for section, links in new_links.items():
+        if not links:
+            continue
+        with open(os.path.join(section_path(report_id, section), "links.txt"), 'a', encoding='utf-8') as f:
+            for _, title, url in links:
+                f.write(f"{title}\n{url}\n\n")
+    return new_links
+
+def fetch_new_links(report_id: str, new_links: dict) -> list:
+    """Scrape only the new links into evidence and merge them into each section's metadata."""
+    from researcher.content_scraper import LazyCrawler, scrape_link
+    from researcher import http_fetch
+    from researcher.boilerplate import strip_evidence_files, print_boilerplate_savings
+    from researcher.fetch_policy import stage_deadline, stats as fetch_stats
+
+    fetch_stats.reset()
+    deadline = stage_deadline()
+
+    async def fetch_all():
+        async with LazyCrawler() as crawler:
+            async def fetch_section(section, links):
+                evidence_dir = os.path.join(section_path(report_id, section), "evidence")
+                return section, [
+                    await scrape_link(idx, title, url, evidence_dir, crawler, deadline) for idx, title, url in links
+                ]
+            fetched = await asyncio.gather(*(fetch_section(s, links) for s, links in new_links.items() if links))
+        await http_fetch.close()
+        return fetched
+
+    written = []
+    fetched = asyncio.run(fetch_all())
+    fetch_stats.print_report()
+    for section, sources in fetched:
+        evidence_dir = os.path.join(section_path(report_id, section), "evidence")
+        sources = [source for source in sources if source]
+        meta_path = os.path.join(evidence_dir, "evidence.meta.json")
+        meta = {"total_sources": 0, "sources": []}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        meta["sources"] += sources
+        meta["total_sources"] = len(meta["sources"])
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        written += [os.path.join(evidence_dir, source["file"]) for source in sources]
+
+    print_boilerplate_savings(strip_evidence_files(written))
+    return written
+
+def research_round(report_id: str, goal: str, sections: list) -> dict:
+    """Run the next round of research for a report and return what it touched.
+
+    The first round is the regular pipeline (or, for a report researched before rounds
+    existed, a snapshot of what is on disk followed straight away by round two).
+    """
+    state = load_state(report_id)
+    if state is None:
+        ran_pipeline = not os.path.exists(os.path.join(base_path, report_id, "final_report.md"))
+        if ran_pipeline:
+            pipeline.run_stages(report_id, goal, sections)
+        state = {
+            "round": 1,
+            "queries": {section: read_queries(report_id, section) for section in sections},
+            "stamps": snapshot(report_id, sections),
+        }
+        save_state(report_id, state)
+        if ran_pipeline:
+            events.log(f"Round 1 complete for {report_id}")
+            return {"round": 1}
+
+    from researcher.query_designer import generate_followup_queries
+    from researcher.site_contents import interpret_files
+    from writer.insights import process_single_learning, local_model as writer_model
+    from writer.synthesis import create_section_gist_report
+    from writer.quotes import integrate_quotes_writer
+    from writer.final_draft import generate_final_report
+
+    round_number = state["round"] + 1
+    events.log(f"Round {round_number}: looking for gaps")
+    new_queries = {}
+    for section in sections:
+        previous = state["queries"].get(section, [])
+        if saturation.is_saturated(section_path(report_id, section)):
+            events.log(f"Skipping follow-up search for saturated section: {section}")
+            continue
+        new_queries[section] = generate_followup_queries(section, goal, read_draft(report_id, section), previous)
+        state["queries"][section] = previous + new_queries[section]
+
+    new_links = search_new_links(report_id, new_queries)
+    events.log(f"Round {round_number}: fetching {sum(len(links) for links in new_links.values())} new sources")
+    fetch_new_links(report_id, new_links)
+
+    # Evidence that is new or changed since the last round is all that gets interpreted
+    section_of = {
+        os.path.join(section_path(report_id, section), sub): section
+        for section in sections for sub in ("evidence", "learnings", "writings")
+    }
+    current = snapshot(report_id, sections)
+    evidence = changed_files(state["stamps"]["evidence"], current["evidence"])
+    events.log(f"Round {round_number}: interpreting {len(evidence)} new sources")
+    if evidence:
+        asyncio.run(interpret_files(
+            [(path, section_of[os.path.dirname(path)]) for path in evidence], goal, next_model=writer_model
+        ))
+
+    learnings = changed_files(state["stamps"]["learnings"], snapshot(report_id, sections)["learnings"])
+    events.log(f"Round {round_number}: writing insights for {len(learnings)} new learnings")
+    for path in learnings:
+        section = section_of[os.path.dirname(path)]
+        process_single_learning(section_path(report_id, section), os.path.basename(path), section)
+
+    # A section is rewritten only if one of its insights or learnings changed
+    current = snapshot(report_id, sections)
+    touched = changed_files(state["stamps"]["writings"], current["writings"]) + learnings
+    changed_sections = [s for s in sections if any(section_of[os.path.dirname(p)] == s for p in touched)]
+    events.log(f"Round {round_number}: rewriting {len(changed_sections)} of {len(sections)} sections")
+    for section in changed_sections:
+        create_section_gist_report(section_path(report_id, section), section, goal)
+        integrate_quotes_writer(section_path(report_id, section), section)
+    if changed_sections:
+        generate_final_report(report_id, sections)
+
+    state["round"] = round_number
+    state["stamps"] = snapshot(report_id, sections)
+    save_state(report_id, state)
+
+    summary = {
+        "round": round_number,
+        "queries": sum(len(q) for q in new_queries.values()),
+        "new_sources": sum(len(links) for links in new_links.values()),
+        "interpreted": len(evidence),
+        "insights": len(learnings),
+        "sections_rewritten": len(changed_sections),
+    }
+    events.log(f"Round {round_number} complete: " + ", ".join(f"{k.replace('_', ' ')} {v}" for k, v in summary.items() if k != "round"))
+    return summary
+
+def run_rounds(report_id: str, rounds: int = 1) -> list:
+    goal, sections = pipeline.load_report(report_id)
+    return [research_round(report_id, goal, sections) for _ in range(rounds)]
@@ -1,22 +1,13 @@
 import os
+import glob
+import time
 
-from clarifications import gather_clarifications
+from clarifications import gather_clarifications, local_model as clarification_model
 from structure import gather_report_structure
-from researcher import (
-    generate_report_id,
-    create_folders,
-    create_serp_queries,
-    gather_links,
-    save_text_file,
-    gather_link_content,
-    interpret_link_content
-)
-from writer import (
-    insights_writer, 
-    synthesis_writer, 
-    quotes_writer,
-    final_draft_writer
-)    
+from researcher import generate_report_id, save_text_file
+from pipeline import research_report
+from speculation import Speculator
+from llm import preload_model
 
 def load_file_content(report_id: str, filename: str) -> str:
     """Load content from a file in the research directory."""
@@ -27,16 +18,41 @@ def load_file_content(report_id: str, filename: str) -> str:
     except FileNotFoundError:
         print(f"Warning: {filepath} not found")
         return ""
-    
+
+def claim_speculated_research(speculator: Speculator, goal: str, section_structure: list):
+    """Collect queries and search results prepared while the user reviewed the structure."""
+    queries = {}
+    links = {}
+    for section in section_structure:
+        section_queries = speculator.claim(("queries", section, goal))
+        if section_queries is not None:
+            queries[section] = section_queries
+        section_links = speculator.claim(("links", section, goal))
+        if section_links:
+            links[section] = section_links
+    print(f"Reusing speculative queries for {len(queries)} and searches for {len(links)} of {len(section_structure)} sections")
+    return queries, links
+
+def seconds_to_first_evidence(report_id: str, since: float):
+    """Time from `since` until the first evidence file of the report was written."""
+    evidence = glob.glob(os.path.join("research", report_id, "structured_research", "*", "evidence", "*.md"))
+    if not evidence:
+        return None
+    return min(os.path.getmtime(path) for path in evidence) - since
+
 def main():
 
     # AGENTIC ASSESSMENT - NEW
 
     # Generate report ID and create folder structure
     report_id = generate_report_id()
+    speculator = Speculator()
+    # Warm the model while the user types the query
+    preload_model(clarification_model)
     research_query = input("Enter your research query: ")
-    goal = gather_clarifications(research_query)
-    section_structure = gather_report_structure(goal)
+    goal = gather_clarifications(research_query, speculator)
+    section_structure = gather_report_structure(goal, speculator)
+    accepted_at = time.time()
 
     # Save the goal.txt and structure.txt
     save_text_file(report_id, "goal.txt", goal)
@@ -61,32 +77,14 @@ def main():
     print("\n=== Structure ===")
     print(section_structure) # list of sections
 
-    # RESEARCH
+    queries, links = claim_speculated_research(speculator, goal, section_structure)
+    speculator.shutdown()
 
-    create_folders(report_id, section_structure)
-    create_serp_queries(report_id, section_structure, goal)
-    gather_links(report_id, section_structure)
-    gather_link_content(report_id, section_structure)
-    interpret_link_content(report_id, section_structure, goal)
+    research_report(report_id, goal, section_structure, queries, links)
 
-    # WRITING
-    
-    # Writing phase - split into separate passes
-    print("\n=== Generating Individual Insights ===")
-    insights_writer(report_id, section_structure)
-    
-    print("\n=== Creating Synthesized Drafts ===")
-    synthesis_writer(report_id, section_structure, goal)
-    
-    print("\n=== Integrating Quotes ===")
-    quotes_writer(report_id, section_structure)
-    
-    print("\n=== Generating Final Report ===")
-    final_draft_writer(report_id, section_structure)
-    
-    print(f"\nResearch completed with ID: {report_id}")
-    print(f"Output folder: research/{report_id}")
-    print(f"Final report: research/{report_id}/final_report.md")
+    to_evidence = seconds_to_first_evidence(report_id, accepted_at)
+    if to_evidence is not None:
+        print(f"Time from accept to first evidence: {to_evidence:.1f}s")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
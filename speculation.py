@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+class Speculator:
+    """Run likely-needed work in the background while the user is typing.
+
+    Results are keyed so the foreground path can claim one when its inputs turn out
+    to match, and discard the rest once the user's choice makes them stale. A single
+    worker keeps speculation from competing with itself for the GPU.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculate")
+        self.futures = {}
+        self.hits = 0
+        self.misses = 0
+
+    def speculate(self, key, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` under `key` unless it is already queued."""
+        if key not in self.futures:
+            self.futures[key] = self.executor.submit(fn, *args, **kwargs)
+
+    def peek(self, key):
+        """Wait for a speculative result without claiming it. None if missing or failed."""
+        future = self.futures.get(key)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except (Exception, CancelledError):
+            return None
+
+    def claim(self, key):
+        """Take the result for `key`, waiting if it is already running.
+
+        Work that has not started yet is cancelled and None returned, since doing it
+        in the foreground is just as fast.
+        """
+        future = self.futures.pop(key, None)
+        if future is None or future.cancel():
+            self.misses += 1
+            return None
+        try:
+            result = future.result()
+        except Exception as e:
+            import events
+            events.warning(f"Speculative work for {key[0]} failed: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def discard(self, predicate=lambda key: True):
+        """Drop speculative work whose key matches `predicate`. Running work finishes unused."""
+        for key in [k for k in self.futures if predicate(k)]:
+            self.futures.pop(key).cancel()
+
+    def shutdown(self):
+        self.discard()
+        self.executor.shutdown(wait=False, cancel_futures=True)
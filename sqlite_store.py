@@ -0,0 +1,32 @@
+import sqlite3
+from contextlib import contextmanager
+
+# Connections for the SQLite files shared by the pipeline, the daemon and workers
+# (task queue, caches, telemetry history). Each call opens its own connection, so
+# every store is safe to use from any thread or process; writes take the database
+# lock up front so concurrent writers wait instead of failing halfway.
+
+# Seconds a connection waits for another process's lock
+timeout_seconds = 30
+
+@contextmanager
+def connect(path: str, row_factory=None):
+    """A connection in autocommit mode, closed on exit."""
+    db = sqlite3.connect(path, timeout=timeout_seconds, isolation_level=None)
+    if row_factory is not None:
+        db.row_factory = row_factory
+    try:
+        yield db
+    finally:
+        db.close()
+
+@contextmanager
+def transaction(db: sqlite3.Connection):
+    """Run the block as one write transaction, rolled back if it raises."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
@@ -1,26 +1,29 @@
 import os
 import re
-from ollama import generate, chat
+import asyncio
+from llm import generate, chat
 
 local_model = 'deepseek-r1:32b'
 
-def section_structure_rough_writer(goal: str, messages: list) -> tuple[str, str]:
+def section_structure_rough_writer(goal: str, messages: list, quiet: bool = False) -> tuple[str, str]:
     """Game out structure as simple string hierarchy. Returns (structure)"""
 
     response = ""
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("\nConsidering report structure...")
-    print('For:\033[92m' + goal + '\033[0m')
-    for part in chat(local_model, messages=messages, stream=True):
+    if not quiet:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print("\nConsidering report structure...")
+        print('For:\033[92m' + goal + '\033[0m')
+    for part in chat(local_model, messages, call_type="structure", stream=True):
         content = part['message']['content']
         response += content
-        print(content, end='')
+        if not quiet:
+            print(content, end='')
 
     return response.strip()
 
-def gather_report_structure(goal: str) -> tuple[str, dict]:
-    """Build report structure through chat-based iterations."""
-    messages = [
+def structure_messages(goal: str) -> list:
+    """Opening conversation for the structure chat."""
+    return [
         {'role': 'system', 'content': (
         "Based on the research goal, suggest a clear structure for the paper.\n"
         "Keep it concise and agentic to the goal of the study.\n"
@@ -28,23 +31,72 @@ def gather_report_structure(goal: str) -> tuple[str, dict]:
         )},
         {'role': 'user', 'content': f"Research goal: {goal}"}
     ]
+
+def draft_structure(goal: str) -> str:
+    """First structure proposal for a goal, without any output (for background use)."""
+    return section_structure_rough_writer(goal, structure_messages(goal), quiet=True)
+
+def search_speculated_queries(speculator, section: str, goal: str) -> dict:
+    """Run the searches for a section's speculated queries. Returns {query: [(title, link), ...]}."""
+    from researcher.search_api_get_links import get_links_from_serp
+
+    queries = speculator.peek(("queries", section, goal))
+    if queries is None:
+        return None
+    return {query: asyncio.run(get_links_from_serp(query, None)) for query in queries.queries}
+
+def speculate_research(speculator, goal: str, section_list: list, previous_sections: list):
+    """Draft SERP queries for every proposed section while the user reviews the structure.
+
+    Searches cost API quota, so they only run for sections that survived a round of
+    feedback unchanged.
+    """
+    from researcher.query_designer import generate_serp_queries
+
+    speculator.discard(lambda key: key[0] in ("queries", "links") and key[1] not in section_list)
+    for section in section_list:
+        speculator.speculate(("queries", section, goal), generate_serp_queries, section, goal, quiet=True)
+    for section in section_list:
+        if section in previous_sections:
+            speculator.speculate(("links", section, goal), search_speculated_queries, speculator, section, goal)
+
+def gather_report_structure(goal: str, speculator=None) -> tuple[str, dict]:
+    """Build report structure through chat-based iterations.
+
+    With a Speculator, research for the proposed sections is started in the background
+    while the user gives feedback; claim it with ("queries" | "links", section, goal).
+    """
+    messages = structure_messages(goal)
+    structure = None
+    section_list = []
+    if speculator:
+        speculator.discard(lambda key: key[0] == "structure" and key[1] != goal)
+        structure = speculator.claim(("structure", goal))
     while True:
-        structure = section_structure_rough_writer(goal, messages)
+        if structure is None:
+            structure = section_structure_rough_writer(goal, messages)
         
         os.system('cls' if os.name == 'nt' else 'clear')
 
         print("\nStructure Idea:")
         print(structure)
 
+        previous_sections = section_list
         section_list = parse_final_structure_list(structure)
 
         for section in section_list:
             print('\033[91m' + str(section) + '\033[0m')
         
         messages.append({'role': 'assistant', 'content': structure})
+        structure = None
+
+        if speculator:
+            speculate_research(speculator, goal, section_list, previous_sections)
         
         feedback = input("\nTweak structure (or 'accept' to proceed): ")
         if feedback.lower() == 'accept':
+            if speculator:
+                speculator.discard(lambda key: key[0] in ("queries", "links") and key[1] not in section_list)
             return section_list
             
         messages.append({'role': 'user', 'content': feedback})
@@ -70,7 +122,7 @@ def distill_raw_structure(structure_str: str) -> str:
 
     print("\n\n\nREDISTILLING STRUCTURE...\n\n\n")
     print('\033[92m' + structure_str + '\033[0m\n\n')
-    for part in generate(local_model, structure_str, system=system_prompt, stream=True):
+    for part in generate(local_model, structure_str, system=system_prompt, call_type="distill_structure", stream=True):
         response += part.get('response', '')
         print(part.get('response', ''), end='')
     
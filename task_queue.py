@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from sqlite_store import connect, transaction
+
+default_queue_path = os.path.join("research", "queue.db")
+
+# Seconds a claimed task stays leased without a heartbeat before another worker may take it
+lease_seconds = 60
+max_attempts = 3
+# Delay before a failed task is offered again, doubled per attempt
+retry_delay_seconds = 5
+
+class TaskQueue:
+    """Durable task queue in one SQLite file shared by the coordinator and all workers.
+
+    A claimed task is leased to one worker, which must heartbeat before the lease
+    runs out. Tasks whose worker failed or went silent go back to pending until
+    `max_attempts` is used up. For workers on several hosts the file must live on
+    shared storage with working file locks, next to the `research` folder they share.
+    """
+
+    def __init__(self, path: str = default_queue_path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with connect(self.path, sqlite3.Row) as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (state, kind, available_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job, kind, state)")
+
+    def enqueue(self, job: str, kind: str, payload: dict) -> int:
+        with connect(self.path, sqlite3.Row) as db:
+            cursor = db.execute(
+                "INSERT INTO tasks (job, kind, payload, available_at) VALUES (?, ?, ?, ?)",
+                (job, kind, json.dumps(payload), time.time())
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker: str, kinds: list) -> Optional[dict]:
+        """Lease the oldest available task of one of `kinds` to `worker`. None if there is none."""
+        now = time.time()
+        with connect(self.path, sqlite3.Row) as db:
+            with transaction(db):
+                # Leases that ran out without a heartbeat count as a failed attempt
+                db.execute(
+                    "UPDATE tasks SET state = 'failed', error = 'lease expired', lease_owner = NULL "
+                    "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, max_attempts)
+                )
+                db.execute(
+                    "UPDATE tasks SET state = 'pending', lease_owner = NULL "
+                    "WHERE state = 'leased' AND lease_expires < ?",
+                    (now,)
+                )
+                row = db.execute(
+                    f"SELECT * FROM tasks WHERE state = 'pending' AND available_at <= ? "
+                    f"AND kind IN ({','.join('?' * len(kinds))}) ORDER BY id LIMIT 1",
+                    (now, *kinds)
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute(
+                    "UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                    "WHERE id = ?",
+                    (worker, now + lease_seconds, row["id"])
+                )
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"])
+        task.update(state="leased", attempts=task["attempts"] + 1, lease_owner=worker)
+        return task
+
+    def heartbeat(self, task_id: int, worker: str) -> bool:
+        """Extend the lease. False if the worker no longer holds it."""
+        with connect(self.path, sqlite3.Row) as db:
+            cursor = db.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (time.time() + lease_seconds, task_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker: str, result=None):
+        with connect(self.path, sqlite3.Row) as db:
+            db.execute(
+                "UPDATE tasks SET state = 'done', result = ?, lease_owner = NULL "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (json.dumps(result), task_id, worker)
+            )
+
+    def fail(self, task_id: int, worker: str, error: str):
+        """Record a failed attempt; the task is retried with backoff until attempts run out."""
+        with connect(self.path, sqlite3.Row) as db:
+            row = db.execute(
+                "SELECT attempts FROM tasks WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (task_id, worker)
+            ).fetchone()
+            if row is None:
+                return
+            if row["attempts"] >= max_attempts:
+                db.execute(
+                    "UPDATE tasks SET state = 'failed', error = ?, lease_owner = NULL WHERE id = ?",
+                    (error, task_id)
+                )
+            else:
+                retry_at = time.time() + retry_delay_seconds * 2 ** (row["attempts"] - 1)
+                db.execute(
+                    "UPDATE tasks SET state = 'pending', error = ?, lease_owner = NULL, available_at = ? WHERE id = ?",
+                    (error, retry_at, task_id)
+                )
+
+    def counts(self, job: str, kind: str) -> dict:
+        """Number of a job's tasks of `kind` per state."""
+        with connect(self.path, sqlite3.Row) as db:
+            rows = db.execute(
+                "SELECT state, COUNT(*) AS n FROM tasks WHERE job = ? AND kind = ? GROUP BY state", (job, kind)
+            ).fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+    def results(self, job: str, kind: str) -> list:
+        """Finished tasks of a job as (payload, result, state, error), in enqueue order."""
+        with connect(self.path, sqlite3.Row) as db:
+            rows = db.execute(
+                "SELECT payload, result, state, error FROM tasks "
+                "WHERE job = ? AND kind = ? AND state IN ('done', 'failed') ORDER BY id",
+                (job, kind)
+            ).fetchall()
+        return [
+            (json.loads(row["payload"]), json.loads(row["result"]) if row["result"] else None, row["state"], row["error"])
+            for row in rows
+        ]
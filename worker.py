@@ -0,0 +1,226 @@
+import argparse
+import os
+import socket
+import threading
+import time
+import traceback
+
+import events
+import pipeline
+from llm import telemetry
+from researcher import base_path
+from task_queue import TaskQueue, default_queue_path, lease_seconds
+
+# Task kinds and the machines they suit: fetching needs a browser, the rest a GPU
+fetch_kinds = ["fetch_url"]
+inference_kinds = ["interpret", "insight", "synthesize", "quotes"]
+task_kinds = fetch_kinds + inference_kinds
+
+# Seconds an idle worker, or a coordinator waiting on a phase, sleeps between polls
+poll_seconds = 2
+
+def section_path(report_id: str, section: str) -> str:
+    return os.path.join(base_path, report_id, "structured_research", section)
+
+# Task handlers: payload -> JSON-serializable result. Every handler writes its output
+# under the shared research folder and may run more than once for the same task.
+
+def handle_fetch_url(payload: dict, resources):
+    from researcher.content_scraper import scrape_link
+
+    evidence_dir = os.path.join(section_path(payload["report_id"], payload["section"]), "evidence")
+    return resources.run(scrape_link(
+        payload["idx"], payload["title"], payload["url"], evidence_dir, resources.get_crawler()
+    ))
+
+def handle_interpret(payload: dict, resources):
+    # A whole section per task, so it is interpreted in rank order and stops when saturated
+    from researcher import interpret_link_content
+
+    interpret_link_content(payload["report_id"], [payload["section"]], payload["goal"])
+
+def handle_insight(payload: dict, resources):
+    from writer.insights import process_single_learning
+
+    process_single_learning(section_path(payload["report_id"], payload["section"]), payload["learning_file"], payload["section"])
+
+def handle_synthesize(payload: dict, resources):
+    from writer.synthesis import create_section_gist_report
+
+    create_section_gist_report(section_path(payload["report_id"], payload["section"]), payload["section"], payload["goal"])
+
+def handle_quotes(payload: dict, resources):
+    from writer.quotes import integrate_quotes_writer
+
+    # The section's collapsed quotes, for the coordinator's quote index
+    return integrate_quotes_writer(section_path(payload["report_id"], payload["section"]), payload["section"])
+
+handlers = {
+    "fetch_url": handle_fetch_url,
+    "interpret": handle_interpret,
+    "insight": handle_insight,
+    "synthesize": handle_synthesize,
+    "quotes": handle_quotes,
+}
+
+def heartbeat_until(done: threading.Event, queue: TaskQueue, task_id: int, worker_id: str):
+    while not done.wait(lease_seconds / 3):
+        if not queue.heartbeat(task_id, worker_id):
+            events.warning(f"Lost the lease on task {task_id}")
+            return
+
+def run_worker(queue: TaskQueue, kinds: list, worker_id: str = None, once: bool = False):
+    """Claim and run tasks of `kinds` until interrupted (or until the queue is empty with `once`)."""
+    from daemon import WarmResources
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    resources = WarmResources()
+    events.log(f"Worker {worker_id} taking {', '.join(kinds)} tasks from {queue.path}")
+    try:
+        while True:
+            task = queue.claim(worker_id, kinds)
+            if task is None:
+                if once:
+                    return
+                time.sleep(poll_seconds)
+                continue
+
+            events.log(f"Task {task['id']} ({task['kind']}, attempt {task['attempts']})")
+            # Each task's LLM usage is its own, not the sum of everything this worker ran
+            telemetry.reset()
+            done = threading.Event()
+            threading.Thread(
+                target=heartbeat_until, args=(done, queue, task["id"], worker_id), daemon=True
+            ).start()
+            try:
+                result = handlers[task["kind"]](task["payload"], resources)
+            except Exception as e:
+                traceback.print_exc()
+                if task["kind"] == "fetch_url":
+                    resources.reset_crawler()
+                queue.fail(task["id"], worker_id, str(e))
+            else:
+                queue.complete(task["id"], worker_id, result)
+            finally:
+                done.set()
+    finally:
+        resources.close()
+
+def wait_for_phase(queue: TaskQueue, job: str, kind: str) -> list:
+    """Block until every task of `kind` for `job` is done or failed. Returns their results."""
+    while True:
+        counts = queue.counts(job, kind)
+        remaining = counts.get("pending", 0) + counts.get("leased", 0)
+        if not remaining:
+            break
+        events.log(f"{kind}: {counts.get('done', 0)} done, {counts.get('leased', 0)} running, {counts.get('pending', 0)} pending")
+        time.sleep(poll_seconds)
+
+    results = queue.results(job, kind)
+    for payload, _, state, error in results:
+        if state == "failed":
+            events.warning(f"{kind} task failed for good: {error}")
+    return results
+
+def coordinate(queue: TaskQueue, report_id: str):
+    """Run a saved report with fetching and LLM work spread over the workers.
+
+    Query design, search and final assembly are quick and run here; the other stages
+    become one task per URL, learning or section, one phase at a time. Sections are
+    interpreted whole, as in the pipeline, so saturation applies.
+    """
+    from researcher.content_scraper import read_links_file, write_evidence_meta
+    from researcher.boilerplate import strip_evidence, print_boilerplate_savings
+    from writer import save_quote_index
+
+    goal, sections = pipeline.load_report(report_id)
+    if not sections:
+        events.warning(f"No structure saved for report '{report_id}'")
+        return
+    job = f"{report_id}@{int(time.time())}"
+
+    for name, stage in pipeline.select_stages("folders", "links"):
+        stage(report_id, goal, sections)
+
+    events.emit(events.StageStarted(stage="content", report_id=report_id))
+    for section in sections:
+        links_file = os.path.join(section_path(report_id, section), "links.txt")
+        if not os.path.exists(links_file):
+            continue
+        for idx, (title, url) in enumerate(read_links_file(links_file), 1):
+            queue.enqueue(job, "fetch_url", {
+                "report_id": report_id, "section": section, "idx": idx, "title": title, "url": url
+            })
+    fetched = {section: [] for section in sections}
+    for payload, source, state, _ in wait_for_phase(queue, job, "fetch_url"):
+        if state == "done" and source:
+            fetched[payload["section"]].append(source)
+    for section, sources in fetched.items():
+        evidence_dir = os.path.join(section_path(report_id, section), "evidence")
+        os.makedirs(evidence_dir, exist_ok=True)
+        write_evidence_meta(evidence_dir, sources)
+    print_boilerplate_savings(strip_evidence(
+        [os.path.join(section_path(report_id, section), "evidence") for section in sections]
+    ))
+
+    events.emit(events.StageStarted(stage="interpret", report_id=report_id))
+    for section, sources in fetched.items():
+        if sources:
+            queue.enqueue(job, "interpret", {"report_id": report_id, "section": section, "goal": goal})
+    wait_for_phase(queue, job, "interpret")
+
+    events.emit(events.StageStarted(stage="insights", report_id=report_id))
+    for section in sections:
+        learning_dir = os.path.join(section_path(report_id, section), "learnings")
+        if not os.path.exists(learning_dir):
+            continue
+        for filename in sorted(os.listdir(learning_dir)):
+            if filename.endswith('.md'):
+                queue.enqueue(job, "insight", {"report_id": report_id, "section": section, "learning_file": filename})
+    wait_for_phase(queue, job, "insight")
+
+    events.emit(events.StageStarted(stage="synthesis", report_id=report_id))
+    for section in sections:
+        queue.enqueue(job, "synthesize", {"report_id": report_id, "section": section, "goal": goal})
+    wait_for_phase(queue, job, "synthesize")
+
+    events.emit(events.StageStarted(stage="quotes", report_id=report_id))
+    for section in sections:
+        queue.enqueue(job, "quotes", {"report_id": report_id, "section": section})
+    save_quote_index(report_id, {
+        payload["section"]: collapsed for payload, collapsed, state, _ in wait_for_phase(queue, job, "quotes")
+        if state == "done" and collapsed
+    })
+
+    for name, stage in pipeline.select_stages("final", "final"):
+        stage(report_id, goal, sections)
+    events.log(f"Final report: {base_path}/{report_id}/final_report.md")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spread a report over workers through a shared SQLite task queue.")
+    parser.add_argument("--queue", default=default_queue_path, help="Queue database on storage shared by all hosts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinate", help="Run a saved report, handing its tasks to workers")
+    coordinator.add_argument("--report", required=True, help="Report id under research/")
+
+    worker = commands.add_parser("work", help="Claim and run tasks")
+    worker.add_argument("--kinds", default=",".join(task_kinds),
+                        help=f"Comma-separated task kinds (fetch boxes: {','.join(fetch_kinds)}; "
+                             f"GPU boxes: {','.join(inference_kinds)})")
+    worker.add_argument("--id", help="Worker id (default: host-pid)")
+    worker.add_argument("--once", action="store_true", help="Exit when no task is available")
+
+    args = parser.parse_args(argv)
+    queue = TaskQueue(args.queue)
+    if args.command == "coordinate":
+        coordinate(queue, args.report)
+    else:
+        kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+        unknown = set(kinds) - set(handlers)
+        if unknown:
+            parser.error(f"unknown task kinds: {', '.join(sorted(unknown))}")
+        run_worker(queue, kinds, args.id, args.once)
+
+if __name__ == "__main__":
+    main()
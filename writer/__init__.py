@@ -1,14 +1,17 @@
 import os
+import time
 from typing import List
 from pydantic import BaseModel
 
-from writer.insights import process_single_learning
-from writer.synthesis import create_section_gist_report
-from writer.quotes import integrate_quotes_writer
-from writer.final_draft import generate_final_report
+import events
+
+# Each pass imports its own module (and through it the LLM client) on first use,
+# so e.g. assembling the final report never loads a model client.
 
 def generate_insights_writer(section_path: str, section: str) -> None:
     """First pass: Generate individual insights for a section."""
+    from writer.insights import process_single_learning
+
     learning_dir = os.path.join(section_path, "learnings")
     if not os.path.exists(learning_dir):
         return
@@ -17,12 +20,52 @@ def generate_insights_writer(section_path: str, section: str) -> None:
         if filename.endswith('.md'):
             process_single_learning(section_path, filename, section)
 
-def insights_writer(report_id: str, section_structure: List[str]):
+def learning_score(learning_path: str) -> float:
+    """Relevance score recorded in a learning file's frontmatter (0 if missing)."""
+    with open(learning_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith("relevance_score:"):
+                try:
+                    return float(line.split(":", 1)[1])
+                except ValueError:
+                    return 0.0
+            if line.startswith("## "):
+                break
+    return 0.0
+
+def budgeted_insights_writer(base_path: str, section_structure: List[str], budget) -> None:
+    """First pass under a budget: sections take turns, best learnings first, until time runs out."""
+    from itertools import zip_longest
+    from writer.insights import process_single_learning
+
+    queues = []
+    for section in section_structure:
+        learning_dir = os.path.join(base_path, section, "learnings")
+        if not os.path.exists(learning_dir):
+            continue
+        files = [f for f in os.listdir(learning_dir) if f.endswith('.md')]
+        files.sort(key=lambda f: -learning_score(os.path.join(learning_dir, f)))
+        queues.append([(section, f) for f in files])
+
+    pending = [item for turn in zip_longest(*queues) for item in turn if item]
+    for done, (section, filename) in enumerate(pending):
+        if not budget.affordable("insights", 1):
+            events.log(f"Out of budget for insights: skipped {len(pending) - done} learnings")
+            budget.skip("insights", len(pending) - done)
+            return
+        started, tokens = time.monotonic(), budget.tokens()
+        process_single_learning(os.path.join(base_path, section), filename, section)
+        budget.record("insights", 1, time.monotonic() - started, budget.tokens() - tokens)
+
+def insights_writer(report_id: str, section_structure: List[str], budget=None):
     """First pass: Generate individual insights for each section."""
     base_path = os.path.join("research", report_id, "structured_research")
+    if budget is not None:
+        budgeted_insights_writer(base_path, section_structure, budget)
+        return
     
     for section in section_structure:
-        print(f"\nProcessing section insights: {section}")
+        events.log(f"Writing insights for section: {section}")
         section_path = os.path.join(base_path, section)
         if not os.path.exists(section_path):
             continue
@@ -30,6 +73,8 @@ def insights_writer(report_id: str, section_structure: List[str]):
 
 def synthesis_writer(report_id: str, section_structure: List[str], goal: str):
     """Second pass: Create synthesized drafts for each section."""
+    from writer.synthesis import create_section_gist_report
+
     base_path = os.path.join("research", report_id, "structured_research")
     
     for section in section_structure:
@@ -38,18 +83,74 @@ def synthesis_writer(report_id: str, section_structure: List[str], goal: str):
             continue
         create_section_gist_report(section_path, section, goal)
 
-def quotes_writer(report_id: str, section_structure: List[str]):
-    """Third pass: Integrate quotes into drafts for each section."""
+def quotes_writer(report_id: str, section_structure: List[str], budget=None):
+    """Third pass: Integrate quotes into drafts for each section.
+
+    Out of budget, the remaining drafts keep their synthesized text without the quote pass.
+    """
+    from writer.quotes import integrate_quotes_writer
+
     base_path = os.path.join("research", report_id, "structured_research")
+    collapsed = {}
     
     for section in section_structure:
-        print(f"\nIntegrating quotes for section: {section}")
+        events.log(f"Integrating quotes for section: {section}")
         section_path = os.path.join(base_path, section)
         if not os.path.exists(section_path):
             continue
-        integrate_quotes_writer(section_path, section)
+        if budget is None:
+            collapsed[section] = integrate_quotes_writer(section_path, section)
+            continue
+        integrate = bool(budget.affordable("quotes", 1))
+        if not integrate:
+            budget.skip("quotes")
+        started, tokens = time.monotonic(), budget.tokens()
+        collapsed[section] = integrate_quotes_writer(section_path, section, integrate)
+        if integrate:
+            budget.record("quotes", 1, time.monotonic() - started, budget.tokens() - tokens)
+    save_quote_index(report_id, {section: result for section, result in collapsed.items() if result})
+
+def save_quote_index(report_id: str, collapsed: dict):
+    """Write the report's quote index: every distinct quote with all its sources and sections.
+
+    `collapsed` maps sections to what integrate_quotes_writer returned. The totals
+    (duplicates collapsed, prompt tokens saved) are also logged.
+    """
+    import json
+    from researcher.quote_index import QuoteIndex
+
+    index = QuoteIndex()
+    for section, (quotes, _) in collapsed.items():
+        for quote in quotes:
+            for source in quote['attributions']:
+                index.add(quote['quote'], {**source, 'section': section})
+    groups = [
+        {
+            "quote": text,
+            "sources": sorted({a['source_id'] for a in attributions}),
+            "sections": sorted({a['section'] for a in attributions}),
+        }
+        for text, _, attributions in index.unique()
+    ]
+    sections = {section: summary for section, (_, summary) in collapsed.items()}
+    totals = {
+        "quotes": sum(s["quotes"] for s in sections.values()),
+        "unique_per_section": sum(s["unique"] for s in sections.values()),
+        "unique_in_report": len(groups),
+        "multi_source": sum(len(g["sources"]) > 1 for g in groups),
+        "multi_section": sum(len(g["sections"]) > 1 for g in groups),
+        "saved_prompt_tokens": sum(s["saved_prompt_tokens"] for s in sections.values()),
+    }
+    with open(os.path.join("research", report_id, "quote_index.json"), 'w', encoding='utf-8') as f:
+        json.dump({"totals": totals, "sections": sections, "quotes": groups}, f, indent=2)
+    if totals["quotes"] > totals["unique_per_section"]:
+        events.log(
+            f"Quotes: collapsed {totals['quotes']} to {totals['unique_per_section']} "
+            f"({totals['multi_source']} with several sources), ~{totals['saved_prompt_tokens']} prompt tokens saved"
+        )
 
 def final_draft_writer(report_id: str, section_structure: List[str]):
     """Fourth pass: Generate final markdown report."""
-    print(f"\nGenerating final report")
+    from writer.final_draft import generate_final_report
+
     generate_final_report(report_id, section_structure)
@@ -1,17 +1,27 @@
+import hashlib
+import json
 import os
 import re
-from typing import Tuple
-from ollama import chat
+from typing import Optional, Tuple
+import events
+from llm import chat, cascade
+from researcher.text_processing import split_frontmatter
 
 local_model = 'deepseek-r1:32b'
 
+# Use the analysis the interpret stage already wrote into a learning (frontmatter
+# `insights: analysis`, see writer_ready_insights in researcher/site_contents) as its
+# writing, instead of asking the large model again. Learnings without one (older
+# reports, combined interpretation, answers that are too short) still get the call.
+reuse_site_insights = True
+
 def load_single_learning(filepath: str) -> Tuple[str, str]:
     """Load a single learning file and return its content and filename."""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read(), os.path.basename(filepath)
     except Exception as e:
-        print(f"Error loading file {filepath}: {e}")
+        events.warning(f"Error loading file {filepath}: {e}")
         return None, None
 
 def generate_individual_insight(content: str, section_name: str) -> str:
@@ -30,26 +40,63 @@ def generate_individual_insight(content: str, section_name: str) -> str:
     {content}
     """
     
-    response = chat(local_model, [{'role': 'system', 'content': prompt}], stream=False)
-    return response['message']['content']
+    return cascade.run("writer_insight", local_model, lambda model: chat(
+        model, [{'role': 'system', 'content': prompt}], call_type="writer_insight"
+    )['message']['content'], cascade.long_enough)
+
+def site_analysis(content: str) -> Optional[str]:
+    """The interpret stage's analysis in a learning file, if it wrote one detailed enough to reuse."""
+    metadata, body = split_frontmatter(content)
+    if metadata.get("insights") != "analysis":
+        return None
+    match = re.search(r'^## Insights\n(.*?)(?=^## |\Z)', body, flags=re.DOTALL | re.MULTILINE)
+    insight = match.group(1).strip() if match else ""
+    return insight if cascade.long_enough(insight) else None
+
+def read_stamp(stamp_path: str) -> dict:
+    """What an existing writing was made from: the learning's content hash and "site" or "writer"."""
+    try:
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
 def process_single_learning(section_path: str, learning_file: str, section_name: str) -> str:
-    """Process a single learning file and save its insight."""
+    """Process a single learning file and save its insight.
+
+    A learning whose content has not changed since its writing was made is not
+    analyzed again; its content hash is kept next to the writing.
+    """
     learning_path = os.path.join(section_path, "learnings", learning_file)
     content, basename = load_single_learning(learning_path)
     if not content:
         return None
-        
-    print(f"Generating insight for: {basename}")
-    insight = generate_individual_insight(content, section_name)
 
-    insight = re.sub(r'<think>.*?</think>', '', insight, flags=re.DOTALL)
-    
     writings_dir = os.path.join(section_path, "writings")
     os.makedirs(writings_dir, exist_ok=True)
-    
     insight_path = os.path.join(writings_dir, f"{basename.replace('.md', '')}.txt")
+    stamp_path = os.path.join(writings_dir, f"{basename.replace('.md', '')}.json")
+    digest = hashlib.sha1(content.encode()).hexdigest()
+
+    stamp = read_stamp(stamp_path)
+    if stamp.get("learning") == digest and os.path.exists(insight_path) and (reuse_site_insights or stamp.get("source") == "writer"):
+        events.debug(f"Insight up to date for: {basename}")
+        with open(insight_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    insight = site_analysis(content) if reuse_site_insights else None
+    if insight:
+        events.debug(f"Reusing site insights for: {basename}")
+        source = "site"
+    else:
+        events.debug(f"Generating insight for: {basename}")
+        insight = generate_individual_insight(content, section_name)
+        insight = re.sub(r'<think>.*?</think>', '', insight, flags=re.DOTALL)
+        source = "writer"
+
     with open(insight_path, 'w', encoding='utf-8') as f:
         f.write(insight)
+    with open(stamp_path, 'w', encoding='utf-8') as f:
+        json.dump({"learning": digest, "source": source}, f)
     
     return insight
@@ -3,7 +3,11 @@ import re
 import hashlib
 from typing import List, Dict
 
-from writer.relevant_quote_finder import integrate_quotes_into_draft
+import events
+
+from llm.telemetry import chars_per_token
+from researcher.quote_index import QuoteIndex
+from writer.relevant_quote_finder import integrate_quotes_into_draft, format_quotes
 from writer.relevant_source_finder import find_relevant_sources
 
 def load_quotes_for_section(section_path: str) -> List[Dict[str, str]]:
@@ -45,21 +49,43 @@ def load_quotes_for_section(section_path: str) -> List[Dict[str, str]]:
     
     return quote_entries
 
-def integrate_quotes_writer(section_path: str, section: str) -> None:
-    """Third pass: Integrate quotes into the synthesized draft."""
+def collapse_quotes(quote_entries: List[Dict[str, str]]):
+    """Merge duplicate and near-duplicate quotes, keeping every source each was attributed to.
+
+    Returns (quote entries with an `attributions` list, the QuoteIndex used).
+    """
+    index = QuoteIndex()
+    for entry in quote_entries:
+        source = {key: entry[key] for key in ('source_id', 'source_title', 'source_url')}
+        index.add(entry['quote'], source)
+    collapsed = [{'quote': text, **attributions[0], 'attributions': attributions} for text, _, attributions in index.unique()]
+    return collapsed, index
+
+def integrate_quotes_writer(section_path: str, section: str, integrate: bool = True):
+    """Third pass: Integrate quotes into the synthesized draft.
+
+    With `integrate` False the draft is written without the LLM quote pass. Returns
+    the section's collapsed quotes and a summary of the collapse (counts and prompt
+    tokens saved), or None without a draft.
+    """
     draft_path = os.path.join(section_path, "section_gist.txt")
     if not os.path.exists(draft_path):
-        return
+        return None
 
-    print(f"Integrating quotes for section: {section}")
-    quotes_with_sources = load_quotes_for_section(section_path)
+    events.debug(f"Integrating quotes for section: {section}")
+    loaded = load_quotes_for_section(section_path)
+    quotes_with_sources, index = collapse_quotes(loaded)
+    saved_tokens = round((len(format_quotes(loaded)) - len(format_quotes(quotes_with_sources))) / chars_per_token)
+    if index.added > len(index.groups):
+        events.debug(f"Collapsed {index.added} quotes to {len(index.groups)}, ~{saved_tokens} prompt tokens saved")
     
     with open(draft_path, 'r', encoding='utf-8') as f:
         section_gist = f.read()
             
-    quoted_draft = integrate_quotes_into_draft(section_gist, quotes_with_sources)
+    quoted_draft = integrate_quotes_into_draft(section_gist, quotes_with_sources) if integrate else section_gist
     quoted_draft = find_relevant_sources(quoted_draft, quotes_with_sources)
     
     quoted_draft_path = os.path.join(section_path, "draft.txt")
     with open(quoted_draft_path, 'w', encoding='utf-8') as f:
         f.write(quoted_draft)
+    return quotes_with_sources, {**index.summary(), "saved_prompt_tokens": saved_tokens}
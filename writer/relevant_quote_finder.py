@@ -1,9 +1,18 @@
-from ollama import chat
+from llm import chat, cascade
 import re
 from typing import List, Dict
+import events
 
 local_model = 'deepseek-r1:32b'
 
+def format_quotes(quotes_with_sources: List[Dict[str, str]]) -> str:
+    """Format quotes with their sources for the prompt; a collapsed quote lists all of its sources."""
+    def sources(q):
+        ids = [a['source_id'] for a in q.get('attributions') or []] or [q['source_id']]
+        return f"Sources: {', '.join(ids)}" if len(ids) > 1 else f"Source: {ids[0]}"
+
+    return "\n".join(f"\"{q['quote']}\"\n  - {sources(q)}\n\n" for q in quotes_with_sources)
+
 def integrate_quotes_into_draft(
     draft_text: str,
     quotes_with_sources: List[Dict[str, str]],
@@ -12,12 +21,8 @@ def integrate_quotes_into_draft(
     """
     Integrates relevant quotes with citations into the draft text in one pass.
     """
-    # Format quotes with their sources for the prompt
-    quotes_str = "\n".join(
-        f"\"{q['quote']}\"\n  - Source: {q['source_id']}\n\n"
-        for q in quotes_with_sources
-    )
-    
+    quotes_str = format_quotes(quotes_with_sources)
+
     prompt = f"""Re-write the given Content to integrate the Quotes into a markdown section. Use [src: Source] to cite a quote when you use it.
 Select the most relevant quotes to enhance the text.
 Content:
@@ -28,26 +33,31 @@ Quotes:
 
 Requirements:
 1. ONLY use relevant quotes that support or enhance the text
-2. Add citations as [src: Source] immediately after each quote
+2. Add citations as [src: Source] immediately after each quote (a quote with several Sources: [src: Source, Source])
 3. Integrate quotes naturally
 4. Maintain the original meaning and structure
 
 Return ONLY the updated draft."""
 
-    for chunk in chat(local_model, [{'role': 'system', 'content': prompt}], stream=True):
-        content = chunk['message']['content']
-        print(content, end='', flush=True)
-        if 'result' not in locals():
-            result = content
-        else:
+    def stream_draft(model: str) -> str:
+        result = ""
+        for chunk in chat(model, [{'role': 'system', 'content': prompt}], call_type="quote_integration", stream=True):
+            content = chunk['message']['content']
+            events.token("quote_integration", content)
             result += content
-    
+        return result
+
+    def keeps_draft(result: str) -> bool:
+        # Cascade check: the draft was not cut short, and quotes on offer were cited
+        answer = cascade.answer_text(result)
+        return len(answer) >= 0.5 * len(draft_text.strip()) and (not quotes_with_sources or "[src:" in answer)
+
+    result = cascade.run("quote_integration", local_model, stream_draft, keeps_draft)
+
     # Extract thought process if present
     thought_match = re.search(r'<think>(.*?)</think>', result, flags=re.DOTALL)
     if thought_match and verbose:
-        print("\n=== Thought Process ===")
-        print(thought_match.group(1).strip())
-        print("=====================\n")
+        events.debug(f"Thought process:\n{thought_match.group(1).strip()}")
     
     # Clean up the response to get just the updated draft
     updated_draft = re.sub(r'<think>.*?</think>', '', result, flags=re.DOTALL).strip()
@@ -13,23 +13,26 @@ def find_relevant_sources(quoted_draft: str, quotes_with_sources: List[Dict[str,
         str: Draft with source details added at the end
     """
     # Create a mapping of source_ids to their full source information
+    # (collapsed duplicate quotes carry every source they were attributed to)
     source_map = {
-        quote['source_id']: {
-            'title': quote['source_title'],
-            'url': quote.get('source_url', ''),
+        source['source_id']: {
+            'title': source['source_title'],
+            'url': source.get('source_url', ''),
             'used': False
         }
         for quote in quotes_with_sources
+        for source in quote.get('attributions') or [quote]
     }
     
     # Find all source citations in the text
     citations = re.findall(r'\[src:\s*([^\]]+)\]', quoted_draft)
     
-    # Mark sources as used if they appear in citations
+    # Mark sources as used if they appear in citations ([src: a, b] cites both)
     for citation in citations:
-        citation = citation.strip()
-        if citation in source_map:
-            source_map[citation]['used'] = True
+        for source_id in citation.split(','):
+            source_id = source_id.strip()
+            if source_id in source_map:
+                source_map[source_id]['used'] = True
     
     # Build sources section with only used sources
     sources_section = "\n\nSources:\n"
@@ -1,7 +1,8 @@
 import os
 import re
 from typing import List
-from ollama import chat
+import events
+from llm import chat, cascade
 
 local_model = 'deepseek-r1:32b'
 
@@ -25,8 +26,11 @@ def synthesize_insights(all_insights: List[str], section_name: str, goal: str) -
     {combined}
     """
     
-    response = chat(local_model, [{'role': 'system', 'content': prompt}], stream=False)
-    return response['message']['content']
+    # Cascade check: a full draft that is about the section
+    section_terms = re.findall(r'[A-Za-z]{5,}', section_name)
+    return cascade.run("synthesis", local_model, lambda model: chat(
+        model, [{'role': 'system', 'content': prompt}], call_type="synthesis"
+    )['message']['content'], lambda text: cascade.long_enough(text, cascade.min_draft_chars) and cascade.covers(text, section_terms))
 
 def create_section_gist_report(section_path: str, section: str, goal: str) -> None:
     """Second pass: Create synthesized draft for a section."""
@@ -41,7 +45,7 @@ def create_section_gist_report(section_path: str, section: str, goal: str) -> No
                 section_insights.append(f.read())
     
     if section_insights:
-        print(f"Synthesizing section: {section}")
+        events.log(f"Synthesizing section: {section}")
         synthesis = synthesize_insights(section_insights, section, goal)
         synthesis = re.sub(r'<think>.*?</think>', '', synthesis, flags=re.DOTALL)
 